@@ -0,0 +1,215 @@
+"""加载时预先计算的汇总表
+
+company_summary：每家公司一行的趋势统计（最高/最低/平均指数、总增长、年均复合增长率、
+年份数、起止年份），查询时只需按代码取一行，也可以直接按增长排序、筛选公司。
+add_year_ranks / YearLeaderboard：每年所有公司的横截面排名和按年份分区、预先排好序的排行榜。
+market_cube：年份 × 板块的聚合立方体（记录数、均值、中位数、P90），市场总览页只读这张小表。
+
+追加新数据时，汇总表只重算涉及的公司（update_summary），排名、排行榜和立方体只重算涉及的年份。
+"""
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+# 板块（按股票代码前缀识别，先匹配更长的前缀）
+BOARDS = [
+    ('688', '科创板'),
+    ('002', '中小板'),
+    ('3', '创业板'),
+    ('6', '沪市主板'),
+    ('0', '深市主板'),
+]
+OTHER_BOARD = '其他'
+ALL_MARKET = '全部市场'
+
+# 立方体中聚合的指标
+CUBE_MEASURES = ['数字化转型指数', '技术维度', '应用维度']
+
+# 汇总统计的键与汇总表列名的对应关系
+SUMMARY_COLUMNS = {
+    'max': '最高指数',
+    'min': '最低指数',
+    'mean': '平均指数',
+    'growth': '总增长',
+    'cagr': '年均复合增长率',
+    'n_years': '年份数',
+    'first_year': '起始年份',
+    'last_year': '结束年份',
+}
+
+
+def board_of(codes):
+    """按股票代码前缀识别板块：0开头(深市)、002开头(中小板)、3开头(创业板)、6开头(沪市)、688开头(科创板)"""
+    codes = codes.astype(str)
+    conditions = [codes.str.startswith(prefix).to_numpy() for prefix, _ in BOARDS]
+    names = [name for _, name in BOARDS]
+    return pd.Series(np.select(conditions, names, default=OTHER_BOARD), index=codes.index, name='板块')
+
+
+def company_summary(df):
+    """一次分组计算所有公司的趋势统计，返回以股票代码为索引的汇总表
+
+    与趋势图相同，每家公司每个年份只取第一条记录（数据已按代码、年份稳定排序）。
+    年均复合增长率 = (末年指数 / 首年指数) ^ (1 / 年数跨度) - 1，首年指数不为正或只有一年时为空。
+    """
+    trend_rows = df.drop_duplicates(['股票代码', '年份'])
+    grouped = trend_rows.groupby('股票代码', sort=False, observed=True)
+    values = grouped['数字化转型指数']
+    years = grouped['年份']
+
+    summary = grouped['企业名称'].last().astype(str).to_frame('企业名称')
+    summary['最高指数'] = values.max().astype(float)
+    summary['最低指数'] = values.min().astype(float)
+    summary['平均指数'] = values.mean().astype(float)
+    first_value = values.first().astype(float)
+    last_value = values.last().astype(float)
+    summary['总增长'] = last_value - first_value
+    summary['年份数'] = years.size().astype(int)
+    summary['起始年份'] = years.first().astype(int)
+    summary['结束年份'] = years.last().astype(int)
+
+    span = (summary['结束年份'] - summary['起始年份']).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = (last_value / first_value).to_numpy() ** (1.0 / span) - 1
+    summary['年均复合增长率'] = np.where((first_value.to_numpy() > 0) & (span > 0), cagr, np.nan)
+
+    summary.index = summary.index.astype(str)
+    summary.index.name = '股票代码'
+    summary['板块'] = board_of(summary.index.to_series()).to_numpy()
+    return summary
+
+
+def update_summary(summary, rows):
+    """用 rows（若干公司的全部记录）重算这些公司的汇总行，其余公司沿用原汇总表"""
+    fresh = company_summary(rows)
+    return pd.concat([summary.drop(fresh.index, errors='ignore'), fresh]).sort_index(kind='stable')
+
+
+def summary_stats(row):
+    """把汇总表的一行转换为统计字典（键见 SUMMARY_COLUMNS，值为 Python 数值）"""
+    values = (row[column] for column in SUMMARY_COLUMNS.values())
+    return {
+        key: value.item() if isinstance(value, np.generic) else value
+        for key, value in zip(SUMMARY_COLUMNS, values)
+    }
+
+
+def add_year_ranks(df, years=None):
+    """增加年度排名列：年度排名（1为当年指数最高）和年度百分位（当年指数不高于该公司的比例，0-100）
+
+    给出 years 时只重算这些年份的排名，其他年份沿用表中已有的排名列。
+    """
+    df = df.copy(deep=False)
+    if years is None or '年度排名' not in df.columns:
+        by_year = df.groupby('年份', sort=False)['数字化转型指数']
+        df['年度排名'] = by_year.rank(method='min', ascending=False).astype('int32')
+        df['年度百分位'] = (by_year.rank(method='max', pct=True) * 100).astype(float)
+        return df
+
+    mask = df['年份'].isin(list(years)).to_numpy()
+    by_year = df[mask].groupby('年份', sort=False)['数字化转型指数']
+    ranks = df['年度排名'].to_numpy(dtype=float, copy=True)
+    ranks[mask] = by_year.rank(method='min', ascending=False).to_numpy()
+    percentiles = df['年度百分位'].to_numpy(dtype=float, copy=True)
+    percentiles[mask] = (by_year.rank(method='max', pct=True) * 100).to_numpy()
+    df['年度排名'] = ranks.astype('int32')
+    df['年度百分位'] = percentiles
+    return df
+
+
+class YearLeaderboard:
+    """按年份分区、按指数从高到低预先排序的行位置，Top N / Bottom N 只需切片"""
+
+    def __init__(self, df, partitions=None):
+        if partitions is None:
+            partitions = self._partition(df)
+        self.partitions = MappingProxyType(partitions)
+        self.years = tuple(sorted(partitions))
+
+    @staticmethod
+    def _partition(df):
+        """按年份分区的行位置（df 为完整数据表或其若干行，行位置取自 df.index）"""
+        ordered = df[['年份', '数字化转型指数']].sort_values(
+            ['年份', '数字化转型指数'], ascending=[True, False], kind='stable'
+        )
+        order = ordered.index.to_numpy()
+        years = ordered['年份'].to_numpy()
+        if len(order):
+            starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+        else:
+            starts = np.array([], dtype=np.int64)
+        stops = np.r_[starts[1:], len(order)]
+        partitions = {}
+        for start, stop in zip(starts, stops):
+            positions = order[start:stop]
+            positions.flags.writeable = False
+            partitions[int(years[start])] = positions
+        return partitions
+
+    def extended(self, df, position_map, years):
+        """追加数据后的排行榜
+
+        position_map 把原表的行位置映射到新表 df 中的位置；years 中的年份在 df 上重算，
+        其余年份的分区只做位置映射（同一年内的顺序不变）。
+        """
+        partitions = {}
+        for year, positions in self.partitions.items():
+            if year not in years:
+                remapped = position_map[positions]
+                remapped.flags.writeable = False
+                partitions[year] = remapped
+        partitions.update(self._partition(df[df['年份'].isin(list(years))]))
+        return YearLeaderboard(df, partitions)
+
+    def count(self, year):
+        """该年份的记录数"""
+        return len(self.partitions.get(int(year), ()))
+
+    def top(self, df, year, n=10):
+        """该年份指数最高的 n 条记录"""
+        positions = self.partitions.get(int(year), np.array([], dtype=np.int64))
+        return df.iloc[positions[:n]]
+
+    def bottom(self, df, year, n=10):
+        """该年份指数最低的 n 条记录（从低到高）"""
+        positions = self.partitions.get(int(year), np.array([], dtype=np.int64))
+        return df.iloc[positions[::-1][:n]]
+
+
+def market_cube(df):
+    """年份 × 板块的聚合立方体
+
+    每个 (年份, 板块) 一行：记录数，以及数字化转型指数和两个维度的均值、中位数、P90。
+    另有“全部市场”板块汇总每年所有记录。
+    """
+    measures = [col for col in CUBE_MEASURES if col in df.columns]
+    values = df[['年份'] + measures].astype({col: float for col in measures})
+    values['板块'] = board_of(df['股票代码']).to_numpy()
+
+    def aggregate(grouped):
+        cube = grouped.size().to_frame('记录数')
+        for col in measures:
+            cube[f'{col}均值'] = grouped[col].mean()
+            cube[f'{col}中位数'] = grouped[col].median()
+            cube[f'{col}P90'] = grouped[col].quantile(0.9)
+        return cube
+
+    by_board = aggregate(values.groupby(['年份', '板块'], sort=True))
+    whole = aggregate(values.groupby('年份', sort=True))
+    whole.index = pd.MultiIndex.from_product([whole.index, [ALL_MARKET]], names=['年份', '板块'])
+    return _order_by_year(pd.concat([whole, by_board]))
+
+
+def update_cube(cube, rows):
+    """用 rows（若干年份的全部记录）重算这些年份的立方体，其余年份沿用原立方体"""
+    fresh = market_cube(rows)
+    years = fresh.index.get_level_values('年份').unique()
+    kept = cube[~cube.index.get_level_values('年份').isin(years)]
+    return _order_by_year(pd.concat([kept, fresh]))
+
+
+def _order_by_year(cube):
+    """按年份稳定排序（同一年内保持“全部市场”在前、板块按名称排列）"""
+    order = np.argsort(cube.index.get_level_values('年份').to_numpy(), kind='stable')
+    return cube.iloc[order]
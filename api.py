@@ -0,0 +1,313 @@
+"""本地 HTTP/JSON 查询接口
+
+其他服务通过 HTTP 查询数字化转型指数，不需要经过 Streamlit 页面（页面的每次交互都会重跑整个脚本）。
+只使用标准库，完全离线运行：
+
+    python api.py --port 8502                      # 独立进程，数据路径等配置见 settings.py
+    DIGITAL_INDEX_API_PORT=8502 streamlit run daima.py   # 与页面共用同一个内存数据集
+
+接口（GET，返回 JSON）：
+    /api/code?code=600611[&year=2020 | &start_year=2010&end_year=2020]   按股票代码查询
+    /api/name?q=大众[&year=... ]                                          按企业名称模糊查询
+    /api/trend?code=600611[&start_year=...&end_year=...]                  历年趋势和统计（不接受 year，返回 400）
+    /api/years                                                            数据中的年份
+    /api/health                                                           数据版本和缓存状态
+
+请求由固定大小的线程池并发处理，查询引擎始终取热更新后的当前版本（见 reloader.py）。
+查询结果按 (接口, 规范化后的参数) 缓存在有界 LRU 中，数据版本变化时整体失效。
+"""
+import argparse
+import json
+import math
+import re
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import engine
+import normalize
+import settings
+
+DEFAULT_PORT = 8502
+
+# 处理请求的线程数
+WORKERS = 8
+
+# 响应缓存的最大条目数（0 表示不缓存）
+CACHE_SIZE = 1024
+
+
+class QueryError(ValueError):
+    """请求参数错误（返回 400）"""
+
+
+class ResponseCache:
+    """有界 LRU 响应缓存：条目属于某个数据版本，版本变化时整体清空"""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, version, key):
+        """取出缓存的响应，没有时返回 None"""
+        with self._lock:
+            if version != self._version:
+                self._items.clear()
+                self._version = version
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, version, key, value):
+        with self._lock:
+            if version != self._version or self.maxsize <= 0:
+                return
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._items), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+def _text(params, name, required=True):
+    value = params.get(name, [''])[0].strip()
+    if required and not value:
+        raise QueryError(f"缺少参数 {name}")
+    return value
+
+
+def _year(params, name):
+    value = _text(params, name, required=False)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(f"参数 {name} 应为年份: {value}")
+
+
+def year_filters(params):
+    """规范化的年份条件：(year, start_year, end_year)"""
+    return _year(params, 'year'), _year(params, 'start_year'), _year(params, 'end_year')
+
+
+def filter_years(rows, year, start_year, end_year):
+    rows = engine.Engine.filter_year(rows, year)
+    if start_year is not None:
+        rows = rows[rows['年份'] >= start_year]
+    if end_year is not None:
+        rows = rows[rows['年份'] <= end_year]
+    return rows
+
+
+def records(df):
+    """数据表转换为 JSON 记录列表（NaN 转为 null）"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def plain_stats(stats):
+    """统计字典中的 NaN（如无法计算的年均复合增长率）转为 None，保证输出合法的 JSON"""
+    if stats is None:
+        return None
+    return {key: None if isinstance(value, float) and math.isnan(value) else value for key, value in stats.items()}
+
+
+def normalize_query(endpoint, params):
+    """规范化请求参数，返回缓存键中的参数元组；同义的请求（如 sh600611 与 600611）得到同一个键"""
+    if endpoint in ('code', 'trend'):
+        code = normalize.clean_stock_code(_text(params, 'code'))
+        if not code:
+            raise QueryError("无法识别的股票代码")
+        year, start_year, end_year = year_filters(params)
+        if endpoint == 'trend':
+            # 单个年份没有趋势可言；不接受 year，避免返回全部年份并各占一个缓存条目
+            if year is not None:
+                raise QueryError("趋势接口不支持参数 year，请使用 start_year 和 end_year")
+            return code, start_year, end_year
+        return code, year, start_year, end_year
+    if endpoint == 'name':
+        return (_text(params, 'q'),) + year_filters(params)
+    if endpoint == 'years':
+        return ()
+    raise KeyError(endpoint)
+
+
+def run_query(query_engine, endpoint, query):
+    """执行规范化后的查询，返回可序列化为 JSON 的字典"""
+    if endpoint == 'code':
+        code, *years = query
+        rows = filter_years(query_engine.lookup_code(code), *years)
+        return {'code': code, 'count': len(rows), 'rows': records(rows)}
+    if endpoint == 'name':
+        text, *years = query
+        try:
+            rows = filter_years(query_engine.search_name(text), *years)
+        except re.error as e:
+            # 名称按正则表达式匹配（与页面相同），无效的表达式属于参数错误
+            raise QueryError(f"无效的名称查询: {e}")
+        return {'q': text, 'count': len(rows), 'rows': records(rows)}
+    if endpoint == 'trend':
+        code, start_year, end_year = query
+        trend_df = filter_years(query_engine.trend(code), None, start_year, end_year)
+        stats = engine.trend_stats(trend_df) if (start_year, end_year) != (None, None) else query_engine.stats(code)
+        return {'code': code, 'stats': plain_stats(stats), 'rows': records(trend_df)}
+    if endpoint == 'years':
+        return {'years': list(query_engine.years)}
+    raise KeyError(endpoint)
+
+
+def error_body(message):
+    return json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = 'DigitalIndexAPI/1.0'
+
+    def do_GET(self):
+        # 查询和序列化中的任何异常都返回 500（而不是直接断开连接），详细的回溯只在 verbose 时输出
+        try:
+            status, body = self.respond()
+        except Exception as e:
+            if self.server.verbose:
+                traceback.print_exc()
+            status, body = 500, error_body(f"服务器内部错误: {type(e).__name__}")
+        self.send_json(status, body)
+
+    def respond(self):
+        """处理一个 GET 请求，返回 (状态码, JSON 响应体)"""
+        url = urlsplit(self.path)
+        endpoint = url.path.rstrip('/').removeprefix('/api/')
+        params = parse_qs(url.query)
+        server = self.server
+        query_engine = server.get_engine()
+        try:
+            if endpoint == 'health':
+                return 200, json.dumps({
+                    'version': query_engine.version,
+                    'rows': len(query_engine),
+                    'cache': server.cache.stats(),
+                }, ensure_ascii=False).encode('utf-8')
+            key = (endpoint, normalize_query(endpoint, params))
+        except KeyError:
+            return 404, error_body(f"未知的接口: {url.path}")
+        except QueryError as e:
+            return 400, error_body(str(e))
+
+        version = query_engine.version
+        body = server.cache.get(version, key)
+        if body is None:
+            try:
+                result = run_query(query_engine, endpoint, key[1])
+            except QueryError as e:
+                return 400, error_body(str(e))
+            result['version'] = version
+            body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+            server.cache.put(version, key, body)
+        return 200, body
+
+    def send_json(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """由固定大小的线程池处理请求的 HTTP 服务器
+
+    get_engine() 返回当前的查询引擎（Engine 或 sql_backend.SqlEngine），每个请求开始时取一次。
+    """
+
+    # 监听队列长度（默认的 5 在并发客户端较多时会丢弃连接，客户端要等约 1 秒后重连）
+    request_queue_size = 128
+
+    def __init__(self, address, get_engine, workers=WORKERS, cache_size=CACHE_SIZE, verbose=False):
+        super().__init__(address, RequestHandler)
+        self.get_engine = get_engine
+        self.cache = ResponseCache(cache_size)
+        self.verbose = verbose
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix='api-worker')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            # 请求处理中的异常已在 do_GET 中转为 500，这里只剩连接层面的错误（如客户端提前断开）
+            if self.verbose:
+                self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+
+def serve_in_background(get_engine, host='127.0.0.1', port=DEFAULT_PORT, **options):
+    """在守护线程中启动服务，返回服务器对象（port=0 时由系统分配端口，见 server.server_port）"""
+    server = PooledHTTPServer((host, port), get_engine, **options)
+    threading.Thread(target=server.serve_forever, name='api-server', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数字化转型指数 HTTP/JSON 查询接口')
+    parser.add_argument('--path', default=settings.EXCEL_PATH, help='数据文件路径')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=settings.API_PORT or DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE)
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory',
+                        help='memory: 内存数据集（含热更新）；sqlite: 查询下推到 SQLite 数据库文件')
+    parser.add_argument('--verbose', action='store_true', help='输出每个请求的访问日志')
+    args = parser.parse_args()
+
+    if args.backend == 'sqlite':
+        import sql_backend
+        try:
+            sql_engine = sql_backend.SqlEngine.from_path(args.path)
+        except ValueError as e:
+            sys.exit(str(e))
+        get_engine = lambda: sql_engine
+    else:
+        watcher = engine.watch(args.path, settings.COMPACT_MODE, settings.DELTA_DIR, settings.POLL_SECONDS)
+        get_engine = lambda: watcher.engine
+
+    server = PooledHTTPServer(
+        (args.host, args.port), get_engine, args.workers, args.cache_size, args.verbose
+    )
+    print(f"数据版本: {get_engine().version}")
+    print(f"查询接口: http://{args.host}:{server.server_port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
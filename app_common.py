@@ -0,0 +1,175 @@
+"""各页面共用的 Streamlit 组件：数据路径配置、共享查询引擎（含后台热更新）和侧边栏数据信息"""
+import time
+import uuid
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+
+import engine
+import normalize
+import settings
+import timing
+
+# 显示数据表时的列顺序
+DISPLAY_COLUMNS = ['年份', '股票代码', '企业名称', '技术维度', '应用维度', '数字化转型指数']
+
+# 每个会话保留的计时记录条数（用于会话内的 p50/p95）
+TIMING_HISTORY = 5000
+
+# 计时表格的列名
+TIMING_COLUMNS = {
+    'phase': '阶段', 'ms': '耗时 (ms)', 'rows': '行数', 'bytes': '字节数', 'count': '次数',
+    'p50_ms': 'p50 (ms)', 'p95_ms': 'p95 (ms)', 'total_ms': '总耗时 (ms)',
+}
+
+timing.enable(settings.TIMING)
+
+
+def show_data_stats(df, panel=None):
+    """在侧边栏显示数据基本统计信息（可选：公司 × 年份矩阵的规模、内存和构建耗时）"""
+    with st.sidebar.expander("📊 数据统计信息", expanded=False):
+        st.write(f"数据总行数: {len(df)}")
+        if '年份' in df.columns:
+            st.write(f"年份范围: {df['年份'].min()} - {df['年份'].max()}")
+            st.write(f"唯一年份数: {len(df['年份'].unique())}")
+        if '数字化转型指数' in df.columns:
+            # 安全获取最小值和最大值
+            try:
+                min_val = float(df['数字化转型指数'].min())
+                max_val = float(df['数字化转型指数'].max())
+                st.write(f"数字化转型指数范围: {min_val:.2f} - {max_val:.2f}")
+            except:
+                st.write(f"数字化转型指数范围: 数据异常")
+        if 'memory_before' in df.attrs:
+            st.write(
+                f"内存占用（紧凑模式）: {df.attrs['memory_before'] / 1e6:.1f} MB"
+                f" → {normalize.memory_usage(df) / 1e6:.1f} MB"
+            )
+        else:
+            st.write(f"内存占用: {normalize.memory_usage(df) / 1e6:.1f} MB")
+        if panel is not None:
+            st.write(
+                f"公司 × 年份矩阵: {len(panel)} × {len(panel.years)}，"
+                f"{panel.nbytes / 1e6:.1f} MB，构建耗时 {panel.build_seconds * 1000:.0f} ms"
+            )
+
+
+def show_load_info(info):
+    """在侧边栏显示加载过程信息（原始列名、列名映射和警告）"""
+    with st.sidebar.expander("📊 数据列名信息", expanded=False):
+        st.write(f"原始列名: {info['raw_columns']}")
+        if info['from_cache']:
+            st.caption("数据来自列式缓存")
+        elif info.get('schema_from_saved'):
+            st.caption("列名映射复用已保存的识别结果")
+        elif info['shape'] is not None:
+            st.write(f"数据形状: {info['shape']}")
+
+    if info['column_mapping']:
+        with st.sidebar.expander("📊 列名映射结果", expanded=False):
+            st.write(f"列名映射: {info['column_mapping']}")
+
+    for level, text in info['messages']:
+        getattr(st, level)(text)
+
+
+def show_version(watcher, query_engine):
+    """在侧边栏显示当前数据版本和热更新状态"""
+    st.sidebar.caption(f"数据版本: {query_engine.version}")
+    if query_engine.load_info.get('deltas'):
+        st.sidebar.caption(f"已追加增量文件: {', '.join(query_engine.load_info['deltas'])}")
+    if watcher.reloads:
+        loaded_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(watcher.loaded_at))
+        st.sidebar.caption(f"已自动更新 {watcher.reloads} 次，最近一次: {loaded_at}")
+    if watcher.last_error:
+        st.sidebar.warning(f"数据文件已更新但重新加载失败，继续使用当前版本: {watcher.last_error.splitlines()[0]}")
+
+
+def timing_table(records):
+    return pd.DataFrame(records).rename(columns=TIMING_COLUMNS)
+
+
+def show_timings(query_engine, page):
+    """结束本次运行的计时：在侧边栏显示各阶段的耗时、行数和字节数以及本会话内的 p50/p95，
+    并按配置追加到 JSON Lines 日志
+
+    每个页面在脚本末尾调用一次；计时关闭时（见 settings.TIMING）不做任何事。
+    """
+    if not settings.TIMING:
+        return
+    records = [record.as_dict() for record in timing.end()]
+    history = st.session_state.setdefault('timing_history', deque(maxlen=TIMING_HISTORY))
+    history.extend(records)
+    session_summary = timing.summarize(history)
+    load_timings = [record.as_dict() for record in query_engine.load_info.get('timings', [])]
+
+    with st.sidebar.expander("⏱️ 性能计时", expanded=False):
+        if load_timings:
+            st.caption(f"数据加载（{'列式缓存' if query_engine.load_info.get('from_cache') else '解析工作簿'}）")
+            st.dataframe(timing_table(load_timings), use_container_width=True, hide_index=True)
+        st.caption("本次运行")
+        st.dataframe(timing_table(records), use_container_width=True, hide_index=True)
+        st.caption("本会话汇总")
+        st.dataframe(timing_table(session_summary), use_container_width=True, hide_index=True)
+
+    if settings.TIMING_LOG:
+        session_id = st.session_state.setdefault('timing_session', uuid.uuid4().hex[:12])
+        try:
+            timing.write_log(settings.TIMING_LOG, {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'session': session_id,
+                'page': page,
+                'version': query_engine.version,
+                'phases': records,
+                'session_summary': session_summary,
+            })
+        except OSError as e:
+            st.sidebar.warning(f"计时日志写入失败: {e}")
+
+
+@st.cache_resource
+def get_watcher(excel_path=settings.EXCEL_PATH, compact=settings.COMPACT_MODE,
+                delta_dir=settings.DELTA_DIR, interval=settings.POLL_SECONDS):
+    """首次加载数据并启动后台热更新线程；进程内只创建一次，所有会话共享
+
+    st.cache_resource 只按实际传入的参数区分（省略的默认参数不计入），各处调用时都显式传入
+    excel_path 和 compact，保证取到同一个实例。
+    """
+    return engine.watch(excel_path, compact, delta_dir, interval)
+
+
+def default_watcher():
+    """按 settings 中的数据路径和内存模式取共享的热更新器（页面、查询接口和启动预热都用这一个实例）"""
+    return get_watcher(settings.EXCEL_PATH, settings.COMPACT_MODE)
+
+
+@st.cache_resource
+def get_api_server(port=settings.API_PORT):
+    """在后台线程中启动 HTTP/JSON 查询接口（与页面共用同一个热更新的引擎）；进程内只启动一次"""
+    import api
+
+    watcher = default_watcher()
+    return api.serve_in_background(lambda: watcher.engine, port=port)
+
+
+def get_engine(excel_path=settings.EXCEL_PATH, compact=settings.COMPACT_MODE):
+    """当前版本的查询引擎，并在页面上显示加载信息、数据统计和数据版本
+
+    每个页面在脚本开头调用一次，本次重跑始终使用同一个引擎；
+    后台替换新版本后，之后的重跑才会取到新引擎。开启计时时从这里开始记录本次运行的各个阶段（见 show_timings）。
+    """
+    if settings.TIMING:
+        timing.begin()
+    watcher = get_watcher(excel_path, compact)
+    if settings.API_PORT:
+        get_api_server()
+    query_engine = watcher.engine
+    show_load_info(query_engine.load_info)
+
+    if query_engine.version == 'sample':
+        st.warning("📊 使用示例数据进行演示")
+
+    show_data_stats(query_engine.frame, query_engine.panel)
+    show_version(watcher, query_engine)
+    return query_engine
@@ -0,0 +1,114 @@
+"""HTTP/JSON 查询接口的本地压力测试
+
+用法: python bench/bench_api.py [工作簿路径 | 行数] [--clients 16] [--requests 2000] [--workers 8]
+在本进程中用系统分配的端口启动 api.py 的服务器（不给数据参数时生成约 5.1 万行的模拟数据），
+多个客户端线程并发发送代码、名称和趋势查询（少数热门查询占大部分请求），
+分别在关闭和开启响应缓存时报告吞吐量、延迟分位数和缓存命中率。完全离线运行。
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api
+import engine
+from bench_memory import load_frame
+
+
+def make_requests(df, n, seed=0):
+    """n 个请求路径：代码、名称、趋势各约三分之一，查询对象按 Zipf 分布抽取（热门查询重复出现）"""
+    rng = np.random.default_rng(seed)
+    companies = df.drop_duplicates('股票代码')
+    codes = companies['股票代码'].astype(str).to_numpy()
+    names = companies['企业名称'].astype(str).to_numpy()
+    years = sorted(int(year) for year in df['年份'].unique())
+    picks = np.minimum(rng.zipf(1.3, n) - 1, len(codes) - 1)
+    paths = []
+    for i, pick in enumerate(picks):
+        kind = i % 3
+        if kind == 0:
+            query = {'code': codes[pick]}
+            if rng.random() < 0.3:
+                query['year'] = int(rng.choice(years))
+            paths.append('/api/code?' + urlencode(query))
+        elif kind == 1:
+            paths.append('/api/name?' + urlencode({'q': names[pick][:3]}))
+        else:
+            paths.append('/api/trend?' + urlencode({'code': codes[pick]}))
+    return paths
+
+
+def fetch(base_url, path):
+    """发送一个请求，返回 (耗时毫秒, 状态码)"""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(base_url + path, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return (time.perf_counter() - start) * 1000, status
+
+
+def run(query_engine, paths, clients, workers, cache_size):
+    server = api.serve_in_background(lambda: query_engine, port=0, workers=workers, cache_size=cache_size)
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    try:
+        fetch(base_url, '/api/years')
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            results = list(pool.map(lambda path: fetch(base_url, path), paths))
+        elapsed = time.perf_counter() - start
+        with urllib.request.urlopen(base_url + '/api/health') as response:
+            cache = json.loads(response.read())['cache']
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    latencies = np.array([ms for ms, _ in results])
+    errors = sum(status != 200 for _, status in results)
+    lookups = cache['hits'] + cache['misses']
+    return {
+        '吞吐量 (请求/秒)': len(paths) / elapsed,
+        'p50 (ms)': np.percentile(latencies, 50),
+        'p95 (ms)': np.percentile(latencies, 95),
+        'p99 (ms)': np.percentile(latencies, 99),
+        '失败请求': errors,
+        '缓存命中率': cache['hits'] / lookups if lookups else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('data', nargs='?')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=api.WORKERS)
+    args = parser.parse_args()
+
+    df = load_frame(args.data)
+    query_engine = engine.Engine.from_frame(df, version='bench')
+    paths = make_requests(df, args.requests)
+    print(
+        f"数据行数: {len(df):,}，{args.requests:,} 个请求（{len(set(paths)):,} 个不同的查询），"
+        f"{args.clients} 个并发客户端，{args.workers} 个工作线程"
+    )
+    for label, cache_size in [('不缓存', 0), ('LRU 缓存', api.CACHE_SIZE)]:
+        result = run(query_engine, paths, args.clients, args.workers, cache_size)
+        print(f"{label}: " + '，'.join(
+            f"{key} {value:.3g}" if isinstance(value, float) else f"{key} {value}"
+            for key, value in result.items()
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""多公司对比图的图表大小与生成耗时：每家公司一条 px.line 轨迹 vs 单个 Scattergl
+
+用法: python bench/bench_charts.py [工作簿路径 | 行数]
+不给参数时生成约 5.1 万行的模拟数据。耗时为服务端生成图表并序列化为 JSON 的时间，
+浏览器端的渲染时间不在此统计（WebGL 单轨迹的渲染开销与公司数基本无关）。
+"""
+import os
+import sys
+import time
+
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import charts
+import panel
+from bench_memory import load_frame
+
+
+def per_company_figure(df, codes):
+    """原做法的推广：每家公司一条带数值标签的 px.line 轨迹"""
+    rows = df[df['股票代码'].isin(codes)].drop_duplicates(['股票代码', '年份'])
+    return px.line(
+        rows, x='年份', y='数字化转型指数', color='股票代码', markers=True,
+        text=rows['数字化转型指数'].round(2)
+    )
+
+
+def measure(build):
+    start = time.perf_counter()
+    fig = build()
+    size = charts.payload_size(fig)
+    return size, (time.perf_counter() - start) * 1000, len(fig.data)
+
+
+def main():
+    df = load_frame(sys.argv[1] if len(sys.argv) > 1 else None)
+    company_panel = panel.Panel(df)
+    codes = list(company_panel.codes)
+    print(f"数据行数: {len(df):,}，公司数: {len(codes):,}")
+    print(f"{'公司数':>6} | {'方式':<14} | {'轨迹数':>6} | {'JSON大小':>10} | {'生成+序列化':>10}")
+    for n in (10, 100, 500, 2000):
+        selected = codes[:n]
+        cases = [
+            ('每公司一条轨迹', lambda: per_company_figure(df, selected)),
+            ('单个Scattergl', lambda: charts.comparison_figure(company_panel, selected, max_companies=n)[0]),
+        ]
+        for label, build in cases:
+            size, elapsed, traces = measure(build)
+            print(f"{n:>6} | {label:<14} | {traces:>6} | {size / 1024:>8.1f}KB | {elapsed:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""紧凑内存布局的内存报告与查询结果一致性检查
+
+用法: python bench/bench_memory.py [工作簿路径 | 行数]
+不给参数时生成约 5.1 万行的模拟数据。
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import columnar_cache
+import indexes
+import normalize
+
+
+def make_clean_frame(n, seed=0):
+    """生成已清洗格式的模拟数据（约每家公司 4-5 年）"""
+    rng = np.random.default_rng(seed)
+    n_companies = max(1, n // 4)
+    prefixes = np.array(['600', '601', '000', '002', '300', '688'])
+    codes = np.char.add(
+        rng.choice(prefixes, n_companies),
+        np.char.zfill(np.arange(n_companies).astype(str), 3)
+    ).astype(object)
+    chars = np.array(list('中国平安银行科技数字交通大众电子能源股份集团控股'))
+    names = np.array([
+        ''.join(rng.choice(chars, rng.integers(3, 7))) + '股份有限公司'
+        for _ in range(n_companies)
+    ], dtype=object)
+    company = rng.integers(0, n_companies, n)
+    df = pd.DataFrame({
+        '股票代码': codes[company],
+        '企业名称': names[company],
+        '年份': rng.integers(1999, 2024, n),
+        '技术维度': rng.integers(0, 30, n),
+        '应用维度': rng.integers(0, 30, n),
+        '数字化转型指数': np.round(rng.gamma(2.0, 8.0, n), 4),
+    })
+    return indexes.sort_by_code_year(df)
+
+
+def load_frame(arg):
+    if arg and os.path.exists(arg):
+        cached = columnar_cache.read_cache(arg)
+        if cached is None:
+            sys.exit(f"{arg} 没有有效的列式缓存，请先用应用加载一次")
+        return cached[0]
+    return make_clean_frame(int(arg) if arg else 51_152)
+
+
+def query_results(df, queries):
+    """按代码和名称执行查询，返回结果列表（统一转回标准类型后比较）"""
+    code_index = indexes.CodeIndex(df)
+    name_index = indexes.NameIndex(df, code_index)
+    results = []
+    for code, name in queries:
+        for result in (code_index.lookup(df, code), name_index.lookup(df, name)):
+            results.append(result.astype({
+                '股票代码': object, '企业名称': object, '年份': 'int64',
+                '技术维度': 'int64', '应用维度': 'int64', '数字化转型指数': 'float64',
+            }).reset_index(drop=True))
+    return results
+
+
+def main():
+    df = load_frame(sys.argv[1] if len(sys.argv) > 1 else None)
+    compact = normalize.compact_frame(df)
+
+    report = normalize.memory_report(df, compact)
+    print(report.to_string())
+
+    rng = np.random.default_rng(1)
+    sample = df.drop_duplicates('股票代码').sample(200, random_state=1, replace=True)
+    queries = [
+        (code, name[rng.integers(0, 2):][:3])
+        for code, name in zip(sample['股票代码'], sample['企业名称'])
+    ]
+    for full, small in zip(query_results(df, queries), query_results(compact, queries)):
+        # float32 只保留约7位有效数字，按相对误差比较
+        pd.testing.assert_frame_equal(full, small, check_exact=False, rtol=1e-6)
+    print(f"查询结果一致: {len(queries) * 2} 个查询")
+
+
+if __name__ == '__main__':
+    main()
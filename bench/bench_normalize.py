@@ -0,0 +1,64 @@
+"""标准化性能对比：逐行 apply 与向量化实现
+
+用法: python bench/bench_normalize.py [行数]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import normalize
+
+
+def make_dirty_columns(n, seed=0):
+    """生成带脏数据的股票代码和年份列"""
+    rng = np.random.default_rng(seed)
+    n_companies = max(1, n // 4)
+    prefixes = np.array(['600', '601', '000', '002', '300', '688'])
+    company_codes = np.char.add(
+        rng.choice(prefixes, n_companies),
+        np.char.zfill(rng.integers(0, 1000, n_companies).astype(str), 3)
+    ).astype(object)
+
+    codes = company_codes[rng.integers(0, n_companies, n)]
+    codes[::7] = codes[::7] + '.SZ'
+    codes[::11] = [c.lstrip('0') for c in codes[::11]]
+    codes[::13] = ' ' + codes[::13]
+    codes[::101] = np.nan
+
+    years = rng.integers(1999, 2024, n).astype(object)
+    years[::5] = [f'{y}年' for y in years[::5]]
+    years[::17] = [f'FY{str(y)[2:]}' for y in years[::17]]
+    years[::97] = np.nan
+    years[::131] = '未知'
+    return pd.Series(codes, name='股票代码'), pd.Series(years, name='年份')
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    codes, years = make_dirty_columns(n)
+    print(f"行数: {n:,}")
+
+    old_codes, t_old = timed(lambda s: s.astype(str).str.strip().apply(normalize.clean_stock_code), codes)
+    new_codes, t_new = timed(normalize.clean_stock_codes, codes)
+    pd.testing.assert_series_equal(old_codes, new_codes)
+    print(f"股票代码: apply {t_old:.3f}s  向量化 {t_new:.3f}s  加速 {t_old / t_new:.1f}x")
+
+    old_years, t_old = timed(lambda s: s.astype(str).apply(normalize.extract_year).astype(int), years)
+    new_years, t_new = timed(lambda s: normalize.extract_years(s).astype(int), years)
+    pd.testing.assert_series_equal(old_years, new_years)
+    print(f"年份: apply {t_old:.3f}s  向量化 {t_new:.3f}s  加速 {t_old / t_new:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""公司 × 年份矩阵的构建耗时、内存占用，以及矩阵运算与长表分组运算的对比
+
+用法: python bench/bench_panel.py [工作簿路径 | 行数]
+不给参数时生成约 5.1 万行的模拟数据。
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import panel
+from bench_memory import load_frame
+
+
+def timed(func, repeat=5):
+    """多次运行取最短耗时（毫秒）和最后一次结果"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def groupby_yoy(df):
+    """长表做法：去重后按公司分组求差，上一条记录不是上一年时置空"""
+    rows = df.drop_duplicates(['股票代码', '年份'])
+    grouped = rows.groupby('股票代码', sort=False, observed=True)
+    change = grouped['数字化转型指数'].diff().astype(float)
+    previous_year = grouped['年份'].shift()
+    return change.where(previous_year == rows['年份'] - 1)
+
+
+def groupby_rolling(df, window=3):
+    rows = df.drop_duplicates(['股票代码', '年份'])
+    return rows.groupby('股票代码', sort=False, observed=True)['数字化转型指数'].rolling(
+        window, min_periods=1
+    ).mean()
+
+
+def main():
+    df = load_frame(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"数据行数: {len(df):,}")
+
+    build_ms, company_panel = timed(lambda: panel.Panel(df), repeat=3)
+    print(
+        f"矩阵: {len(company_panel):,} 家公司 × {len(company_panel.years)} 年，"
+        f"{len(company_panel.matrices)} 个矩阵，{company_panel.nbytes / 1e6:.1f} MB，"
+        f"构建 {build_ms:.1f} ms"
+    )
+
+    cases = [
+        ('同比变化', lambda: company_panel.yoy(), lambda: groupby_yoy(df)),
+        ('3年滚动平均', lambda: company_panel.rolling_mean(window=3), lambda: groupby_rolling(df)),
+    ]
+    for label, matrix_func, long_func in cases:
+        matrix_ms, _ = timed(matrix_func)
+        long_ms, _ = timed(long_func)
+        print(f"{label}: 矩阵 {matrix_ms:.2f} ms / 长表分组 {long_ms:.2f} ms")
+
+    cagr_ms, rates = timed(company_panel.cagr)
+    print(f"年均复合增长率: 矩阵 {cagr_ms:.2f} ms，有效 {np.isfinite(rates).sum():,} 家公司")
+
+    # 一致性：矩阵同比变化与长表分组结果逐项相同
+    changes = groupby_yoy(df).dropna()
+    rows = df.loc[changes.index]
+    matrix_changes = company_panel.yoy()[
+        [company_panel.row(str(code)) for code in rows['股票代码']],
+        np.searchsorted(company_panel.years, rows['年份'].to_numpy())
+    ]
+    assert np.allclose(matrix_changes, changes.to_numpy()), "同比变化结果不一致"
+    print(f"同比变化一致性检查通过（{len(changes):,} 个值）")
+
+
+if __name__ == '__main__':
+    main()
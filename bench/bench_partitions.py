@@ -0,0 +1,66 @@
+"""按年份分区的列式缓存：单年读取与“读取全表再筛选”的耗时和内存对比
+
+用法: python bench/bench_partitions.py [行数]
+不给参数时生成约 5.1 万行的模拟数据。缓存写在临时目录中，测试结束后删除。
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import columnar_cache
+import normalize
+from bench_memory import make_clean_frame
+
+
+def timed(func, repeat=5):
+    """多次运行取最短耗时（毫秒）和最后一次结果"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 51_152
+    df = make_clean_frame(n_rows)
+    years = sorted(int(year) for year in df['年份'].unique())
+
+    with tempfile.TemporaryDirectory() as folder:
+        source = os.path.join(folder, 'source.xlsx')
+        with open(source, 'wb') as f:
+            f.write(b'placeholder')
+        columnar_cache.write_cache(source, df, columnar_cache.source_key(source))
+        data_path = os.path.join(columnar_cache.cache_dir(source), columnar_cache.read_meta(source)['data'])
+        single_file = os.path.join(folder, 'single.parquet')
+        df.to_parquet(single_file, index=True)
+        print(f"数据行数: {len(df):,}，{len(columnar_cache.partition_years(data_path))} 个年份分区")
+
+        def filter_full(year):
+            full = pd.read_parquet(single_file)
+            return full[full['年份'] == year]
+
+        sample = np.random.default_rng(0).choice(years, 10)
+        full_ms = np.median([timed(lambda: filter_full(int(year)))[0] for year in sample])
+        part_ms = np.median([timed(lambda: columnar_cache.read_cache(source, [int(year)]))[0] for year in sample])
+        one_year = columnar_cache.read_cache(source, [int(sample[0])])[0]
+        print(
+            f"单年查询: 读取全表再筛选 {full_ms:.1f} ms，读取分区 {part_ms:.1f} ms；"
+            f"读入内存 {normalize.memory_usage(df) / 1e6:.1f} MB → {normalize.memory_usage(one_year) / 1e6:.2f} MB"
+        )
+
+        whole_ms, _ = timed(lambda: pd.read_parquet(single_file))
+        parts_ms, whole = timed(lambda: columnar_cache.read_cache(source)[0])
+        assert whole.equals(df)
+        print(f"读取全部数据: 单个文件 {whole_ms:.1f} ms，全部分区（恢复原顺序）{parts_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
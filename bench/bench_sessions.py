@@ -0,0 +1,351 @@
+"""并发会话压力测试：不用浏览器，用 Streamlit 的 AppTest 模拟多个分析人员同时使用查询页面
+
+用法: python bench/bench_sessions.py [工作簿路径 | 行数] [--sessions 1 4 8 16] [--actions 20]
+                                     [--think 0] [--compact] [--timing] [--output 结果.json] [--seed 0]
+不给数据参数时用 synthetic.py 生成约 5.1 万行的杂乱格式工作簿（写在临时目录中）。
+
+同一进程中的所有会话共享 st.cache_resource 中的查询引擎（与一个 Streamlit 副本相同）；每个会话是一个
+线程中的 AppTest 实例，先打开页面，再依次执行 --actions 次查询，每次查询设置侧边栏的控件并点击
+“执行查询”触发一次重跑。查询组合：
+    代码查询全部年份（显示趋势图）、代码查询特定年份、名称片段查询、名称片段查询特定年份、不带查询的重跑
+对 --sessions 给出的每个并发数分别报告吞吐量（重跑/秒）、重跑延迟的 p50/p95/p99（总体和按查询类型）、
+出错的重跑数和进程的峰值常驻内存（RSS）。--think 为每次查询之间的思考时间（毫秒，默认 0 即连续发送）。
+--compact 开启紧凑内存模式，--timing 开启分阶段计时（见 timing.py），用于比较不同配置在并发下的表现。
+结果同时写入 JSON 文件（默认 bench/results/sessions-时间.json）。
+
+这不是真正的多会话服务器测试：AppTest 在本进程中直接运行页面脚本，没有 WebSocket 连接、
+消息序列化和浏览器渲染，各会话之间的并发靠 share_runtime() 临时修改 Streamlit 的内部实现来实现。
+测得的是页面脚本本身在共享引擎上的并发重跑开销，不能代替对真实服务器的压力测试。
+share_runtime() 依赖的内部实现随 Streamlit 的小版本变化，只在 STREAMLIT_VERSION 上验证过，
+其他版本直接报错退出。
+"""
+import argparse
+import datetime
+import importlib.metadata
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import synthetic
+from bench_suite import environment
+
+PAGE = os.path.join(ROOT, 'daima.py')
+
+# share_runtime() 针对的 Streamlit 版本（主版本.次版本）
+STREAMLIT_VERSION = '1.65'
+
+# (查询类型, 权重)
+QUERY_MIX = [
+    ('代码 · 全部年份（趋势图）', 0.35),
+    ('代码 · 特定年份', 0.20),
+    ('名称片段 · 全部年份', 0.25),
+    ('名称片段 · 特定年份', 0.15),
+    ('重跑（无查询）', 0.05),
+]
+
+
+class RssSampler:
+    """后台线程定期读取进程的常驻内存，记录峰值（字节）"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current():
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        # 非 Linux 平台只能取进程生命周期内的峰值（macOS 的单位为字节，Linux 为 KB）
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+        return False
+
+
+def make_plan(df, n_actions, rng):
+    """一个会话的查询序列：[(查询类型, 搜索方式, 输入文本, 年份)]"""
+    companies = df[(df['股票代码'] != '') & df['企业名称'].notna()].drop_duplicates('股票代码')
+    years = sorted(int(year) for year in df['年份'].unique())
+    kinds = [kind for kind, _ in QUERY_MIX]
+    weights = np.array([weight for _, weight in QUERY_MIX])
+    plan = []
+    for kind in rng.choice(kinds, n_actions, p=weights / weights.sum()):
+        company = companies.iloc[int(rng.integers(0, len(companies)))]
+        year = int(rng.choice(years)) if '特定年份' in kind else '全部年份'
+        if kind.startswith('代码'):
+            plan.append((kind, '股票代码', company['股票代码'], year))
+        elif kind.startswith('名称'):
+            name = company['企业名称']
+            start = int(rng.integers(0, max(1, len(name) - 3)))
+            plan.append((kind, '企业名称', name[start:start + 3], year))
+        else:
+            plan.append((kind, None, None, None))
+    return plan
+
+
+@contextmanager
+def share_runtime():
+    """在 with 块内让多个 AppTest 像同一个 Streamlit 服务器中的多个会话一样，在不同线程中同时运行
+
+    AppTest 每次运行开始时创建一个模拟的全局 Runtime，结束时把它置空，同时运行的其他会话在这之后
+    会找不到 Runtime 而出错：这里让 Runtime.instance()/exists() 在全局为空时沿用最近一次的 Runtime。
+    AppTest 每次运行还会新建脚本缓存、重新编译页面（多线程同时编译在 Python 3.11 上会出错）：
+    这里改为共用一个脚本缓存，与服务器只编译一次相同。
+    AppTest 每次运行开始时还会清空全局的“是否使用 pages 目录”标志，正在运行的其他会话恰好读到空值时
+    会按单页应用运行、丢失控件的值：这里让 AppTest 清空的是子类上的标志，全局标志保持不变。
+    这些修改都依赖 Streamlit 的内部实现，版本不是 STREAMLIT_VERSION 时报错；退出 with 块时全部恢复。
+    """
+    version = importlib.metadata.version('streamlit')
+    if '.'.join(version.split('.')[:2]) != STREAMLIT_VERSION:
+        raise RuntimeError(
+            f"share_runtime() 只在 Streamlit {STREAMLIT_VERSION}.x 上验证过，当前版本为 {version}，"
+            "需要按新版本的内部实现检查后再更新 STREAMLIT_VERSION"
+        )
+
+    from streamlit import config, logger
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    saved = [
+        (app_test, 'ScriptCache', app_test.ScriptCache),
+        (local_script_runner, 'ScriptCache', local_script_runner.ScriptCache),
+        (app_test, 'PagesManager', app_test.PagesManager),
+        (Runtime, 'instance', Runtime.__dict__['instance']),
+        (Runtime, 'exists', Runtime.__dict__['exists']),
+    ]
+    log_level = config.get_option('logger.level')
+
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    app_test.PagesManager = type('SessionPagesManager', (PagesManager,), {})
+
+    # 不输出每次重跑的弃用提示等日志
+    config.set_option('logger.level', 'error')
+    logger.set_log_level('error')
+
+    original = Runtime.instance.__func__
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        return last[0] if last else original(cls)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+    try:
+        yield
+    finally:
+        for owner, name, value in saved:
+            setattr(owner, name, value)
+        config.set_option('logger.level', log_level)
+        logger.set_log_level(log_level)
+
+
+def widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"页面上没有控件“{label}”（现有: {[element.label for element in elements]}）")
+
+
+def run_session(plan, think, timeout):
+    """一个会话：打开页面后依次执行查询，返回 [(查询类型, 延迟毫秒, 错误信息或 None)]"""
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    at = AppTest.from_file(PAGE, default_timeout=timeout)
+    start = time.perf_counter()
+    at.run()
+    results.append(('打开页面', (time.perf_counter() - start) * 1000, script_error(at)))
+
+    for kind, search_type, text, year in plan:
+        if think:
+            time.sleep(think / 1000)
+        try:
+            if search_type is not None:
+                radio = widget(at.sidebar.radio, '选择搜索方式')
+                if radio.value != search_type:
+                    # 切换搜索方式后输入框才会变化，这次重跑不计入结果
+                    radio.set_value(search_type)
+                    at.run()
+                sidebar = at.sidebar
+                label = '输入股票代码' if search_type == '股票代码' else '输入企业名称'
+                widget(sidebar.text_input, label).set_value(text)
+                widget(sidebar.selectbox, '选择年份（可选）').set_value(year)
+                widget(sidebar.button, '🚀 执行查询').click()
+            start = time.perf_counter()
+            at.run()
+            results.append((kind, (time.perf_counter() - start) * 1000, script_error(at)))
+        except Exception as e:
+            results.append((kind, float('nan'), f"{type(e).__name__}: {e}"))
+    return results
+
+
+def script_error(at):
+    """本次运行中页面抛出的第一个异常（没有时为 None）"""
+    return at.exception[0].value if at.exception else None
+
+
+def latency_summary(latencies):
+    latencies = np.array([ms for ms in latencies if not np.isnan(ms)])
+    if not len(latencies):
+        return {'count': 0}
+    return {
+        'count': len(latencies),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+    }
+
+
+def run_level(plans, n_sessions, args):
+    """前 n_sessions 个查询序列各由一个会话同时执行，返回该并发数的结果"""
+    session_results = [None] * n_sessions
+
+    def target(i):
+        session_results[i] = run_session(plans[i], args.think, args.timeout)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n_sessions)]
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    # 打开页面的首次运行单独统计，吞吐量和延迟只计查询引起的重跑（墙钟时间包含打开页面和切换搜索方式）
+    reruns = [item for results in session_results for item in results[1:]]
+    by_kind = {}
+    for kind, ms, _ in reruns:
+        by_kind.setdefault(kind, []).append(ms)
+    return {
+        'sessions': n_sessions,
+        'reruns': len(reruns),
+        'elapsed_s': round(elapsed, 2),
+        'throughput_per_s': round(len(reruns) / elapsed, 2),
+        'errors': sum(error is not None for results in session_results for _, _, error in results),
+        'error_samples': sorted({error for results in session_results for _, _, error in results if error})[:5],
+        'peak_rss_mb': round(rss.peak / 1e6, 1),
+        'open_page': latency_summary([results[0][1] for results in session_results]),
+        'latency': latency_summary([ms for _, ms, _ in reruns]),
+        'by_kind': {kind: latency_summary(values) for kind, values in by_kind.items()},
+    }
+
+
+def print_level(result):
+    latency = result['latency']
+    print(
+        f"\n{result['sessions']} 个并发会话: {result['reruns']} 次重跑，{result['elapsed_s']} s，"
+        f"吞吐量 {result['throughput_per_s']} 次/秒，出错 {result['errors']} 次，峰值 RSS {result['peak_rss_mb']} MB"
+    )
+    print(
+        f"  重跑延迟 p50 {latency.get('p50_ms')} ms，p95 {latency.get('p95_ms')} ms，p99 {latency.get('p99_ms')} ms；"
+        f"打开页面 p50 {result['open_page'].get('p50_ms')} ms"
+    )
+    for kind, summary in result['by_kind'].items():
+        print(f"  {kind}: {summary['count']} 次，p50 {summary.get('p50_ms')} ms，p99 {summary.get('p99_ms')} ms")
+    for error in result['error_samples']:
+        print(f"  错误: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查询页面的并发会话压力测试')
+    parser.add_argument('data', nargs='?', help='工作簿路径或模拟数据行数（默认 51,152 行模拟数据）')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 8, 16], help='依次测试的并发会话数')
+    parser.add_argument('--actions', type=int, default=20, help='每个会话执行的查询次数')
+    parser.add_argument('--think', type=float, default=0, help='每次查询之间的思考时间（毫秒）')
+    parser.add_argument('--timeout', type=float, default=120, help='单次重跑的超时（秒）')
+    parser.add_argument('--compact', action='store_true', help='开启紧凑内存模式')
+    parser.add_argument('--timing', action='store_true', help='开启分阶段计时')
+    parser.add_argument('--output', help='结果 JSON 文件路径')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        if args.data and not args.data.isdigit():
+            path = os.path.abspath(args.data)
+        else:
+            path = os.path.join(folder, 'sessions.xlsx')
+            synthetic.write_raw(synthetic.make_raw_frame(int(args.data or 51_152), args.seed), path)
+
+        # settings.py 在导入时读取这些环境变量，必须在页面第一次运行之前设置
+        os.environ['DIGITAL_INDEX_PATH'] = path
+        os.environ['DIGITAL_INDEX_POLL_SECONDS'] = '0'
+        os.environ['DIGITAL_INDEX_COMPACT'] = '1' if args.compact else ''
+        os.environ['DIGITAL_INDEX_TIMING'] = '1' if args.timing else ''
+
+        # 先生成所有会话的查询序列，再释放这份数据，避免计入峰值内存
+        import loader
+        df, _ = loader.load_frame(path)
+        n_rows = len(df)
+        plans = [
+            make_plan(df, args.actions, np.random.default_rng(args.seed + i)) for i in range(max(args.sessions))
+        ]
+        del df
+        print(f"数据: {path}，{n_rows:,} 行；每个会话 {args.actions} 次查询，思考时间 {args.think:g} ms")
+
+        with share_runtime():
+            # 预热：第一次运行加载数据并创建共享的查询引擎，不计入结果
+            start = time.perf_counter()
+            run_session([], 0, args.timeout)
+            print(f"预热（首次加载数据）: {time.perf_counter() - start:.1f} s")
+
+            levels = []
+            for n_sessions in args.sessions:
+                levels.append(run_level(plans, n_sessions, args))
+                print_level(levels[-1])
+
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'arguments': {key: value for key, value in vars(args).items() if key != 'output'},
+        'rows': n_rows,
+        'levels': levels,
+    }
+    output = args.output or os.path.join(
+        ROOT, 'bench', 'results', f"sessions-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""走势相似公司查询（k 近邻）的耗时
+
+用法: python bench/bench_similarity.py [公司数]
+生成 公司数 × 25 年的随机走势（约 20% 年份缺失），对随机抽取的公司查询前 10 个最相似的公司。
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import similarity
+
+
+def make_matrix(n_companies, n_years=25, missing=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = np.cumsum(rng.gamma(1.0, 1.5, (n_companies, n_years)), axis=1)
+    matrix[rng.random(matrix.shape) < missing] = np.nan
+    return matrix
+
+
+def main():
+    n_companies = int(sys.argv[1]) if len(sys.argv) > 1 else 11_817
+    matrix = make_matrix(n_companies)
+    rows = np.random.default_rng(1).integers(0, n_companies, 50)
+    print(f"公司数: {n_companies:,}，矩阵 {matrix.nbytes / 1e6:.1f} MB")
+
+    for mode in similarity.MODES:
+        timings = []
+        for row in rows:
+            start = time.perf_counter()
+            similarity.nearest(matrix, int(row), k=10, mode=mode)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{mode}: 中位数 {np.median(timings):.2f} ms，"
+            f"最慢 {max(timings):.2f} ms（{len(rows)} 次查询，k=10）"
+        )
+
+
+if __name__ == '__main__':
+    main()
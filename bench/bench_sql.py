@@ -0,0 +1,109 @@
+"""内存后端（Engine）与 SQLite 后端（SqlEngine）的构建耗时、占用和查询延迟对比
+
+用法: python bench/bench_sql.py [行数 ...] [--sql-only]
+默认依次测试 51,152、1,000,000 和 10,000,000 行的模拟数据。每个规模先检查两个后端对同一组
+查询返回完全相同的结果，再分别测量各类查询的平均延迟。--sql-only 跳过内存后端
+（内存不足以容纳整张表和派生结构时，如 6 GB 内存的机器上的 1000 万行）。数据库文件写在临时目录中，测试结束后删除。
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+import normalize
+import sql_backend
+from bench_memory import make_clean_frame
+
+SIZES = [51_152, 1_000_000, 10_000_000]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def make_queries(df, n=50, seed=1):
+    """随机抽取的代码、名称片段和年份"""
+    rng = np.random.default_rng(seed)
+    companies = df.drop_duplicates('股票代码').sample(n, random_state=seed, replace=True)
+    codes = companies['股票代码'].astype(str).tolist()
+    names = [name[rng.integers(0, 2):][:3] for name in companies['企业名称'].astype(str)]
+    years = rng.choice(sorted(df['年份'].unique()), n).tolist()
+    return codes, names, years
+
+
+def query_cases(codes, names, years):
+    """(名称, 查询函数)：查询函数接收引擎，返回结果列表"""
+    return [
+        ('代码查询（含包含匹配）', lambda e: [e.lookup_code(code) for code in codes]),
+        ('公司趋势（精确代码）', lambda e: [e.trend(code) for code in codes]),
+        ('名称模糊查询', lambda e: [e.search_name(name) for name in names]),
+        ('代码前缀联想', lambda e: [e.suggest_codes(code[:4]) for code in codes]),
+        ('年度排行榜', lambda e: [e.leaderboard(year, n=10) for year in years]),
+        ('公司趋势统计', lambda e: [e.stats(code) for code in codes]),
+        ('批量查询 50 个代码', lambda e: [e.batch_lookup(codes, 2005, 2020)[0]]),
+    ]
+
+
+def assert_same(left, right):
+    for a, b in zip(left, right):
+        if isinstance(a, pd.DataFrame):
+            pd.testing.assert_frame_equal(a, b)
+        elif isinstance(a, dict):
+            pd.testing.assert_series_equal(pd.Series(a), pd.Series(b))
+        else:
+            assert a == b, (a, b)
+
+
+def run(n_rows, sql_only, folder):
+    df = make_clean_frame(n_rows)
+    codes, names, years = make_queries(df)
+    cases = query_cases(codes, names, years)
+    print(f"\n=== {len(df):,} 行，{df['股票代码'].nunique():,} 家公司 ===")
+
+    db_path = os.path.join(folder, f'bench_{n_rows}.sqlite')
+    build_ms, sql_engine = timed(lambda: sql_backend.SqlEngine.from_frame(df, db_path, version='bench'))
+    print(f"SQLite 后端: 构建 {build_ms / 1000:.1f} s，数据库文件 {os.path.getsize(db_path) / 1e6:.1f} MB")
+
+    memory_engine = None
+    if not sql_only:
+        build_ms, memory_engine = timed(lambda: engine.Engine.from_frame(df, version='bench'))
+        company_panel = memory_engine.panel
+        print(
+            f"内存后端: 构建 {build_ms / 1000:.1f} s，数据表 {normalize.memory_usage(memory_engine.frame) / 1e6:.1f} MB"
+            f" + 公司 × 年份矩阵 {company_panel.nbytes / 1e6:.1f} MB"
+        )
+    del df
+
+    rows = []
+    for label, func in cases:
+        sql_ms, sql_result = timed(lambda: func(sql_engine))
+        row = {'查询': label, 'SQLite (ms/次)': sql_ms / len(sql_result)}
+        if memory_engine is not None:
+            memory_ms, memory_result = timed(lambda: func(memory_engine))
+            assert_same(memory_result, sql_result)
+            row['内存 (ms/次)'] = memory_ms / len(memory_result)
+        rows.append(row)
+    if memory_engine is not None:
+        print("两个后端的查询结果一致")
+    print(pd.DataFrame(rows).set_index('查询').round(3).to_string())
+    os.remove(db_path)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    sizes = [int(arg) for arg in args] or SIZES
+    with tempfile.TemporaryDirectory() as folder:
+        for n_rows in sizes:
+            run(n_rows, '--sql-only' in sys.argv, folder)
+
+
+if __name__ == '__main__':
+    main()
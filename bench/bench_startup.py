@@ -0,0 +1,185 @@
+"""冷启动测试：从进程启动到第一个会话可以交互（time-to-first-interactive）的耗时
+
+用法: python bench/bench_startup.py [工作簿路径 | 行数] [--modes cold warm] [--repeat 3] [--cold-cache]
+                                    [--root 代码目录] [--output 结果.json] [--seed 0]
+不给数据参数时用 synthetic.py 生成约 5.1 万行的杂乱格式工作簿（写在临时目录中；超过 10 万行时写成 .csv）。
+
+每次测量启动一个全新的 Python 进程（模块、st.cache_resource 和 plotly 都没有加载过），用 AppTest
+模拟服务器和会话，依次记录：
+    - 服务器就绪：进程启动到可以接受会话。cold 模式只导入 Streamlit（与 `streamlit run daima.py` 相同，
+      数据在第一个会话中加载）；warm 模式还要完成 warmup.warm_up()（与 `python warmup.py` 相同）
+    - 第一个会话：第一次打开查询页面的耗时（服务器就绪后才连接的用户等待的时间）
+    - 首次交互：进程启动到第一个会话的页面显示完成（服务器一启动就连接的用户等待的时间）
+    - 第一次趋势查询：在第一个会话中按股票代码查询并显示趋势图（首次画图）
+    - 第二个会话：之后的会话打开页面的耗时
+--cold-cache 在每次测量前删除列式缓存，数据从工作簿解析；默认先加载一次写好缓存，测量的是读缓存的启动。
+--root 指定被测的代码目录（默认本仓库），例如用 `git worktree add /tmp/before <提交>` 检出修改前的版本，
+分别测量后比较。结果写入 JSON 文件（默认 bench/results/startup-时间.json）。
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 模拟数据超过该行数时写成 .csv（与 bench_suite.py 的默认值相同）
+XLSX_MAX = 100_000
+
+# 子进程输出结果的行前缀
+RESULT_PREFIX = 'STARTUP-RESULT '
+
+METRICS = [
+    ('ready_ms', '服务器就绪'),
+    ('first_session_ms', '第一个会话'),
+    ('first_interactive_ms', '首次交互'),
+    ('first_query_ms', '第一次趋势查询'),
+    ('second_session_ms', '第二个会话'),
+]
+
+
+def widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"页面上没有控件“{label}”（现有: {[element.label for element in elements]}）")
+
+
+def measure(mode, root, spawned):
+    """子进程：在 root 的代码上测量一次启动，spawned 为父进程启动本进程的时刻（time.time()）"""
+    sys.path.insert(0, root)
+    page = os.path.join(root, 'daima.py')
+
+    from streamlit import config, logger
+    from streamlit.testing.v1 import AppTest
+
+    config.set_option('logger.level', 'error')
+    logger.set_log_level('error')
+    if mode == 'warm':
+        import warmup
+        warmup.warm_up()
+    ready = time.time()
+
+    def open_page():
+        at = AppTest.from_file(page, default_timeout=600)
+        start = time.perf_counter()
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        return at, (time.perf_counter() - start) * 1000
+
+    at, first_session_ms = open_page()
+    first_interactive = time.time()
+
+    import app_common
+    watcher = app_common.default_watcher()
+    code = next(code for code in watcher.engine.panel.codes if code)
+    widget(at.sidebar.text_input, '输入股票代码').set_value(code)
+    widget(at.sidebar.button, '🚀 执行查询').click()
+    start = time.perf_counter()
+    at.run()
+    first_query_ms = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    if not at.get('plotly_chart'):
+        raise RuntimeError(f"代码 {code} 的查询没有显示趋势图")
+
+    _, second_session_ms = open_page()
+    return {
+        'ready_ms': (ready - spawned) * 1000,
+        'first_session_ms': first_session_ms,
+        'first_interactive_ms': (first_interactive - spawned) * 1000,
+        'first_query_ms': first_query_ms,
+        'second_session_ms': second_session_ms,
+    }
+
+
+def run_child(mode, root, data_path):
+    """启动一个全新的子进程测量一次，返回各项耗时"""
+    env = dict(
+        os.environ, DIGITAL_INDEX_PATH=data_path, DIGITAL_INDEX_POLL_SECONDS='0',
+        DIGITAL_INDEX_TIMING='', DIGITAL_INDEX_TIMING_LOG='', DIGITAL_INDEX_API_PORT='',
+    )
+    command = [sys.executable, os.path.abspath(__file__), '--child', mode, '--root', root, '--spawned', repr(time.time())]
+    completed = subprocess.run(command, env=env, cwd=root, capture_output=True, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"{mode} 模式测量失败:\n{completed.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查询系统的冷启动测试')
+    parser.add_argument('data', nargs='?', help='工作簿路径或模拟数据行数（默认 51,152 行模拟数据）')
+    parser.add_argument('--modes', nargs='+', choices=['cold', 'warm'], default=['cold', 'warm'])
+    parser.add_argument('--repeat', type=int, default=3, help='每种模式的测量次数（取中位数）')
+    parser.add_argument('--cold-cache', action='store_true', help='每次测量前删除列式缓存')
+    parser.add_argument('--root', default=ROOT, help='被测的代码目录')
+    parser.add_argument('--output', help='结果 JSON 文件路径')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', choices=['cold', 'warm'], help=argparse.SUPPRESS)
+    parser.add_argument('--spawned', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+
+    if args.child:
+        print(RESULT_PREFIX + json.dumps(measure(args.child, root, args.spawned)))
+        return
+
+    # 子进程从 root 导入被测代码，本进程中的这些导入不能放在模块开头
+    sys.path.insert(0, ROOT)
+    import columnar_cache
+    import loader
+    import synthetic
+    from bench_suite import environment
+
+    modes = [mode for mode in args.modes if mode == 'cold' or os.path.exists(os.path.join(root, 'warmup.py'))]
+    if modes != args.modes:
+        print(f"{root} 中没有 warmup.py，跳过 warm 模式")
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        if args.data and not args.data.isdigit():
+            path = os.path.abspath(args.data)
+        else:
+            n_rows = int(args.data or 51_152)
+            path = os.path.join(folder, 'startup.xlsx' if n_rows <= XLSX_MAX else 'startup.csv')
+            synthetic.write_raw(synthetic.make_raw_frame(n_rows, args.seed), path)
+        if not args.cold_cache:
+            loader.load_frame(path)
+        print(f"数据: {path}；代码目录: {root}；{'不使用' if args.cold_cache else '使用'}列式缓存")
+
+        for mode in modes:
+            runs = []
+            for _ in range(args.repeat):
+                if args.cold_cache:
+                    shutil.rmtree(columnar_cache.cache_dir(path), ignore_errors=True)
+                runs.append(run_child(mode, root, path))
+            summary = {key: round(float(np.median([run[key] for run in runs])), 1) for key, _ in METRICS}
+            results.append({'mode': mode, 'median': summary, 'runs': runs})
+            print(f"{mode}: " + '，'.join(f"{label} {summary[key]:.0f} ms" for key, label in METRICS))
+
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'arguments': {'data': args.data, 'root': root, 'repeat': args.repeat, 'cold_cache': args.cold_cache},
+        'results': results,
+    }
+    output = args.output or os.path.join(
+        ROOT, 'bench', 'results', f"startup-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""端到端基准测试：在不同规模的模拟数据上测量加载清洗、查询、统计和图表构建的耗时
+
+用法: python bench/bench_suite.py [行数 ...] [--output 结果.json] [--baseline 上次结果.json]
+                                  [--queries 50] [--xlsx-max 100000] [--no-files] [--seed 0]
+默认依次测试 51,152 和 1,000,000 行（1000 万行的原始数据表约需 6 GB 以上内存，需显式给出）。
+每个规模用 synthetic.py 生成杂乱格式的原始数据，测量：
+    - 清洗：列名识别和向量化清洗（内存中）；写成工作簿后的冷加载（解析 + 清洗 + 写缓存）和热加载（读缓存）
+    - 查询：代码查询、名称模糊查询、年份筛选、年度排行榜、按年份读取分区缓存
+    - 统计：公司趋势、趋势统计（汇总表和逐行计算两种方式）
+    - 图表：单个公司的趋势图和多公司对比图的构建
+测试开始前先检查两条读取路径的一致性：.xlsx 的按结构读取（schema.py）与整表读取（.xls/.csv 的读取方式）
+在含空单元格的数值代码列上应清洗出相同的结果。
+不超过 --xlsx-max 行时写成 .xlsx，否则写成 .csv。文件和缓存写在临时目录中，测试结束后删除。
+
+结果写入 JSON 文件（默认 bench/results/suite-时间.json，该目录已在 .gitignore 中忽略），包含运行环境和每一项的调用次数、
+中位数、p95 和总耗时；给出 --baseline 时与上次的结果逐项比较，中位数变慢超过 25%（且至少 1 ms）的项标记为退化。
+"""
+import argparse
+import datetime
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import analytics
+import charts
+import engine
+import loader
+import panel
+import schema
+import synthetic
+
+SIZES = [51_152, 1_000_000]
+
+# 与基线相比中位数变慢超过该比例（且至少慢 REGRESSION_MIN_MS 毫秒）时标记为退化
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_MS = 1.0
+
+
+class Recorder:
+    """按 (行数, 项目) 收集每次调用的耗时"""
+
+    def __init__(self):
+        self.results = []
+
+    def measure(self, n_rows, phase, func, args_list=((),)):
+        """对 args_list 中的每组参数各调用一次 func，记录耗时，返回最后一次的结果"""
+        durations = []
+        result = None
+        for args in args_list:
+            start = time.perf_counter()
+            result = func(*args)
+            durations.append((time.perf_counter() - start) * 1000)
+        durations = np.array(durations)
+        self.results.append({
+            'rows': n_rows,
+            'phase': phase,
+            'calls': len(durations),
+            'median_ms': round(float(np.median(durations)), 4),
+            'p95_ms': round(float(np.percentile(durations, 95)), 4),
+            'total_ms': round(float(durations.sum()), 4),
+        })
+        return result
+
+
+def clean_raw(raw):
+    """与 loader.load_frame 相同的列名识别和清洗步骤（不经过文件）"""
+    df = raw.copy()
+    df.columns = [schema.standardize_name(col) for col in df.columns]
+    df = df.rename(columns=loader.detect_columns(df))
+    return loader.clean_frame(df, [])
+
+
+def check_read_paths(folder, seed=0):
+    """数值代码列（含空单元格）在按结构读取和整表读取两条路径上清洗出相同的数据"""
+    raw = synthetic.make_raw_frame(2_000, seed)
+    codes = pd.to_numeric(raw['证券代码'].astype(str).str.replace(r'[^0-9]', '', regex=True), errors='coerce')
+    raw['证券代码'] = codes.where(codes.notna(), np.nan)
+    assert raw['证券代码'].dtype == 'float64' and raw['证券代码'].isna().any()
+
+    path = os.path.join(folder, 'read_paths.xlsx')
+    csv_path = os.path.join(folder, 'read_paths.csv')
+    synthetic.write_raw(raw, path)
+    synthetic.write_raw(raw, csv_path)
+    schema_df, info = loader.load_frame(path)
+    assert info['column_mapping'] and not info['from_cache'], info['messages']
+    for fallback in [clean_raw(loader.read_table(path)), loader.load_frame(csv_path)[0]]:
+        pd.testing.assert_frame_equal(
+            schema_df.reset_index(drop=True), fallback[list(schema_df.columns)].reset_index(drop=True),
+            check_dtype=False
+        )
+    print("读取路径一致性检查通过（数值代码列含空单元格）")
+
+
+def make_queries(df, n, seed):
+    """随机抽取的股票代码、名称片段和年份"""
+    rng = np.random.default_rng(seed)
+    companies = df[df['股票代码'] != ''].drop_duplicates('股票代码')
+    companies = companies.iloc[rng.integers(0, len(companies), n)]
+    codes = companies['股票代码'].tolist()
+    names = [name[2:5] for name in companies['企业名称']]
+    years = [int(year) for year in rng.choice(sorted(df['年份'].unique()), n)]
+    return codes, names, years
+
+
+def run(recorder, n_rows, args, folder):
+    raw = recorder.measure(n_rows, '生成原始数据', lambda: synthetic.make_raw_frame(n_rows, args.seed))
+    df = recorder.measure(n_rows, '清洗（列名识别 + 向量化清洗）', lambda: clean_raw(raw))
+
+    path = None
+    if not args.no_files:
+        suffix = '.xlsx' if n_rows <= args.xlsx_max else '.csv'
+        path = os.path.join(folder, f'synthetic_{n_rows}{suffix}')
+        recorder.measure(n_rows, f'写入{suffix}', lambda: synthetic.write_raw(raw, path))
+        loaded, info = recorder.measure(n_rows, f'冷加载{suffix}（解析 + 清洗 + 写缓存）', lambda: loader.load_frame(path))
+        assert loaded is not None and not info['from_cache'], info['messages']
+        # 从文件加载的结果应与内存中清洗的结果一致（文件加载只读取识别到的列）
+        columns = list(loaded.columns)
+        pd.testing.assert_frame_equal(
+            loaded.reset_index(drop=True), df[columns].reset_index(drop=True), check_dtype=False
+        )
+        _, info = recorder.measure(n_rows, '热加载（列式缓存）', lambda: loader.load_frame(path))
+        assert info['from_cache']
+    del raw
+
+    query_engine = recorder.measure(n_rows, '创建查询引擎', lambda: engine.Engine.from_frame(df, version='bench'))
+    # 派生结构在创建引擎时已经构建（计入上一项），这里在引擎的数据表上单独重建一次，得到各自的构建耗时
+    frame = query_engine.frame
+    company_panel = recorder.measure(n_rows, '公司 × 年份矩阵构建', lambda: panel.Panel(frame))
+    recorder.measure(n_rows, '公司汇总表构建', lambda: analytics.company_summary(frame))
+    print(f"\n=== {len(df):,} 行，{query_engine.company_count:,} 家公司，{len(query_engine.years)} 个年份 ===")
+
+    codes, names, years = make_queries(df, args.queries, args.seed)
+    recorder.measure(n_rows, '代码查询', query_engine.lookup_code, [(code,) for code in codes])
+    recorder.measure(n_rows, '名称模糊查询', query_engine.search_name, [(name,) for name in names])
+    recorder.measure(n_rows, '年份筛选（全表）', engine.Engine.filter_year, [(frame, year) for year in years])
+    recorder.measure(n_rows, '年度排行榜', query_engine.leaderboard, [(year,) for year in years])
+    if path is not None:
+        recorder.measure(n_rows, '按年份读取分区缓存', loader.load_years, [(path, [year]) for year in years])
+
+    trends = [query_engine.trend(code) for code in codes]
+    recorder.measure(n_rows, '公司趋势', query_engine.trend, [(code,) for code in codes])
+    recorder.measure(n_rows, '趋势统计（汇总表）', query_engine.stats, [(code,) for code in codes])
+    recorder.measure(n_rows, '趋势统计（逐行计算）', engine.trend_stats, [(trend_df,) for trend_df in trends])
+
+    recorder.measure(
+        n_rows, '趋势图构建', charts.trend_figure,
+        [(trend_df, f"{code} 数字化转型指数趋势") for code, trend_df in zip(codes, trends)]
+    )
+    groups = [codes[i:i + 10] for i in range(0, len(codes), 10)]
+    recorder.measure(n_rows, '多公司对比图构建（10 家）', charts.comparison_figure, [(company_panel, group) for group in groups])
+    recorder.measure(
+        n_rows, '多公司对比图构建（全部公司抽样）', charts.comparison_figure, [(company_panel, company_panel.codes)]
+    )
+
+    table = pd.DataFrame([result for result in recorder.results if result['rows'] == n_rows])
+    print(table.drop(columns='rows').set_index('phase').to_string())
+
+
+def environment():
+    """运行环境：Python、主要依赖的版本、平台和当前的 git 提交"""
+    packages = {}
+    for name in ['numpy', 'pandas', 'pyarrow', 'plotly', 'openpyxl', 'streamlit']:
+        try:
+            packages[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            packages[name] = None
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages,
+        'git_commit': commit,
+    }
+
+
+def compare(results, baseline_path):
+    """与基线结果逐项比较中位数，返回退化的项目"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(item['rows'], item['phase']): item for item in json.load(f)['results']}
+    regressions = []
+    for item in results:
+        before = baseline.get((item['rows'], item['phase']))
+        if before is None or before['median_ms'] <= 0:
+            continue
+        ratio = item['median_ms'] / before['median_ms']
+        if ratio > REGRESSION_RATIO and item['median_ms'] - before['median_ms'] > REGRESSION_MIN_MS:
+            regressions.append(dict(item, baseline_median_ms=before['median_ms'], ratio=round(ratio, 2)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数字化转型指数查询系统端到端基准测试')
+    parser.add_argument('sizes', nargs='*', type=int, help='数据行数（默认 51,152 和 1,000,000）')
+    parser.add_argument('--output', help='结果 JSON 文件路径')
+    parser.add_argument('--baseline', help='用于比较的上次结果 JSON 文件')
+    parser.add_argument('--queries', type=int, default=50, help='每类查询的次数')
+    parser.add_argument('--xlsx-max', type=int, default=100_000, help='不超过该行数时写成 .xlsx，否则写成 .csv')
+    parser.add_argument('--no-files', action='store_true', help='跳过写文件和从文件加载')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    with tempfile.TemporaryDirectory() as folder:
+        if not args.no_files:
+            check_read_paths(folder, args.seed)
+        for n_rows in args.sizes or SIZES:
+            run(recorder, n_rows, args, folder)
+
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'arguments': {'sizes': args.sizes or SIZES, 'queries': args.queries, 'seed': args.seed},
+        'results': recorder.results,
+    }
+    if args.baseline:
+        report['regressions'] = compare(recorder.results, args.baseline)
+
+    output = args.output or os.path.join(
+        ROOT, 'bench', 'results', f"suite-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {output}")
+
+    if args.baseline:
+        if report['regressions']:
+            print(f"与基线相比变慢超过 {REGRESSION_RATIO - 1:.0%} 的项目:")
+            for item in report['regressions']:
+                print(f"  {item['rows']:,} 行 {item['phase']}: {item['baseline_median_ms']:.3g} ms → {item['median_ms']:.3g} ms")
+            sys.exit(1)
+        print("与基线相比没有退化")
+
+
+if __name__ == '__main__':
+    main()
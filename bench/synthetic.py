@@ -0,0 +1,214 @@
+"""可扩展规模的模拟数据：按真实工作簿的杂乱格式生成原始数据表
+
+全部向量化生成，1000 万行也只需几十秒。数据的形态接近真实的上市公司面板：
+    - 每家公司连续若干年有数据，指数随年份带噪声地增长
+    - 代码分布在沪市主板、深市主板、创业板、科创板和北交所等代码段（超出代码段容量时使用其余六位代码）
+    - 中文企业名称，少数公司中途被冠以 ST / *ST
+    - 脏代码（.SH 后缀、sz 前缀、丢失前导零的数字、空格）、脏年份（“2010年”、日期、小数、“未知”）
+      和缺失值（代码、名称、年份、指数）
+列名与真实工作簿一样不规范（“证券代码”、带空格的“企业名称”、“会计年度”）并夹带无关列，
+需要经过 loader.detect_columns 识别。
+
+用法: python bench/synthetic.py 行数 输出文件(.xlsx|.csv) [--seed 0]
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# (代码段前缀, 交易所后缀, 公司数量权重)
+CODE_SEGMENTS = [
+    ('600', 'SH', 0.14), ('601', 'SH', 0.08), ('603', 'SH', 0.12), ('605', 'SH', 0.02),
+    ('000', 'SZ', 0.09), ('001', 'SZ', 0.02), ('002', 'SZ', 0.18), ('003', 'SZ', 0.01),
+    ('300', 'SZ', 0.16), ('301', 'SZ', 0.05), ('688', 'SH', 0.10),
+    ('83', 'BJ', 0.02), ('87', 'BJ', 0.005), ('43', 'BJ', 0.005),
+]
+
+REGIONS = np.array(['上海', '深圳', '北京', '浙江', '江苏', '广东', '山东', '四川', '湖南', '福建',
+                    '中国', '东方', '华夏', '天津', '安徽', '河南', '湖北', '重庆', '', '', '', ''])
+CORE_CHARS = np.array(list('华新康泰天宏达恒兴隆远鑫源盛瑞通安中金海宇博创联信润科'))
+INDUSTRIES = np.array(['科技', '电子', '能源', '银行', '医药', '交通', '化工', '机械', '传媒', '地产',
+                       '软件', '环保', '材料', '食品', '证券', '电气', '汽车', '通信', '信息', '生物'])
+SUFFIXES = np.array(['股份有限公司', '股份有限公司', '集团股份有限公司', '控股股份有限公司', ''])
+
+FIRST_YEAR, LAST_YEAR = 1999, 2023
+
+# 真实工作簿的列顺序（原始列名，识别后分别对应的标准列名见 loader.COMMON_PATTERNS）
+RAW_COLUMNS = ['序号', '证券代码', '企业名称 ', '会计年度', '所属行业', '技术维度', '应用维度', '数字化转型指数', '备注']
+
+# .xlsx 单个工作表的最大数据行数（不含表头）
+XLSX_MAX_ROWS = 1_048_575
+
+
+def make_codes(rng, n_companies):
+    """n_companies 个互不相同的六位代码（整数）和对应的交易所后缀"""
+    weights = np.array([weight for _, _, weight in CODE_SEGMENTS])
+    counts = rng.multinomial(n_companies, weights / weights.sum())
+    codes, exchanges = [], []
+    for (prefix, exchange, _), count in zip(CODE_SEGMENTS, counts):
+        width = 6 - len(prefix)
+        count = min(count, 10 ** width)
+        codes.append(int(prefix) * 10 ** width + rng.choice(10 ** width, count, replace=False))
+        exchanges.append(np.full(count, exchange))
+    codes, exchanges = np.concatenate(codes), np.concatenate(exchanges)
+
+    # 代码段容量不够时，其余公司使用未占用的六位代码
+    missing = n_companies - len(codes)
+    if missing > 0:
+        extra = rng.choice(np.setdiff1d(np.arange(1_000_000), codes), missing, replace=False)
+        codes = np.concatenate([codes, extra])
+        exchanges = np.concatenate([exchanges, np.where(extra >= 600_000, 'SH', 'SZ')])
+
+    order = rng.permutation(n_companies)
+    return codes[order], exchanges[order]
+
+
+def make_names(rng, n_companies):
+    """地区 + 两个字号用字 + 行业 + 公司类型组成的中文企业名称"""
+    names = REGIONS[rng.integers(0, len(REGIONS), n_companies)]
+    for _ in range(2):
+        names = np.char.add(names, CORE_CHARS[rng.integers(0, len(CORE_CHARS), n_companies)])
+    names = np.char.add(names, INDUSTRIES[rng.integers(0, len(INDUSTRIES), n_companies)])
+    return np.char.add(names, SUFFIXES[rng.integers(0, len(SUFFIXES), n_companies)])
+
+
+def make_panel(rng, n_rows):
+    """每家公司连续若干年的 (公司序号, 年份)，总行数恰为 n_rows"""
+    span = LAST_YEAR - FIRST_YEAR + 1
+    # 平均每家公司约 12 年，多估一些公司，最后截断到 n_rows 行
+    estimate = n_rows // 12 + 100
+    lengths = rng.integers(1, span + 1, estimate)
+    ends = np.cumsum(lengths)
+    n_companies = int(np.searchsorted(ends, n_rows)) + 1
+    lengths = lengths[:n_companies]
+    lengths[-1] -= ends[n_companies - 1] - n_rows
+    starts = FIRST_YEAR + rng.integers(0, span - lengths + 1)
+
+    company = np.repeat(np.arange(n_companies), lengths)
+    offsets = np.arange(n_rows) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return n_companies, company, starts[company] + offsets, offsets
+
+
+def make_clean_columns(n_rows, seed=0):
+    """干净的原始数据：返回 {标准列名: 数组} 和公司的交易所后缀（用于生成脏代码）"""
+    rng = np.random.default_rng(seed)
+    n_companies, company, years, age = make_panel(rng, n_rows)
+    codes, exchanges = make_codes(rng, n_companies)
+    names = make_names(rng, n_companies)
+
+    # 约 4% 的公司在某一年之后被冠以 ST / *ST
+    special = rng.random(n_companies) < 0.04
+    special_from = rng.integers(FIRST_YEAR, LAST_YEAR + 1, n_companies)
+    marked = special[company] & (years >= special_from[company])
+    row_names = names[company]
+    row_names = np.where(marked, np.char.add(np.where(rng.random(n_rows) < 0.5, 'ST', '*ST'), row_names), row_names)
+
+    # 指数 = 公司基础水平 + 逐年增长 + 噪声
+    base = rng.gamma(2.0, 6.0, n_companies)
+    growth = rng.normal(1.5, 1.0, n_companies)
+    index = base[company] + growth[company] * age + rng.normal(0, 2.0, n_rows)
+    index = np.round(np.maximum(index, 0), 4)
+
+    columns = {
+        '股票代码': codes[company],
+        '企业名称': row_names,
+        '年份': years,
+        '技术维度': np.minimum(rng.poisson(np.maximum(index / 4, 0.1)), 60),
+        '应用维度': np.minimum(rng.poisson(np.maximum(index / 5, 0.1)), 60),
+        '数字化转型指数': index,
+    }
+    return rng, columns, exchanges[company]
+
+
+def dirty_codes(rng, codes, exchanges):
+    """六位整数代码转为杂乱的代码列（object 数组）"""
+    n = len(codes)
+    text = np.char.zfill(codes.astype(str), 6)
+    kind = rng.random(n)
+    out = text.astype(object)
+
+    suffixed = kind < 0.06
+    out[suffixed] = np.char.add(np.char.add(text[suffixed], '.'), exchanges[suffixed]).astype(object)
+    prefixed = (kind >= 0.06) & (kind < 0.10)
+    out[prefixed] = np.char.add(np.char.lower(exchanges[prefixed]), text[prefixed]).astype(object)
+    # Excel 把代码当作数字保存时丢失前导零
+    numeric = (kind >= 0.10) & (kind < 0.15)
+    out[numeric] = codes[numeric].astype(object)
+    padded = (kind >= 0.15) & (kind < 0.17)
+    out[padded] = np.char.add(np.char.add(' ', text[padded]), ' ').astype(object)
+    out[kind >= 0.995] = np.nan
+    return out
+
+
+def dirty_years(rng, years):
+    """整数年份转为杂乱的年份列（object 数组）"""
+    n = len(years)
+    text = years.astype(str)
+    kind = rng.random(n)
+    out = years.astype(object)
+
+    out[kind < 0.10] = np.char.add(text[kind < 0.10], '年').astype(object)
+    dated = (kind >= 0.10) & (kind < 0.15)
+    out[dated] = np.char.add(text[dated], '-12-31').astype(object)
+    decimal = (kind >= 0.15) & (kind < 0.18)
+    out[decimal] = years[decimal].astype(float).astype(object)
+    out[(kind >= 0.18) & (kind < 0.182)] = '未知'
+    out[kind >= 0.997] = np.nan
+    return out
+
+
+def make_raw_frame(n_rows, seed=0):
+    """按真实工作簿的杂乱格式生成 n_rows 行原始数据（列名见 RAW_COLUMNS）"""
+    rng, columns, exchanges = make_clean_columns(n_rows, seed)
+    n = n_rows
+
+    names = columns['企业名称'].astype(object)
+    kind = rng.random(n)
+    names[kind < 0.02] = np.char.add(columns['企业名称'][kind < 0.02], ' ').astype(object)
+    names[kind >= 0.998] = np.nan
+
+    # 指数：少数单元格是文本形式的数字，少数缺失
+    index = columns['数字化转型指数'].astype(object)
+    kind = rng.random(n)
+    as_text = kind < 0.01
+    index[as_text] = columns['数字化转型指数'][as_text].astype(str).astype(object)
+    index[kind >= 0.99] = np.nan
+
+    return pd.DataFrame({
+        '序号': np.arange(1, n + 1),
+        '证券代码': dirty_codes(rng, columns['股票代码'], exchanges),
+        '企业名称 ': names,
+        '会计年度': dirty_years(rng, columns['年份']),
+        '所属行业': INDUSTRIES[rng.integers(0, len(INDUSTRIES), n)],
+        '技术维度': columns['技术维度'],
+        '应用维度': columns['应用维度'],
+        '数字化转型指数': index,
+        '备注': np.where(rng.random(n) < 0.01, '数据来源：年报', None),
+    }, columns=RAW_COLUMNS)
+
+
+def write_raw(df, path):
+    """写入 .xlsx（单个工作表）或 .csv（UTF-8 带 BOM，Excel 可直接打开）"""
+    if path.lower().endswith('.csv'):
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+    elif len(df) > XLSX_MAX_ROWS:
+        raise ValueError(f".xlsx 工作表最多 {XLSX_MAX_ROWS:,} 行数据，{len(df):,} 行请写成 .csv")
+    else:
+        df.to_excel(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成杂乱格式的模拟工作簿')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = make_raw_frame(args.rows, args.seed)
+    write_raw(df, args.output)
+    print(f"已写入 {args.output}：{len(df):,} 行，{os.path.getsize(args.output) / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""公司趋势图、多公司对比图和市场总览页的板块图
+
+多公司对比图把所有公司画在同一条 WebGL 折线里：每家公司一段折线，段与段之间用 NaN 断开，整个图只有一个 go.Scattergl，
+坐标直接取自公司 × 年份矩阵并以 float32 数组传给 plotly（序列化为二进制，不逐点写成 JSON 数字）。
+数据点较少时才显示数值标签；公司过多时在服务端先按平均指数均匀抽样。
+
+plotly 在第一次画图时才导入（页面脚本导入本模块不需要加载 plotly），preload() 可以在启动预热时提前导入。
+"""
+import numpy as np
+
+import timing
+
+# 数据点不超过该数量时在图上显示数值标签
+LABEL_THRESHOLD = 100
+
+# 超过该数量的公司按平均指数均匀抽样
+MAX_COMPANIES = 500
+
+# 公司数不超过该数量时悬停显示企业名称，否则只显示股票代码
+NAME_HOVER_LIMIT = 50
+
+
+def preload():
+    """导入画图用到的 plotly 模块（启动预热时调用，第一个会话画图时不再等待导入）"""
+    import plotly.express  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+
+
+def downsample_rows(matrix, rows, max_rows):
+    """行数超过 max_rows 时，按行平均值排序后等间隔抽取 max_rows 行（保留高、中、低各段）"""
+    if len(rows) <= max_rows:
+        return rows
+    with np.errstate(invalid='ignore'):
+        order = np.argsort(np.nanmean(matrix[rows], axis=1), kind='stable')
+    picks = np.linspace(0, len(rows) - 1, max_rows).round().astype(int)
+    return np.sort(rows[order[picks]])
+
+
+def segment_arrays(matrix, years, rows):
+    """把多行数据展开成用 NaN 分隔的一维 x/y 数组
+
+    同时返回每个点属于 rows 中的第几行（分隔点为 len(rows)），用于查找悬停标签。
+    """
+    block = matrix[rows]
+    n_rows, n_years = block.shape
+    keep = np.hstack([~np.isnan(block), np.ones((n_rows, 1), dtype=bool)])
+    x = np.empty((n_rows, n_years + 1), dtype=np.float32)
+    x[:, :n_years] = years
+    x[:, n_years] = np.nan
+    y = np.empty((n_rows, n_years + 1), dtype=np.float32)
+    y[:, :n_years] = block
+    y[:, n_years] = np.nan
+    owner = np.broadcast_to(np.arange(n_rows)[:, None], keep.shape).copy()
+    owner[:, n_years] = n_rows
+    return x[keep], y[keep], owner[keep]
+
+
+# 开启计时（见 timing.py）时额外序列化一次图表，统计发送给浏览器的字节数
+@timing.timed(
+    '构建对比图', rows=lambda result: result[1]['points'], size=lambda result: payload_size(result[0])
+)
+def comparison_figure(company_panel, codes, names=None, column='数字化转型指数',
+                      max_companies=MAX_COMPANIES, label_threshold=LABEL_THRESHOLD):
+    """多公司对比图
+
+    codes 为股票代码列表（不在数据中的忽略），names 为可选的 {股票代码: 企业名称}。
+    返回 (figure, info)，info 包含 companies（画出的公司数）、requested（有数据的公司数）
+    和 points（数据点数）。
+    """
+    rows = np.array(
+        sorted({company_panel.row(code) for code in codes if code in company_panel}),
+        dtype=np.int64
+    )
+    matrix = company_panel.matrix(column)
+    requested = len(rows)
+    rows = downsample_rows(matrix, rows, max_companies)
+    x, y, owner = segment_arrays(matrix, company_panel.years, rows)
+    points = int(np.count_nonzero(~np.isnan(y)))
+
+    trace = dict(
+        x=x,
+        y=y,
+        mode='lines+markers',
+        line=dict(width=1),
+        marker=dict(size=4),
+        opacity=0.8 if len(rows) <= NAME_HOVER_LIMIT else 0.5,
+        connectgaps=False,
+        showlegend=False,
+    )
+    selected_codes = [company_panel.codes[row] for row in rows]
+    if len(rows) <= NAME_HOVER_LIMIT:
+        names = names or {}
+        labels = [f"{code} {names.get(code, '')}".strip() for code in selected_codes]
+        trace['hovertext'] = np.array(labels + [''], dtype=object)[owner]
+        trace['hovertemplate'] = '%{hovertext}<br>%{x:.0f}年: %{y:.2f}<extra></extra>'
+    elif all(code.isdigit() and len(code) <= 6 for code in selected_codes):
+        # 公司较多时把代码作为整数数组传递（序列化为二进制），悬停时补齐前导零
+        numeric = np.array([int(code) for code in selected_codes] + [0], dtype=np.int32)
+        trace['customdata'] = numeric[owner]
+        trace['hovertemplate'] = '%{customdata:06d}<br>%{x:.0f}年: %{y:.2f}<extra></extra>'
+    else:
+        trace['hovertext'] = np.array(selected_codes + [''], dtype=object)[owner]
+        trace['hovertemplate'] = '%{hovertext}<br>%{x:.0f}年: %{y:.2f}<extra></extra>'
+
+    if points <= label_threshold:
+        trace['mode'] = 'lines+markers+text'
+        trace['text'] = np.where(np.isnan(y), '', np.char.mod('%.2f', y)).astype(object)
+        trace['textposition'] = 'top center'
+
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scattergl(**trace))
+    fig.update_layout(
+        xaxis=dict(title='年份', tickmode='linear', dtick=1),
+        yaxis=dict(title=column),
+        hovermode='closest',
+        height=550,
+        plot_bgcolor='rgba(240,240,240,0.8)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig, {'companies': len(rows), 'requested': requested, 'points': points}
+
+
+def payload_size(fig):
+    """图表 JSON（发送给浏览器的内容）的字节数"""
+    return len(fig.to_json().encode('utf-8'))
+
+
+@timing.timed('构建趋势图', rows=lambda fig: len(fig.data[0].x), size=payload_size)
+def trend_figure(trend_df, title):
+    """单家公司的历年趋势图：平滑折线加带数值标签的数据点
+
+    trend_df 为 engine.trend_frame 的结果（每个年份一行）。
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    fig = px.line(
+        trend_df,
+        x='年份',
+        y='数字化转型指数',
+        markers=True,
+        title=title,
+        labels={'数字化转型指数': '指数值', '年份': '年份'},
+        line_shape='spline'
+    )
+
+    # 添加数据点
+    fig.add_trace(go.Scatter(
+        x=trend_df['年份'],
+        y=trend_df['数字化转型指数'],
+        mode='markers+text',
+        text=trend_df['数字化转型指数'].round(2),
+        textposition='top center',
+        marker=dict(size=10, color='red'),
+        showlegend=False
+    ))
+
+    # 更新图表样式
+    fig.update_layout(
+        plot_bgcolor='rgba(240,240,240,0.8)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12),
+        height=400,
+        xaxis=dict(tickmode='linear', dtick=1)
+    )
+
+    fig.update_traces(
+        line=dict(color='#1f77b4', width=3),
+        marker=dict(size=8)
+    )
+    return fig
+
+
+def add_peers(fig, company_panel, peers_df, company_name):
+    """在趋势图上用虚线叠加走势相似的公司（peers_df 为 Engine.similar_companies 的结果）"""
+    import plotly.graph_objects as go
+
+    for peer_code, peer_name in zip(peers_df['股票代码'], peers_df['企业名称']):
+        peer_trend = company_panel.series(peer_code)
+        fig.add_trace(go.Scatter(
+            x=peer_trend.index,
+            y=peer_trend.values,
+            mode='lines+markers',
+            name=f"{peer_code} {peer_name}",
+            line=dict(dash='dash', width=1.5),
+            marker=dict(size=4),
+            opacity=0.7
+        ))
+    if not peers_df.empty:
+        fig.data[0].update(name=company_name, showlegend=True)
+        fig.update_layout(showlegend=True)
+    return fig
+
+
+@timing.timed('构建市场走势图', rows=None, size=payload_size)
+def market_figure(view, value_column, label):
+    """各板块某项统计量的历年走势（view 为市场立方体中选中板块的行）"""
+    import plotly.express as px
+
+    fig = px.line(
+        view,
+        x='年份',
+        y=value_column,
+        color='板块',
+        markers=True,
+        labels={value_column: label}
+    )
+    fig.update_layout(
+        xaxis=dict(tickmode='linear', dtick=1),
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+
+@timing.timed('构建板块记录数图', rows=None, size=payload_size)
+def board_count_figure(counts):
+    """各板块历年记录数的柱状图"""
+    import plotly.express as px
+
+    fig = px.bar(counts, x='年份', y='记录数', color='板块')
+    fig.update_layout(xaxis=dict(tickmode='linear', dtick=1), height=400)
+    return fig
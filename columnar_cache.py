@@ -0,0 +1,205 @@
+"""清洗后数据的列式磁盘缓存
+
+Excel 工作簿只在第一次（或文件变化后）解析和清洗，结果以 Parquet 格式保存在源文件旁边的
+隐藏目录中。缓存以源文件的绝对路径、大小和修改时间为键，任一项变化即视为失效。
+
+数据按年份分区保存，每个年份一个目录（年份=1999/part.parquet，与 Hive 分区的命名相同），
+分区列表直接取自目录结构。只需要某些年份时（read_cache 的 years 参数）只读取这些分区，
+不读取、不过滤其余年份；读取全部分区时按保存的行位置恢复原来的 (股票代码, 年份) 顺序。
+"""
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 没有 pyarrow 时缓存退回 pickle 格式
+    pa = pq = None
+
+# 本进程中正在写入的数据目录（其他线程清理旧数据时跳过）
+_writing = set()
+_writing_lock = threading.Lock()
+
+# 缓存格式版本，清洗规则或存储布局变化时递增，使旧缓存失效
+CACHE_VERSION = 5
+
+META_FILE = 'meta.json'
+
+# 分区目录名：年份=1999
+PARTITION_PREFIX = '年份='
+PARTITION_FILE = 'part.parquet'
+
+# 旧版本（未分区）缓存的数据文件名，写入新缓存时删除
+LEGACY_DATA = ('data.parquet', 'data.pkl')
+
+
+def cache_dir(source_path):
+    """返回源文件对应的缓存目录（与源文件同目录）"""
+    folder, name = os.path.split(os.path.abspath(source_path))
+    return os.path.join(folder, f'.{name}.cache')
+
+
+def source_key(source_path):
+    """根据源文件的路径、大小和修改时间生成缓存键"""
+    stat = os.stat(source_path)
+    return {
+        'path': os.path.abspath(source_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'version': CACHE_VERSION,
+    }
+
+
+def version_of(key):
+    """缓存键对应的数据版本标识（源文件的修改时间和大小），用于界面显示"""
+    modified = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(key['mtime_ns'] / 1e9))
+    return f"{modified} · {key['size']:,} 字节"
+
+
+def read_meta(source_path):
+    """读取有效缓存的元数据；缓存不存在或已失效时返回 None"""
+    try:
+        with open(os.path.join(cache_dir(source_path), META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+    except Exception:
+        return None
+    if meta.get('key') != source_key(source_path):
+        return None
+    return meta
+
+
+def partition_years(data_path):
+    """分区数据目录中的所有年份（升序），取自目录名"""
+    years = []
+    for name in os.listdir(data_path):
+        if name.startswith(PARTITION_PREFIX) and os.path.isfile(os.path.join(data_path, name, PARTITION_FILE)):
+            years.append(int(name[len(PARTITION_PREFIX):]))
+    return sorted(years)
+
+
+def read_partitions(data_path, years=None):
+    """读取分区数据；years 为 None 时读取全部分区并恢复原行顺序，否则只读取这些年份的分区
+
+    结果以原数据表中的行位置为索引，与在完整数据表上按年份筛选的结果相同。
+    """
+    available = partition_years(data_path)
+    wanted = available if years is None else sorted(set(int(year) for year in years) & set(available))
+    files = [os.path.join(data_path, f'{PARTITION_PREFIX}{year}', PARTITION_FILE) for year in wanted]
+    if not files:
+        # 没有匹配的分区：返回列结构相同的空表
+        first = os.path.join(data_path, f'{PARTITION_PREFIX}{available[0]}', PARTITION_FILE)
+        return pq.read_table(first).to_pandas().iloc[:0]
+    # 各分区先在 Arrow 中拼接，只转换一次 DataFrame
+    table = pa.concat_tables([pq.read_table(path) for path in files])
+    df = table.to_pandas()
+    if len(files) > 1:
+        # 各分区内的行保持原顺序，按保存的行位置放回原来的位置
+        df = df.iloc[np.argsort(df.index.to_numpy(), kind='stable')]
+    if years is None:
+        df = df.reset_index(drop=True)
+    return df
+
+
+def read_cache(source_path, years=None):
+    """读取有效的缓存，返回 (df, meta)；缓存不存在或已失效时返回 None
+
+    给出 years 时只读取这些年份的分区（结果以原数据表中的行位置为索引）。
+    """
+    meta = read_meta(source_path)
+    if meta is None:
+        return None
+    try:
+        data_path = os.path.join(cache_dir(source_path), meta['data'])
+        if meta['format'] == 'parquet':
+            df = read_partitions(data_path, years)
+        else:
+            df = pd.read_pickle(data_path)
+            if years is not None:
+                df = df[df['年份'].isin([int(year) for year in years])]
+        return df, meta
+    except Exception:
+        return None
+
+
+def write_cache(source_path, df, key, **extra):
+    """写入缓存；key 应在读取源文件之前通过 source_key 获取
+
+    优先使用按年份分区的 Parquet（每个分区保存原数据表中的行位置作为索引）；若某些列无法用
+    Parquet 表示（如混合类型的对象列），退回单个 pickle 文件，保证读回的 DataFrame 与写入时
+    完全一致。每次写入一个新的数据目录，元数据切换到新目录后再删除旧目录。写入失败不影响正常加载。
+    数据目录和临时文件名包含进程号和线程号，同一进程中的多个线程（如启动预热、查询接口和热更新）
+    同时为同一个源文件写缓存时互不覆盖。
+    """
+    folder = cache_dir(source_path)
+    writer = f"{os.getpid()}-{threading.get_ident()}"
+    generation = f"data-{key['mtime_ns']}-{writer}"
+    with _writing_lock:
+        _writing.add(generation)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        try:
+            if df.empty:
+                raise ValueError('空表不分区')
+            data_name, fmt = generation, 'parquet'
+            write_partitions(df, os.path.join(folder, data_name))
+        except Exception:
+            shutil.rmtree(os.path.join(folder, generation), ignore_errors=True)
+            data_name, fmt = f'{generation}.pkl', 'pickle'
+            df.to_pickle(os.path.join(folder, data_name))
+
+        # 元数据最后写入，保证读到的元数据总是指向完整的数据文件
+        meta = dict(extra, key=key, data=data_name, format=fmt)
+        meta_tmp = os.path.join(folder, f'{META_FILE}.{writer}.tmp')
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=str)
+        os.replace(meta_tmp, os.path.join(folder, META_FILE))
+        remove_stale_data(folder, data_name)
+        return True
+    except Exception:
+        return False
+    finally:
+        with _writing_lock:
+            _writing.discard(generation)
+
+
+def write_partitions(df, data_path):
+    """按年份把数据表写成分区目录，每个分区保留各行在原表中的位置
+
+    整表先一次转换为 Arrow 表，所有分区使用同一个结构（无法转换时抛出异常，由调用方退回 pickle）。
+    """
+    if pq is None:
+        raise ImportError('写入 Parquet 需要 pyarrow')
+    positioned = df.set_axis(pd.Index(np.arange(len(df), dtype=np.int64)))
+    table = pa.Table.from_pandas(positioned, preserve_index=True)
+    os.makedirs(data_path)
+    years = df['年份'].to_numpy()
+    order = np.argsort(years, kind='stable')
+    bounds = np.flatnonzero(np.diff(years[order])) + 1
+    for rows in np.split(order, bounds):
+        part_dir = os.path.join(data_path, f'{PARTITION_PREFIX}{int(years[rows[0]])}')
+        os.makedirs(part_dir)
+        pq.write_table(table.take(rows), os.path.join(part_dir, PARTITION_FILE))
+
+
+def remove_stale_data(folder, current):
+    """删除缓存目录中不再被元数据引用的旧数据目录和文件（跳过本进程中其他线程正在写入的）"""
+    with _writing_lock:
+        writing = set(_writing)
+    for name in os.listdir(folder):
+        if name.removesuffix('.pkl') in writing:
+            continue
+        if (name.startswith('data-') or name in LEGACY_DATA) and name != current:
+            path = os.path.join(folder, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -1,9 +1,10 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import os
-import re
+
+import app_common
+import charts
+import engine
+import timing
 
 # 设置页面配置
 st.set_page_config(
@@ -18,277 +19,29 @@ if 'selected_year' not in st.session_state:
 if 'search_input' not in st.session_state:
     st.session_state.search_input = ""
 
+# 加载数据（共享的只读数据集，df 是本次运行的写时复制视图）
+query_engine = app_common.get_engine()
+df = query_engine.frame
+
+# 时间范围取自数据（追加增量文件后自动包含新年份）
+data_years = query_engine.years
+year_span = f"{data_years[0]}-{data_years[-1]}" if data_years else "未知"
+
 # 标题部分
 st.title("上市公司数字化转型指数查询系统")
-st.markdown("### 查询1999-2023年上市公司的数字化转型指数数据")
+st.markdown(f"### 查询{year_span}年上市公司的数字化转型指数数据")
 
 # 数据来源信息
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("数据总量", "51,152")
+    st.metric("数据总量", f"{len(df):,}")
 with col2:
-    st.metric("上市公司数量", "11,817")
+    st.metric("上市公司数量", f"{query_engine.company_count:,}")
 with col3:
-    st.metric("时间范围", "1999-2023")
+    st.metric("时间范围", year_span)
 
 st.markdown("---")
 
-# 加载数据 - 修复版本
-@st.cache_data
-def load_data():
-    """加载Excel数据"""
-    try:
-        # 请修改为您的实际文件路径
-        excel_path = r'C:\Users\HUMENGQI\Desktop\1999-2023年数字化转型指数汇总.xlsx'
-        
-        if not os.path.exists(excel_path):
-            st.warning(f"文件不存在: {excel_path}")
-            return None
-        
-        # 读取Excel文件
-        df = pd.read_excel(excel_path)
-        
-        # 显示原始列名用于调试
-        with st.sidebar.expander("📊 数据列名信息", expanded=False):
-            st.write(f"原始列名: {list(df.columns)}")
-            st.write(f"数据形状: {df.shape}")
-        
-        # 标准化列名 - 去掉空格和特殊字符
-        df.columns = [str(col).strip().replace('\n', '').replace('\r', '') for col in df.columns]
-        
-        # 尝试找到正确的列名 - 更加智能的检测
-        column_mapping = {}
-        
-        # 第一步：尝试常见的列名模式
-        common_patterns = {
-            '股票代码': ['股票代码', '证券代码', '代码', 'stock_code', 'code', 'ticker'],
-            '企业名称': ['企业名称', '公司名称', '名称', 'company_name', 'name'],
-            '年份': ['年份', '年', 'year', '年度', '会计年度'],
-            '数字化转型指数': ['数字化转型指数', '数字化指数', '转型指数', '数字指数', 'digital_index', 'digital_score'],
-            '技术维度': ['技术维度', '技术', 'technology', 'tech'],
-            '应用维度': ['应用维度', '应用', 'application', 'app']
-        }
-        
-        for standard_name, possible_names in common_patterns.items():
-            found = False
-            for col in df.columns:
-                col_lower = str(col).lower()
-                for pattern in possible_names:
-                    if pattern in col_lower or col_lower in pattern:
-                        column_mapping[col] = standard_name
-                        found = True
-                        break
-                if found:
-                    break
-        
-        # 如果自动映射不成功，尝试手动检查特定列
-        if not column_mapping.get('数字化转型指数'):
-            # 寻找可能是数字化转型指数的列
-            for col in df.columns:
-                col_str = str(col)
-                # 检查列名是否包含数字或特定关键词
-                if any(keyword in col_str for keyword in ['指数', 'score', 'index', 'value', '数值']):
-                    # 检查列数据类型是否为数值型
-                    if pd.api.types.is_numeric_dtype(df[col]):
-                        column_mapping[col] = '数字化转型指数'
-                        break
-        
-        # 如果仍然没有找到数字化转型指数列，使用第一个数值列
-        if not column_mapping.get('数字化转型指数'):
-            for col in df.columns:
-                try:
-                    # 尝试转换为数值型
-                    test_series = pd.to_numeric(df[col].head(100), errors='coerce')
-                    if test_series.notna().sum() > 0:  # 如果有数值数据
-                        column_mapping[col] = '数字化转型指数'
-                        break
-                except:
-                    continue
-        
-        # 应用列名映射
-        if column_mapping:
-            df = df.rename(columns=column_mapping)
-            with st.sidebar.expander("📊 列名映射结果", expanded=False):
-                st.write(f"列名映射: {column_mapping}")
-                st.write(f"映射后列名: {list(df.columns)}")
-        
-        # 确保必要的列存在，如果不存在则创建
-        required_columns = ['股票代码', '企业名称', '年份', '数字化转型指数']
-        for col in required_columns:
-            if col not in df.columns:
-                st.warning(f"未找到列: {col}，将创建空列")
-                df[col] = ''
-        
-        # 清理和转换数据
-        # 1. 股票代码处理 - 支持所有开头的股票代码
-        if '股票代码' in df.columns:
-            # 将股票代码转换为字符串并清理
-            df['股票代码'] = df['股票代码'].astype(str).str.strip()
-            
-            # 处理股票代码的函数 - 支持所有开头的代码
-            def clean_stock_code(code):
-                if pd.isna(code) or code == 'nan':
-                    return ''
-                # 转换为字符串
-                code_str = str(code)
-                # 移除非数字字符
-                digits = ''.join(filter(str.isdigit, code_str))
-                
-                # 支持不同长度的股票代码
-                if len(digits) == 6:
-                    return digits
-                elif len(digits) > 6:
-                    return digits[:6]  # 取前6位
-                elif len(digits) < 6 and len(digits) > 0:
-                    # 对于少于6位的代码，前面补0
-                    return digits.zfill(6)
-                else:
-                    return ''
-            
-            # 应用清理函数
-            df['股票代码'] = df['股票代码'].apply(clean_stock_code)
-        
-        # 2. 企业名称处理
-        if '企业名称' in df.columns:
-            df['企业名称'] = df['企业名称'].astype(str).str.strip()
-        
-        # 3. 年份处理 - 更加健壮的方法
-        if '年份' in df.columns:
-            try:
-                # 尝试多种方法转换年份
-                df['年份'] = df['年份'].astype(str)
-                
-                # 提取4位数字年份
-                def extract_year(x):
-                    if pd.isna(x) or x == 'nan':
-                        return 1999
-                    x_str = str(x)
-                    # 查找4位数字
-                    matches = re.findall(r'\d{4}', x_str)
-                    if matches:
-                        try:
-                            year = int(matches[0])
-                            if 1900 <= year <= 2100:  # 合理的年份范围
-                                return year
-                        except:
-                            pass
-                    
-                    # 如果没有找到，尝试2位数字年份
-                    matches2 = re.findall(r'\d{2}', x_str)
-                    if matches2:
-                        try:
-                            year2 = int(matches2[0])
-                            # 假设是20世纪的年份
-                            if 0 <= year2 <= 99:
-                                return 1900 + year2
-                        except:
-                            pass
-                    
-                    return 1999  # 默认值
-                
-                df['年份'] = df['年份'].apply(extract_year)
-                df['年份'] = df['年份'].astype(int)
-                
-            except Exception as e:
-                st.warning(f"年份处理警告: {str(e)}")
-                df['年份'] = 1999
-        
-        # 4. 数字化转型指数处理 - 关键修复部分
-        if '数字化转型指数' in df.columns:
-            try:
-                # 先尝试直接转换
-                original_data = df['数字化转型指数'].copy()
-                
-                # 方法1: 尝试转换为数值
-                df['数字化转型指数'] = pd.to_numeric(df['数字化转型指数'], errors='coerce')
-                
-                # 如果转换后都是NaN，尝试其他方法
-                if df['数字化转型指数'].isna().all():
-                    # 方法2: 尝试从字符串提取数字
-                    if original_data.dtype == 'object':
-                        # 提取所有数字（包括小数）
-                        df['数字化转型指数'] = original_data.astype(str).str.extract(r'([-+]?\d*\.\d+|[-+]?\d+)')[0]
-                        df['数字化转型指数'] = pd.to_numeric(df['数字化转型指数'], errors='coerce')
-                
-                # 填充缺失值为0
-                df['数字化转型指数'] = df['数字化转型指数'].fillna(0)
-                
-                # 确保是浮点数类型
-                df['数字化转型指数'] = df['数字化转型指数'].astype(float)
-                
-            except Exception as e:
-                st.error(f"数字化转型指数处理错误: {str(e)}")
-                # 创建默认的数字化转型指数
-                df['数字化转型指数'] = 0.0
-        
-        # 5. 处理技术维度和应用维度
-        for col in ['技术维度', '应用维度']:
-            if col in df.columns:
-                try:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-                except:
-                    df[col] = 0
-        
-        # 显示数据基本信息
-        with st.sidebar.expander("📊 数据统计信息", expanded=False):
-            st.write(f"数据总行数: {len(df)}")
-            if '年份' in df.columns:
-                st.write(f"年份范围: {df['年份'].min()} - {df['年份'].max()}")
-                st.write(f"唯一年份数: {len(df['年份'].unique())}")
-            if '数字化转型指数' in df.columns:
-                # 安全获取最小值和最大值
-                try:
-                    min_val = float(df['数字化转型指数'].min())
-                    max_val = float(df['数字化转型指数'].max())
-                    st.write(f"数字化转型指数范围: {min_val:.2f} - {max_val:.2f}")
-                except:
-                    st.write(f"数字化转型指数范围: 数据异常")
-        
-        return df
-        
-    except Exception as e:
-        st.error(f"数据加载失败：{str(e)}")
-        import traceback
-        st.error(traceback.format_exc())
-        return None
-
-# 加载数据
-df = load_data()
-
-# 如果数据加载失败，使用示例数据
-if df is None or df.empty:
-    st.warning("📊 使用示例数据进行演示")
-    
-    # 创建更完整的示例数据 - 包含不同开头的股票代码
-    sample_years = list(range(1999, 2024))
-    all_data = []
-    
-    companies = [
-        {'股票代码': '600611', '企业名称': '大众交通'},  # 6开头 - 沪市主板
-        {'股票代码': '000001', '企业名称': '平安银行'},  # 0开头 - 深市主板
-        {'股票代码': '300750', '企业名称': '宁德时代'},  # 3开头 - 创业板
-        {'股票代码': '688981', '企业名称': '中芯国际'},  # 688开头 - 科创板
-        {'股票代码': '002415', '企业名称': '海康威视'},  # 002开头 - 中小板
-    ]
-    
-    for company in companies:
-        for year in sample_years:
-            # 模拟逐年增长的数据
-            base_index = 2.4 if company['股票代码'] == '600611' else 2.0
-            growth = (year - 1999) * 0.1
-            index_value = max(0, base_index + growth)
-            
-            all_data.append({
-                '股票代码': company['股票代码'],
-                '企业名称': company['企业名称'],
-                '年份': year,
-                '技术维度': min(10, (year - 1999) // 2),
-                '应用维度': min(10, (year - 1999) // 3),
-                '数字化转型指数': round(index_value, 2)
-            })
-    
-    df = pd.DataFrame(all_data)
-
 # 创建侧边栏
 with st.sidebar:
     st.header("🔍 查询设置")
@@ -301,6 +54,7 @@ with st.sidebar:
     )
     
     # 根据搜索方式显示不同的输入框
+    suggestion_picked = False
     if search_type == "股票代码":
         st.session_state.search_input = st.text_input(
             "输入股票代码",
@@ -308,6 +62,22 @@ with st.sidebar:
             placeholder="例如：600611、000001、300750等",
             help="支持各种开头的股票代码：0开头(深市)、3开头(创业板)、6开头(沪市)、688开头(科创板)等"
         )
+        
+        # 输入部分代码时显示前缀匹配的候选公司，选中后直接查询
+        typed_code = ''.join(filter(str.isdigit, st.session_state.search_input))
+        if typed_code and not query_engine.has_code(typed_code):
+            suggestions = dict(query_engine.suggest_codes(typed_code, k=10))
+            if suggestions:
+                picked = st.selectbox(
+                    "匹配的股票代码",
+                    options=list(suggestions),
+                    index=None,
+                    format_func=lambda code: f"{code} {suggestions[code]}",
+                    placeholder=f"以 {typed_code} 开头的代码（选择后直接查询）"
+                )
+                if picked is not None:
+                    st.session_state.search_input = picked
+                    suggestion_picked = True
     else:
         st.session_state.search_input = st.text_input(
             "输入企业名称",
@@ -316,41 +86,29 @@ with st.sidebar:
             help="请输入完整的上市公司名称"
         )
     
-    # 年份选择 - 基于实际数据
-    if df is not None and '年份' in df.columns:
-        # 获取所有唯一年份并排序
-        all_years = sorted(df['年份'].unique())
-        all_years = [int(year) for year in all_years if pd.notna(year)]
-        
-        # 显示1999-2023年的选项
-        display_years = list(range(1999, 2024))
-        
-        # 创建年份选择列表
-        year_options = ["全部年份"] + display_years
-        
-        # 年份选择框
-        st.session_state.selected_year = st.selectbox(
-            "选择年份（可选）",
-            options=year_options,
-            index=0,
-            help="选择特定年份进行查询，或选择全部年份查看趋势"
-        )
-    else:
-        # 如果数据中没有年份，使用默认范围
-        years = list(range(1999, 2024))
-        st.session_state.selected_year = st.selectbox(
-            "选择年份（可选）",
-            ["全部年份"] + years,
-            index=0,
-            help="选择特定年份进行查询，或选择全部年份查看趋势"
-        )
+    # 年份选择 - 只提供数据中出现的年份（追加增量数据后随之更新）
+    st.session_state.selected_year = st.selectbox(
+        "选择年份（可选）",
+        options=["全部年份"] + [int(year) for year in query_engine.years],
+        index=0,
+        help="选择特定年份进行查询，或选择全部年份查看趋势"
+    )
+    
+    # 趋势图上叠加走势相似的公司（按双方都有数据的年份计算距离，见 similarity.py）
+    similar_count = st.slider(
+        "叠加走势相似的公司数",
+        min_value=0,
+        max_value=10,
+        value=0,
+        help="查询单个公司的全部年份时，在趋势图上用虚线叠加走势最接近的公司"
+    )
     
-    # 执行查询按钮
+    # 执行查询按钮（选中候选代码时也直接执行查询）
     execute_query = st.button(
         "🚀 执行查询",
         type="primary",
         use_container_width=True
-    )
+    ) or suggestion_picked
     
     st.markdown("---")
     st.markdown("### 使用说明")
@@ -364,7 +122,7 @@ with st.sidebar:
     """)
     
     st.markdown("---")
-    st.caption("数据来源：1999-2023年数字转型指数总表")
+    st.caption(f"数据来源：{min(query_engine.years)}-{max(query_engine.years)}年数字转型指数总表")
     st.caption("更新时间：2024年")
 
 # 显示数据基本信息
@@ -415,27 +173,15 @@ if execute_query:
         
         if search_type == "股票代码":
             try:
-                # 清理输入的数字
-                search_code = ''.join(filter(str.isdigit, search_text))
-                if len(search_code) > 6:
-                    search_code = search_code[:6]
-                elif len(search_code) < 6 and len(search_code) > 0:
-                    search_code = search_code.zfill(6)
-                
-                # 搜索匹配的数据
-                result_df = df[df['股票代码'].astype(str) == search_code]
-                
-                # 如果找不到，尝试模糊搜索
-                if result_df.empty:
-                    result_df = df[df['股票代码'].astype(str).str.contains(search_code, na=False)]
-                    
+                # 先精确匹配，找不到时尝试模糊搜索
+                result_df = query_engine.lookup_code(search_text)
             except Exception as e:
                 st.error(f"股票代码搜索出错: {str(e)}")
         
         else:  # 搜索方式为"企业名称"
             # 企业名称模糊搜索
             try:
-                result_df = df[df['企业名称'].astype(str).str.contains(search_text, na=False, case=False)]
+                result_df = query_engine.search_name(search_text)
             except Exception as e:
                 st.error(f"企业名称搜索出错: {str(e)}")
         
@@ -451,10 +197,9 @@ if execute_query:
             
             # 显示相似的企业名称供参考
             if search_type == "企业名称" and len(search_text) >= 2:
-                similar_companies = df[df['企业名称'].astype(str).str.contains(search_text[:2], na=False, case=False)]
-                if not similar_companies.empty:
+                similar_display = query_engine.similar_names(search_text, limit=5)
+                if not similar_display.empty:
                     st.info("相似的公司名称:")
-                    similar_display = similar_companies[['股票代码', '企业名称']].drop_duplicates().head(5)
                     st.dataframe(similar_display, use_container_width=True)
         else:
             # 获取选择的年份
@@ -462,7 +207,7 @@ if execute_query:
             
             # 如果选择了特定年份，则进行筛选
             if selected_year != "全部年份" and '年份' in result_df.columns:
-                result_df = result_df[result_df['年份'] == int(selected_year)]
+                result_df = query_engine.filter_year(result_df, selected_year)
             
             # 显示查询结果
             st.success(f"✅ 找到 {len(result_df)} 条记录")
@@ -492,70 +237,72 @@ if execute_query:
                             st.metric("数据年份范围", years_range)
                         else:
                             st.metric("年份信息", "未知")
+                
+                # 选择了特定年份时，显示该公司在当年所有公司中的排名（加载时预先计算）
+                if selected_year != "全部年份" and '年度排名' in result_df.columns:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        year_total = query_engine.year_count(selected_year)
+                        st.metric("年度排名", f"{int(company_info['年度排名'])} / {year_total:,}")
+                    with col2:
+                        st.metric("年度百分位", f"{company_info['年度百分位']:.1f}%")
             
             # 如果是多年份数据，显示趋势图
             if selected_year == "全部年份" and len(result_df) > 1 and '年份' in result_df.columns:
                 # 按年份排序并去重（每个年份只保留一条记录）
-                trend_df = result_df.sort_values('年份').drop_duplicates('年份')
+                trend_df = engine.trend_frame(result_df)
                 
                 if len(trend_df) > 1:
                     st.subheader("📈 数字化转型指数趋势图")
                     
-                    # 确保年份为整数
-                    trend_df['年份'] = trend_df['年份'].astype(int)
-                    
                     # 创建趋势图
-                    fig = px.line(
-                        trend_df,
-                        x='年份',
-                        y='数字化转型指数',
-                        markers=True,
-                        title=f"{company_info['企业名称']} 数字化转型指数趋势",
-                        labels={'数字化转型指数': '指数值', '年份': '年份'},
-                        line_shape='spline'
-                    )
+                    fig = charts.trend_figure(trend_df, f"{company_info['企业名称']} 数字化转型指数趋势")
                     
-                    # 添加数据点
-                    fig.add_trace(go.Scatter(
-                        x=trend_df['年份'],
-                        y=trend_df['数字化转型指数'],
-                        mode='markers+text',
-                        text=trend_df['数字化转型指数'].round(2),
-                        textposition='top center',
-                        marker=dict(size=10, color='red'),
-                        showlegend=False
-                    ))
+                    # 叠加走势相似的公司（虚线）
+                    peers_df = pd.DataFrame()
+                    if similar_count > 0 and result_df['股票代码'].nunique() == 1:
+                        peers_df = query_engine.similar_companies(stock_code, k=similar_count)
+                        charts.add_peers(fig, query_engine.panel, peers_df, company_name)
                     
-                    # 更新图表样式
-                    fig.update_layout(
-                        plot_bgcolor='rgba(240,240,240,0.8)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        font=dict(size=12),
-                        height=400,
-                        xaxis=dict(tickmode='linear', dtick=1)
-                    )
+                    with timing.phase('显示图表'):
+                        st.plotly_chart(fig, use_container_width=True)
                     
-                    fig.update_traces(
-                        line=dict(color='#1f77b4', width=3),
-                        marker=dict(size=8)
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    if not peers_df.empty:
+                        st.subheader("🧭 走势相似的公司")
+                        st.caption("距离为双方都有数据的年份上指数差的均方根，越小越相似")
+                        peers_display = peers_df.round({'距离': 2})
+                        peers_display.index = peers_display.index + 1
+                        st.dataframe(peers_display, use_container_width=True)
                     
                     # 添加统计分析
-                    if '数字化转型指数' in trend_df.columns:
+                    # 单个公司直接读取预先计算的汇总统计，多家公司混合的结果按趋势数据计算
+                    if result_df['股票代码'].nunique() == 1:
+                        stats = query_engine.stats(stock_code)
+                    else:
+                        stats = engine.trend_stats(trend_df)
+                    if stats is not None:
                         st.subheader("📊 统计分析")
                         col1, col2, col3, col4 = st.columns(4)
                         
                         with col1:
-                            st.metric("最高指数", f"{trend_df['数字化转型指数'].max():.2f}")
+                            st.metric("最高指数", f"{stats['max']:.2f}")
                         with col2:
-                            st.metric("最低指数", f"{trend_df['数字化转型指数'].min():.2f}")
+                            st.metric("最低指数", f"{stats['min']:.2f}")
                         with col3:
-                            st.metric("平均指数", f"{trend_df['数字化转型指数'].mean():.2f}")
+                            st.metric("平均指数", f"{stats['mean']:.2f}")
                         with col4:
-                            growth = trend_df['数字化转型指数'].iloc[-1] - trend_df['数字化转型指数'].iloc[0]
-                            st.metric("总增长", f"{growth:.2f}")
+                            st.metric("总增长", f"{stats['growth']:.2f}")
+                        
+                        if stats.get('cagr') is not None and pd.notna(stats['cagr']):
+                            st.caption(
+                                f"{stats['first_year']}-{stats['last_year']} 年共 {stats['n_years']} 年数据，"
+                                f"年均复合增长率 {stats['cagr']:.2%}"
+                            )
+                        
+                        if result_df['股票代码'].nunique() == 1:
+                            changes = query_engine.yoy(stock_code)
+                            if not changes.empty:
+                                st.caption(f"最近一次同比变化（{changes.index[-1]}年）: {changes.iloc[-1]:+.2f}")
                 
                 # 如果数据不够绘制趋势图，显示提示
                 elif len(trend_df) == 1:
@@ -579,23 +326,28 @@ if execute_query:
             
             # 选择要显示的列
             display_columns = []
-            for col in ['年份', '股票代码', '企业名称', '技术维度', '应用维度', '数字化转型指数']:
+            for col in ['年份', '股票代码', '企业名称', '技术维度', '应用维度', '数字化转型指数', '年度排名', '年度百分位']:
                 if col in display_df.columns:
                     display_columns.append(col)
             
             # 格式化数字化转型指数
             if '数字化转型指数' in display_df.columns:
                 display_df['数字化转型指数'] = display_df['数字化转型指数'].round(2)
+            if '年度百分位' in display_df.columns:
+                display_df['年度百分位'] = display_df['年度百分位'].round(1)
             
             # 显示表格
-            st.dataframe(
-                display_df[display_columns],
-                use_container_width=True,
-                height=min(400, len(display_df) * 35 + 38)
-            )
+            with timing.phase('显示数据表', rows=len(display_df)):
+                st.dataframe(
+                    display_df[display_columns],
+                    use_container_width=True,
+                    height=min(400, len(display_df) * 35 + 38)
+                )
             
             # 提供数据下载
-            csv = display_df.to_csv(index=False, encoding='utf-8-sig')
+            with timing.phase('导出 CSV', rows=len(display_df)) as p:
+                csv = display_df.to_csv(index=False, encoding='utf-8-sig')
+            p.set(bytes=len(csv))
             st.download_button(
                 label="💾 下载查询结果 (CSV)",
                 data=csv,
@@ -709,4 +461,6 @@ st.markdown("""
         font-family: monospace;
     }
 </style>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+app_common.show_timings(query_engine, '单个公司查询')
@@ -0,0 +1,121 @@
+"""所有会话共享的只读数据集
+
+Dataset 把清洗后的数据表（含年度排名列）和由它派生的索引、汇总表、排行榜、市场立方体、
+公司 × 年份矩阵打包成一个不可变对象，由 st.cache_resource 在进程内只保存一份，
+所有会话、所有页面重跑直接引用，不再像 st.cache_data 那样每次重跑都反序列化出一份完整拷贝。
+
+只读保证：
+- 启用 pandas 写时复制（Copy-on-Write），frame/summary/cube 属性每次返回一个浅拷贝视图，
+  会话对视图做的任何修改（改值、增删列）都只影响自己的副本；
+- 索引内部的映射和列表都是只读类型，矩阵不可写；
+- Dataset 对象本身禁止重新赋值属性。
+
+追加新数据（如新一年的增量文件）时，appended 返回一个新的 Dataset，只重算新增数据涉及的
+年份和公司，原数据集不变。
+"""
+import numpy as np
+import pandas as pd
+
+import analytics
+import indexes
+import panel
+
+# pandas 3 起写时复制总是开启；pandas 2 需要手动打开
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+class Dataset:
+    """只读数据集：数据表 + 代码/名称/前缀索引 + 公司汇总表 + 年度排行榜 + 市场立方体 + 公司 × 年份矩阵"""
+
+    __slots__ = (
+        '_frame', '_summary', '_cube', 'version',
+        'code_index', 'name_index', 'prefix_index', 'leaderboard', 'panel'
+    )
+
+    def __init__(self, df, version):
+        df = analytics.add_year_ranks(df)
+        code_index = indexes.CodeIndex(df)
+        self._assign(
+            _frame=df,
+            version=version,
+            code_index=code_index,
+            name_index=indexes.NameIndex(df, code_index),
+            prefix_index=indexes.PrefixIndex(df, code_index),
+            _summary=analytics.company_summary(df),
+            leaderboard=analytics.YearLeaderboard(df),
+            _cube=analytics.market_cube(df),
+            panel=panel.Panel(df),
+        )
+
+    def _assign(self, **parts):
+        for name, value in parts.items():
+            object.__setattr__(self, name, value)
+
+    def appended(self, delta, version):
+        """追加一批已清洗的数据，返回新的数据集
+
+        delta 按 (股票代码, 年份) 归并进现有数据，不重新排序全表。年度排名、排行榜和市场立方体
+        只重算 delta 涉及的年份；汇总表、前缀索引和公司 × 年份矩阵只重算 delta 涉及的公司；
+        名称索引只加入新名称。
+        """
+        base = self._frame
+        delta = indexes.sort_by_code_year(delta)
+        base_positions, delta_positions = indexes.merge_positions(base, delta, self.code_index)
+
+        # 与现有数据的列类型保持一致（紧凑模式下的分类列在合并后重新转换）
+        categorical = [col for col in delta.columns if isinstance(base[col].dtype, pd.CategoricalDtype)]
+        delta = delta.astype({
+            col: base[col].dtype for col in delta.columns
+            if col in base.columns and col not in categorical
+        })
+        combined = pd.concat([base, delta], ignore_index=True)
+        order = np.empty(len(combined), dtype=np.int64)
+        order[np.r_[base_positions, delta_positions]] = np.arange(len(combined))
+        df = combined.take(order).reset_index(drop=True)
+        for col in categorical:
+            df[col] = df[col].astype('category')
+
+        years = set(int(year) for year in delta['年份'].unique())
+        touched = sorted(set(delta['股票代码'].astype(str)))
+        df = analytics.add_year_ranks(df, years)
+        code_index = self.code_index.extended(delta['股票代码'].astype(str).value_counts().to_dict())
+        company_rows = indexes.take_rows(df, code_index.positions(touched))
+
+        extended = Dataset.__new__(Dataset)
+        extended._assign(
+            _frame=df,
+            version=version,
+            code_index=code_index,
+            name_index=self.name_index.extended(delta, code_index),
+            prefix_index=self.prefix_index.extended(df, code_index, touched),
+            _summary=analytics.update_summary(self._summary, company_rows),
+            leaderboard=self.leaderboard.extended(df, base_positions, years),
+            _cube=analytics.update_cube(self._cube, df[df['年份'].isin(list(years))]),
+            panel=self.panel.extended(company_rows),
+        )
+        return extended
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Dataset 是只读的')
+
+    def __delattr__(self, name):
+        raise AttributeError('Dataset 是只读的')
+
+    @property
+    def frame(self):
+        """数据表的写时复制视图；修改视图不会影响共享数据"""
+        return self._frame.copy(deep=False)
+
+    @property
+    def summary(self):
+        """公司汇总表（写时复制视图），以股票代码为索引"""
+        return self._summary.copy(deep=False)
+
+    @property
+    def cube(self):
+        """年份 × 板块聚合立方体（写时复制视图）"""
+        return self._cube.copy(deep=False)
+
+    def __len__(self):
+        return len(self._frame)
@@ -0,0 +1,310 @@
+"""查询引擎：不依赖 Streamlit 的数据查询接口
+
+界面（daima.py）、HTTP 查询接口（api.py）、批处理任务和性能测试都通过同一个 Engine 查询数据：
+
+    engine = Engine.from_path('1999-2023年数字化转型指数汇总.xlsx')
+    rows = engine.lookup_code('600611')
+    rows = engine.search_name('大众')
+    trend_df = engine.trend('600611')
+    stats = engine.stats('600611')          # 来自加载时预先计算的公司汇总表
+    leaders = engine.companies_by('总增长')   # 按增长排序的公司
+    top10 = engine.leaderboard(2023, n=10)   # 某一年指数最高的公司
+    cube = engine.market_cube                # 年份 × 板块聚合指标
+    changes = engine.yoy('600611')           # 来自公司 × 年份矩阵的同比变化
+    peers = engine.similar_companies('600611', k=5)   # 走势最相似的公司
+    engine = engine.appended('2024年.xlsx')  # 追加增量文件，返回新引擎
+
+Engine 只读取共享的 Dataset，可以在多个线程/会话间共用。
+数据量超出内存时可以改用 sql_backend.SqlEngine，它以相同的查询接口把查询下推到 SQLite 数据库文件。
+"""
+import os
+
+import pandas as pd
+
+import analytics
+import dataset
+import indexes
+import loader
+import normalize
+import reloader
+import similarity
+import timing
+
+
+def trend_frame(rows):
+    """趋势数据：按年份排序并去重（每个年份只保留一条记录）"""
+    trend_df = rows.sort_values('年份', kind='stable').drop_duplicates('年份')
+    trend_df['年份'] = trend_df['年份'].astype(int)
+    return trend_df
+
+
+def trend_stats(trend_df):
+    """趋势统计：最高、最低、平均指数和首尾年份之间的总增长"""
+    values = trend_df['数字化转型指数']
+    if values.empty:
+        return None
+    return {
+        'max': float(values.max()),
+        'min': float(values.min()),
+        'mean': float(values.mean()),
+        'growth': float(values.iloc[-1] - values.iloc[0]),
+    }
+
+
+def requested_codes(codes):
+    """批量查询的输入：去重后的输入代码，以及按与数据相同的 clean_stock_code 规则清理后的代码"""
+    requested = pd.DataFrame({'输入代码': pd.Series(list(codes), dtype=object).astype(str).str.strip()})
+    requested = requested.drop_duplicates('输入代码')
+    requested['股票代码'] = normalize.clean_stock_codes(requested['输入代码'])
+    return requested
+
+
+def batch_result(requested, known, rows):
+    """组装批量查询结果
+
+    known 标记 requested 中存在于数据的代码，rows 是这些代码（已按年份范围筛选）的全部行。
+    返回 (结果表, 未匹配表)：结果表在标准列前增加“输入代码”列，按输入顺序排列；
+    未匹配表列出输入代码、清理后的代码和原因。
+    """
+    wanted = requested[known].drop_duplicates('股票代码')
+    result_df = wanted.merge(rows, on='股票代码', how='inner')
+
+    matched_codes = set(result_df['股票代码'])
+    unmatched = requested[~requested['股票代码'].map(matched_codes.__contains__).astype(bool)].copy()
+    unmatched['原因'] = '所选年份无数据'
+    unmatched.loc[~known, '原因'] = '代码不存在'
+    unmatched.loc[unmatched['股票代码'] == '', '原因'] = '无法识别的代码'
+    return result_df, unmatched.reset_index(drop=True)
+
+
+def failure_details(info):
+    """加载失败的原因：load_frame 记录的警告和错误文本，不含其中的回溯"""
+    return '; '.join(
+        text for _, text in info['messages'] if not text.startswith('Traceback (most recent call last)')
+    )
+
+
+class Engine:
+    """数字化转型指数查询引擎"""
+
+    def __init__(self, data, load_info=None):
+        self.data = data
+        self.load_info = load_info or {}
+
+    @classmethod
+    @timing.timed('构建查询引擎')
+    def from_frame(cls, df, version=None, load_info=None):
+        """由已清洗的数据表创建引擎"""
+        version = version or df.attrs.get('data_version')
+        return cls(dataset.Dataset(df, version), load_info)
+
+    @classmethod
+    def from_path(cls, excel_path, compact=False, delta_paths=()):
+        """加载工作簿（优先使用列式缓存）并追加增量文件，创建引擎；主工作簿加载失败时抛出 ValueError"""
+        df, info = loader.load_frame(excel_path, compact)
+        if df is None or df.empty:
+            raise ValueError(f"数据加载失败: {excel_path} {failure_details(info)}")
+        return cls.from_frame(df, load_info=info).with_deltas(delta_paths)
+
+    def appended(self, delta_path):
+        """追加一个增量文件（如新一年的数据），返回新引擎；加载失败时抛出 ValueError
+
+        只读取和清洗增量文件本身（同样使用列式缓存），派生结构的增量更新见 Dataset.appended。
+        """
+        df, info = loader.load_frame(delta_path)
+        if df is None or df.empty:
+            raise ValueError(f"增量文件加载失败: {delta_path} {failure_details(info)}")
+        name = os.path.basename(delta_path)
+        version = f"{self.version} + {name}（{df.attrs.get('data_version')}）"
+        load_info = dict(self.load_info, deltas=[*self.load_info.get('deltas', []), name])
+        return Engine(self.data.appended(df, version), load_info)
+
+    def with_deltas(self, delta_paths):
+        """依次追加多个增量文件；加载失败的文件跳过，原因记录在 load_info 的 messages 中"""
+        query_engine = self
+        for delta_path in delta_paths:
+            try:
+                query_engine = query_engine.appended(delta_path)
+            except ValueError as e:
+                messages = [*query_engine.load_info.get('messages', []), ('warning', str(e))]
+                query_engine = Engine(query_engine.data, dict(query_engine.load_info, messages=messages))
+        return query_engine
+
+    @classmethod
+    def sample(cls):
+        """示例数据引擎"""
+        return cls.from_frame(loader.make_sample_data())
+
+    @property
+    def frame(self):
+        """全部数据（写时复制视图）"""
+        return self.data.frame
+
+    @property
+    def version(self):
+        return self.data.version
+
+    def __len__(self):
+        return len(self.data)
+
+    @timing.timed('代码查询')
+    def lookup_code(self, text):
+        """按股票代码查询：先精确匹配，找不到时匹配包含该代码的所有公司"""
+        search_code = normalize.clean_stock_code(text)
+        code_index = self.data.code_index
+        df = self.data.frame
+        result_df = code_index.lookup(df, search_code)
+        if result_df.empty:
+            result_df = code_index.take(df, code_index.containing(search_code))
+        return result_df
+
+    @timing.timed('名称查询')
+    def search_name(self, text):
+        """按企业名称模糊查询（不区分大小写）"""
+        return self.data.name_index.lookup(self.data.frame, text)
+
+    @timing.timed('相似名称')
+    def similar_names(self, text, limit=5):
+        """名称前两个字相同的公司（查询无结果时给用户参考）"""
+        similar = self.search_name(text[:2])
+        return similar[['股票代码', '企业名称']].drop_duplicates().head(limit)
+
+    @timing.timed('代码联想')
+    def suggest_codes(self, prefix, k=10):
+        """以 prefix 开头的前 k 个 (股票代码, 企业名称)"""
+        return self.data.prefix_index.search(prefix, k)
+
+    def has_code(self, code):
+        return code in self.data.code_index
+
+    @staticmethod
+    @timing.timed('年份筛选')
+    def filter_year(rows, year=None):
+        """筛选特定年份；year 为 None 时返回全部年份"""
+        if year is None:
+            return rows
+        return rows[rows['年份'] == int(year)]
+
+    @timing.timed('批量查询', rows=lambda result: len(result[0]))
+    def batch_lookup(self, codes, start_year=None, end_year=None):
+        """批量查询多个股票代码（可选年份范围）
+
+        输入代码按与数据相同的 clean_stock_code 规则清理，所有代码通过一次索引取行和一次合并完成，
+        不逐个扫描。返回值见 batch_result。
+        """
+        requested = requested_codes(codes)
+        code_index = self.data.code_index
+        known = requested['股票代码'].map(lambda code: code != '' and code in code_index).astype(bool)
+        wanted = requested[known].drop_duplicates('股票代码')
+        rows = indexes.take_rows(self.data.frame, code_index.positions(wanted['股票代码']))
+        if start_year is not None:
+            rows = rows[rows['年份'] >= int(start_year)]
+        if end_year is not None:
+            rows = rows[rows['年份'] <= int(end_year)]
+        return batch_result(requested, known, rows)
+
+    @property
+    def market_cube(self):
+        """年份 × 板块聚合立方体（以 (年份, 板块) 为索引）"""
+        return self.data.cube
+
+    @property
+    def company_count(self):
+        """有股票代码的公司数"""
+        return len(self.data.prefix_index.codes)
+
+    @property
+    def years(self):
+        """数据中出现的所有年份（升序）"""
+        return self.data.leaderboard.years
+
+    def year_count(self, year):
+        """某一年的记录数（排名的分母）"""
+        return self.data.leaderboard.count(year)
+
+    @timing.timed('年度排行榜')
+    def leaderboard(self, year, n=10, bottom=False):
+        """某一年指数最高（bottom=True 时最低）的 n 条记录"""
+        board = self.data.leaderboard
+        if bottom:
+            return board.bottom(self.data.frame, year, n)
+        return board.top(self.data.frame, year, n)
+
+    @property
+    def panel(self):
+        """公司 × 年份稠密矩阵（见 panel.Panel）"""
+        return self.data.panel
+
+    @timing.timed('同比变化')
+    def yoy(self, code, pct=False):
+        """单个公司的同比变化序列（以年份为索引，pct=True 时为变化率）"""
+        company_panel = self.data.panel
+        return company_panel.series(code, values=company_panel.yoy(pct=pct))
+
+    @timing.timed('相似公司')
+    def similar_companies(self, code, k=5, mode='level', min_overlap=3):
+        """走势与该公司最相似的 k 家公司（见 similarity.py）
+
+        返回按距离升序的表：股票代码、企业名称、距离、重叠年份数。
+        """
+        company_panel = self.data.panel
+        row = company_panel.row(code)
+        neighbours = [] if row is None else similarity.nearest(
+            company_panel.matrix(), row, k, min_overlap, mode
+        )
+        peers = pd.DataFrame(neighbours, columns=['行号', '距离', '重叠年份数'])
+        peers.insert(0, '股票代码', [company_panel.codes[i] for i in peers['行号']])
+        names = self.data.summary['企业名称']
+        peers.insert(1, '企业名称', names.reindex(peers['股票代码']).to_numpy())
+        return peers.drop(columns='行号')
+
+    @timing.timed('公司趋势')
+    def trend(self, code):
+        """单个公司的历年趋势数据"""
+        return trend_frame(self.data.code_index.lookup(self.data.frame, code))
+
+    @property
+    def summary(self):
+        """公司汇总表（每家公司一行，以股票代码为索引）"""
+        return self.data.summary
+
+    @timing.timed('趋势统计', rows=None)
+    def stats(self, code):
+        """单个公司的趋势统计（汇总表的一行），无数据时返回 None"""
+        summary = self.data.summary
+        if code not in summary.index:
+            return None
+        return analytics.summary_stats(summary.loc[code])
+
+    @timing.timed('公司排序')
+    def companies_by(self, column='总增长', ascending=False, limit=None, min_years=1):
+        """按汇总表的某一列排序公司，可要求最少年份数"""
+        summary = self.data.summary
+        ranked = summary[summary['年份数'] >= min_years].sort_values(
+            column, ascending=ascending, kind='stable', na_position='last'
+        )
+        return ranked if limit is None else ranked.head(limit)
+
+
+def load_engine(excel_path, compact=False, delta_dir=None):
+    """加载数据、追加增量文件并构建查询引擎；加载失败时使用示例数据（保留加载信息以便显示原因）"""
+    df, info = loader.load_frame(excel_path, compact)
+    if df is None or df.empty:
+        return Engine.from_frame(loader.make_sample_data(), load_info=info)
+    return Engine.from_frame(df, load_info=info).with_deltas(loader.delta_files(delta_dir))
+
+
+def watch(excel_path, compact=False, delta_dir=None, interval=reloader.POLL_SECONDS):
+    """首次加载数据并启动后台热更新线程，返回 reloader.SourceWatcher（watcher.engine 为当前引擎）"""
+    def build(path):
+        return Engine.from_path(path, compact, loader.delta_files(delta_dir))
+
+    def append(query_engine, delta_path):
+        # 与完整重建（with_deltas）一致：无法加载的增量文件跳过，原因记录在 load_info 中
+        return query_engine.with_deltas([delta_path])
+
+    watcher = reloader.SourceWatcher(
+        excel_path, build, load_engine(excel_path, compact, delta_dir), interval,
+        delta_dir=delta_dir, append=append
+    )
+    return watcher.start()
@@ -0,0 +1,235 @@
+"""查询索引
+
+数据按 (股票代码, 年份) 排序后，同一公司的记录在表中是连续的一段。
+CodeIndex 把每个股票代码映射到它的行区间，精确查询只需一次字典查找加一次切片。
+NameIndex 在唯一企业名称上建立字符二元组倒排索引，名称子串查询只需求交集再验证候选。
+PrefixIndex 是唯一代码的有序数组，用二分查找做代码前缀匹配（输入联想）。
+
+追加新数据（见 Dataset.appended）时，各索引的 extended 方法只处理新增数据涉及的代码和名称。
+"""
+import re
+from bisect import bisect_left
+from types import MappingProxyType
+
+import numpy as np
+
+
+def take_rows(df, positions):
+    """按行位置取行；位置连续时用切片，避免逐行拷贝"""
+    if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+        return df.iloc[positions[0]:positions[-1] + 1]
+    return df.iloc[positions]
+
+
+def sort_by_code_year(df):
+    """按股票代码、年份稳定排序并重置索引，使同一公司的行连续"""
+    return df.sort_values(['股票代码', '年份'], kind='stable').reset_index(drop=True)
+
+
+def merge_codes(codes, more):
+    """有序代码元组 codes 与 more 的并集（有序元组）；没有新代码时原样返回 codes"""
+    new = set(more).difference(codes)
+    if not new:
+        return codes
+    # codes 已有序，只需把少量新代码排进去
+    return tuple(sorted(codes + tuple(new)))
+
+
+def merge_positions(base, delta, code_index):
+    """把已按 (股票代码, 年份) 排序的 delta 归并进同样有序的 base
+
+    返回 (base 各行的新位置, delta 各行的新位置)，与对两表拼接后再 sort_by_code_year 的顺序一致
+    （键相同时 base 的行在前）。只对 delta 的行做二分查找，不重新排序 base。
+    """
+    delta_codes = delta['股票代码'].astype(str).tolist()
+    rank = {code: i for i, code in enumerate(merge_codes(code_index.codes, delta_codes))}
+    base_ranks = np.fromiter(map(rank.__getitem__, code_index.codes), dtype=np.int64, count=len(code_index))
+    counts = np.fromiter(code_index.counts().values(), dtype=np.int64, count=len(code_index))
+    delta_ranks = np.fromiter(map(rank.__getitem__, delta_codes), dtype=np.int64, count=len(delta_codes))
+
+    base_years = base['年份'].to_numpy(dtype=np.int64)
+    delta_years = delta['年份'].to_numpy(dtype=np.int64)
+    low = min(base_years.min(initial=0), delta_years.min(initial=0))
+    span = max(base_years.max(initial=0), delta_years.max(initial=0)) - low + 1
+    base_keys = np.repeat(base_ranks, counts) * span + (base_years - low)
+    delta_keys = delta_ranks * span + (delta_years - low)
+
+    insert = np.searchsorted(base_keys, delta_keys, side='right')
+    delta_positions = insert + np.arange(len(delta))
+    base_positions = np.arange(len(base)) + np.searchsorted(insert, np.arange(len(base)), side='right')
+    return base_positions, delta_positions
+
+
+class CodeIndex:
+    """股票代码 -> 连续行区间 [start, stop) 的哈希索引
+
+    要求 df 已经按股票代码排序（见 sort_by_code_year）。
+    """
+
+    def __init__(self, df=None, codes=None, counts=None):
+        if df is not None:
+            values = df['股票代码'].astype(str).to_numpy()
+            if len(values):
+                starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+            else:
+                starts = np.array([], dtype=np.int64)
+            codes = values[starts].tolist()
+            counts = np.diff(np.r_[starts, len(values)])
+        # 表按代码排序，每个代码的区间依次相接
+        stops = np.cumsum(counts, dtype=np.int64)
+        starts = stops - counts
+        self.ranges = MappingProxyType(dict(zip(codes, zip(starts.tolist(), stops.tolist()))))
+        self.codes = tuple(self.ranges)
+
+    def counts(self):
+        """每个代码的行数（按表中顺序）"""
+        return {code: stop - start for code, (start, stop) in self.ranges.items()}
+
+    def extended(self, delta_counts):
+        """追加各代码的新增行数后的索引（新代码按排序位置插入）"""
+        codes = merge_codes(self.codes, delta_counts)
+        counts = self.counts()
+        return CodeIndex(
+            codes=codes,
+            counts=np.array([counts.get(code, 0) + delta_counts.get(code, 0) for code in codes], dtype=np.int64)
+        )
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def __contains__(self, code):
+        return code in self.ranges
+
+    def lookup(self, df, code):
+        """精确查询：返回该代码的全部行（无匹配时返回空表）"""
+        start, stop = self.ranges.get(code, (0, 0))
+        return df.iloc[start:stop]
+
+    def positions(self, codes):
+        """多个代码对应的行位置（按传入顺序拼接）"""
+        spans = [self.ranges[code] for code in codes if code in self.ranges]
+        if not spans:
+            return np.array([], dtype=np.int64)
+        return np.concatenate([np.arange(start, stop) for start, stop in spans])
+
+    def take(self, df, codes):
+        """返回多个代码的全部行"""
+        return take_rows(df, self.positions(codes))
+
+    def containing(self, text):
+        """代码中包含 text 的所有代码（只扫描唯一代码，不扫描全部行）"""
+        return [code for code in self.codes if text in code]
+
+
+class NameIndex:
+    """企业名称的字符二元组（bigram）倒排索引
+
+    索引建立在唯一名称上（名称统一转小写），查询时对查询串的所有二元组的倒排表求交集得到候选名称，
+    再用与 str.contains(text, case=False) 相同的正则逐个验证，结果与全表扫描一致。
+    """
+
+    def __init__(self, df, code_index, base=None):
+        self.code_index = code_index
+        pairs = df[['企业名称', '股票代码']].drop_duplicates()
+        if base is None:
+            name_codes, code_names, postings = {}, {}, {}
+        else:
+            # 浅拷贝：未涉及的名称和代码直接沿用原来的只读元组和集合
+            name_codes, code_names, postings = dict(base.name_codes), dict(base.code_names), dict(base.postings)
+        first_new = len(name_codes)
+        for name, code in zip(pairs['企业名称'].tolist(), pairs['股票代码'].astype(str).tolist()):
+            names = code_names.get(code, frozenset())
+            if name not in names:
+                code_names[code] = names | {name}
+            if isinstance(name, str):
+                codes = name_codes.get(name, ())
+                if code not in codes:
+                    name_codes[name] = codes + (code,)
+        self.name_codes = MappingProxyType(name_codes)
+        self.code_names = MappingProxyType(code_names)
+        self.names = tuple(name_codes)
+
+        # 单字和二元组的倒排表：gram -> 名称编号集合（追加时只为新名称更新）
+        added = {}
+        for i in range(first_new, len(self.names)):
+            lowered = self.names[i].lower()
+            grams = set(lowered)
+            grams.update(lowered[j:j + 2] for j in range(len(lowered) - 1))
+            for gram in grams:
+                added.setdefault(gram, set()).add(i)
+        for gram, ids in added.items():
+            postings[gram] = postings.get(gram, frozenset()) | ids
+        self.postings = MappingProxyType(postings)
+
+    def extended(self, delta, code_index):
+        """加入新增数据中的名称后的索引（已有名称的倒排表直接沿用）"""
+        return NameIndex(delta, code_index, base=self)
+
+    def _candidates(self, lowered):
+        """查询串所有 gram 的倒排表交集"""
+        if len(lowered) == 1:
+            grams = [lowered]
+        else:
+            grams = {lowered[j:j + 2] for j in range(len(lowered) - 1)}
+        lists = sorted((self.postings.get(gram, frozenset()) for gram in grams), key=len)
+        if not lists[0]:
+            return []
+        return sorted(lists[0].intersection(*lists[1:]))
+
+    def search(self, text):
+        """返回名称匹配 text 的所有唯一企业名称（语义同 str.contains(text, case=False)）"""
+        pattern = re.compile(text, flags=re.IGNORECASE)
+        if not text or re.escape(text) != text:
+            # 空串或含正则元字符时无法用倒排表，退回到在唯一名称上做正则匹配
+            return [name for name in self.names if pattern.search(name)]
+        return [
+            self.names[i] for i in self._candidates(text.lower())
+            if pattern.search(self.names[i])
+        ]
+
+    def rows(self, df, names):
+        """通过代码索引把匹配的名称展开为数据行（保持原表顺序）"""
+        names = set(names)
+        codes = sorted({code for name in names for code in self.name_codes[name]})
+        # 表按代码排序，按排序后的代码取出的行位置本身就是升序
+        positions = self.code_index.positions(codes)
+        # 只有公司曾经改名（同一代码对应多个名称）时才需要逐行过滤名称
+        if any(not self.code_names[code] <= names for code in codes):
+            matched = df['企业名称'].iloc[positions].isin(names).to_numpy()
+            positions = positions[matched]
+        return take_rows(df, positions)
+
+    def lookup(self, df, text):
+        """名称子串查询，返回匹配的数据行"""
+        return self.rows(df, self.search(text))
+
+
+class PrefixIndex:
+    """股票代码前缀索引：有序的唯一代码数组 + 二分查找"""
+
+    def __init__(self, df, code_index, base=None, touched=None):
+        names = df['企业名称'].to_numpy()
+        # 每个代码显示最近一年的企业名称（区间内按年份升序，取最后一行）
+        if base is None:
+            self.codes = tuple(sorted(code for code in code_index.codes if code))
+            self.names = tuple(names[code_index.ranges[code][1] - 1] for code in self.codes)
+            return
+        touched = [code for code in touched if code]
+        latest = dict(zip(base.codes, base.names))
+        for code in touched:
+            latest[code] = names[code_index.ranges[code][1] - 1]
+        self.codes = merge_codes(base.codes, touched)
+        self.names = tuple(latest[code] for code in self.codes)
+
+    def extended(self, df, code_index, touched):
+        """只更新 touched 中各代码（新增数据涉及的代码）的最新名称"""
+        return PrefixIndex(df, code_index, base=self, touched=touched)
+
+    def search(self, prefix, k=10):
+        """返回以 prefix 开头的前 k 个 (股票代码, 企业名称)"""
+        start = bisect_left(self.codes, prefix)
+        stop = start
+        limit = min(start + k, len(self.codes))
+        while stop < limit and self.codes[stop].startswith(prefix):
+            stop += 1
+        return list(zip(self.codes[start:stop], self.names[start:stop]))
@@ -0,0 +1,316 @@
+"""数据加载：读取工作簿、识别列名、清洗，并维护列式缓存
+
+本模块不依赖 Streamlit，加载过程中需要展示给用户的信息记录在 info 字典中，
+由界面层决定如何显示。
+"""
+import os
+import re
+import traceback
+
+import pandas as pd
+
+import columnar_cache
+import indexes
+import normalize
+import schema
+import timing
+
+# 必须存在的列（缺失时创建空列）
+REQUIRED_COLUMNS = ['股票代码', '企业名称', '年份', '数字化转型指数']
+
+# 增量数据文件（每个文件一批新数据，如新一年的数据）的格式
+DELTA_SUFFIXES = ('.xlsx', '.xlsm', '.xls')
+
+# 常见的列名模式
+COMMON_PATTERNS = {
+    '股票代码': ['股票代码', '证券代码', '代码', 'stock_code', 'code', 'ticker'],
+    '企业名称': ['企业名称', '公司名称', '名称', 'company_name', 'name'],
+    '年份': ['年份', '年', 'year', '年度', '会计年度'],
+    '数字化转型指数': ['数字化转型指数', '数字化指数', '转型指数', '数字指数', 'digital_index', 'digital_score'],
+    '技术维度': ['技术维度', '技术', 'technology', 'tech'],
+    '应用维度': ['应用维度', '应用', 'application', 'app']
+}
+
+
+def detect_columns(df):
+    """识别各标准列对应的原始列名，返回 {原始列名: 标准列名}"""
+    column_mapping = {}
+
+    # 第一步：尝试常见的列名模式
+    for standard_name, possible_names in COMMON_PATTERNS.items():
+        found = False
+        for col in df.columns:
+            col_lower = str(col).lower()
+            for pattern in possible_names:
+                if pattern in col_lower or col_lower in pattern:
+                    column_mapping[col] = standard_name
+                    found = True
+                    break
+            if found:
+                break
+
+    # 如果自动映射不成功，尝试手动检查特定列
+    if not column_mapping.get('数字化转型指数'):
+        # 寻找可能是数字化转型指数的列
+        for col in df.columns:
+            col_str = str(col)
+            # 检查列名是否包含数字或特定关键词
+            if any(keyword in col_str for keyword in ['指数', 'score', 'index', 'value', '数值']):
+                # 检查列数据类型是否为数值型
+                if pd.api.types.is_numeric_dtype(df[col]):
+                    column_mapping[col] = '数字化转型指数'
+                    break
+
+    # 如果仍然没有找到数字化转型指数列，使用第一个数值列
+    if not column_mapping.get('数字化转型指数'):
+        for col in df.columns:
+            try:
+                # 尝试转换为数值型
+                test_series = pd.to_numeric(df[col].head(100), errors='coerce')
+                if test_series.notna().sum() > 0:  # 如果有数值数据
+                    column_mapping[col] = '数字化转型指数'
+                    break
+            except:
+                continue
+
+    return column_mapping
+
+
+def clean_frame(df, messages):
+    """清洗已映射列名的数据（向量化实现见 normalize.py），并按 (股票代码, 年份) 排序"""
+    # 确保必要的列存在，如果不存在则创建
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            messages.append(('warning', f"未找到列: {col}，将创建空列"))
+            df[col] = ''
+
+    # 1. 股票代码处理 - 支持所有开头的股票代码
+    df['股票代码'] = normalize.clean_stock_codes(df['股票代码'])
+
+    # 2. 企业名称处理
+    df['企业名称'] = df['企业名称'].astype(str).str.strip()
+
+    # 3. 年份处理
+    try:
+        df['年份'] = normalize.extract_years(df['年份']).astype(int)
+    except Exception as e:
+        messages.append(('warning', f"年份处理警告: {str(e)}"))
+        df['年份'] = 1999
+
+    # 4. 数字化转型指数处理
+    try:
+        df['数字化转型指数'] = normalize.to_index_values(df['数字化转型指数'])
+    except Exception as e:
+        messages.append(('error', f"数字化转型指数处理错误: {str(e)}"))
+        # 创建默认的数字化转型指数
+        df['数字化转型指数'] = 0.0
+
+    # 5. 处理技术维度和应用维度
+    for col in ['技术维度', '应用维度']:
+        if col in df.columns:
+            try:
+                df[col] = normalize.to_dimension_values(df[col])
+            except:
+                df[col] = 0
+
+    # 按 (股票代码, 年份) 排序，使同一公司的记录连续，便于建立代码索引
+    return indexes.sort_by_code_year(df)
+
+
+def read_table(path):
+    """读取整张表：.csv 按 UTF-8 文本读取（兼容带 BOM 的文件），其他格式交给 pd.read_excel"""
+    if path.lower().endswith('.csv'):
+        return pd.read_csv(path, encoding='utf-8-sig', low_memory=False)
+    return pd.read_excel(path)
+
+
+def load_frame(excel_path, compact=False):
+    """加载Excel数据，优先使用源文件旁的列式缓存
+
+    缓存失效时先识别工作簿结构（只读表头和样本行，见 schema.py），再只读取映射到的列。
+    返回 (df, info)。加载失败时 df 为 None。info 包含 raw_columns（原始列名）、shape、
+    column_mapping（列名映射）、from_cache（是否来自缓存）、schema_from_saved（列名映射是否
+    复用已保存的识别结果）、messages（[(级别, 文本)]，级别为 'warning' 或 'error'）和
+    timings（开启计时时各加载阶段的 timing.Phase 列表，见 timing.py）。
+    """
+    info = {
+        'raw_columns': None,
+        'shape': None,
+        'column_mapping': {},
+        'from_cache': False,
+        'schema_from_saved': False,
+        'messages': [],
+    }
+    with timing.collect() as timings:
+        df = _load_frame(excel_path, compact, info)
+    info['timings'] = timings
+    return df, info
+
+
+def _load_frame(excel_path, compact, info):
+    """load_frame 的加载过程，返回数据表（失败时返回 None），过程信息写入 info"""
+    try:
+        if not os.path.exists(excel_path):
+            info['messages'].append(('warning', f"文件不存在: {excel_path}"))
+            return None
+
+        # 缓存命中时直接返回已清洗的数据，跳过Excel解析和清洗
+        with timing.phase('读取列式缓存') as p:
+            cached = columnar_cache.read_cache(excel_path)
+        if cached is not None:
+            df, meta = cached
+            p.set(rows=len(df))
+            info.update(
+                raw_columns=meta.get('raw_columns'),
+                shape=meta.get('shape'),
+                column_mapping=meta.get('column_mapping', {}),
+                from_cache=True
+            )
+            df.attrs['data_version'] = columnar_cache.version_of(meta['key'])
+            return finish_loading(df, compact)
+
+        # 在读取之前记录缓存键，读取期间文件被修改时下次会重新生成
+        cache_key = columnar_cache.source_key(excel_path)
+
+        # 先只读表头和样本行确定列名映射和类型，再只读取需要的列
+        with timing.phase('识别表结构'):
+            table_schema = schema.detect_schema(excel_path, detect_columns)
+        if table_schema is not None:
+            with timing.phase('读取工作簿') as p:
+                df = schema.read_with_schema(excel_path, table_schema)
+            p.set(rows=len(df), bytes=os.path.getsize(excel_path))
+            info['raw_columns'] = table_schema['columns']
+            info['shape'] = (len(df), len(table_schema['columns']))
+            info['schema_from_saved'] = table_schema['from_saved']
+            column_mapping = table_schema['column_mapping']
+        else:
+            # 无法流式读取的格式（如 .xls、.csv）：读取全部列后在整表上识别
+            with timing.phase('读取工作簿') as p:
+                df = read_table(excel_path)
+            p.set(rows=len(df), bytes=os.path.getsize(excel_path))
+            info['raw_columns'] = list(df.columns)
+            info['shape'] = df.shape
+
+            # 标准化列名 - 去掉空格和特殊字符
+            df.columns = [schema.standardize_name(col) for col in df.columns]
+            with timing.phase('识别列名'):
+                column_mapping = detect_columns(df)
+
+        # 应用列名映射
+        if column_mapping:
+            df = df.rename(columns=column_mapping)
+        info['column_mapping'] = column_mapping
+
+        with timing.phase('清洗', rows=len(df)):
+            df = clean_frame(df, info['messages'])
+
+        # 写入列式缓存，下次冷启动直接读取
+        with timing.phase('写入列式缓存', rows=len(df)):
+            columnar_cache.write_cache(
+                excel_path, df, cache_key,
+                raw_columns=info['raw_columns'],
+                shape=info['shape'],
+                column_mapping=column_mapping
+            )
+        df.attrs['data_version'] = columnar_cache.version_of(cache_key)
+
+        return finish_loading(df, compact)
+
+    except Exception as e:
+        info['messages'].append(('error', f"数据加载失败：{str(e)}"))
+        info['messages'].append(('error', traceback.format_exc()))
+        return None
+
+
+def load_years(excel_path, years):
+    """只读取某些年份的已清洗数据，返回以完整数据表中的行位置为索引的数据表（失败时返回 None）
+
+    有效的列式缓存只读取这些年份的分区；缓存无效时先完整加载一次（同时重新生成缓存）再筛选。
+    """
+    cached = columnar_cache.read_cache(excel_path, years)
+    if cached is not None:
+        return cached[0]
+    df, _ = load_frame(excel_path)
+    if df is None:
+        return None
+    return df[df['年份'].isin([int(year) for year in years])]
+
+
+def finish_loading(df, compact):
+    """加载完成后的处理：可选的紧凑内存布局（记录转换前的内存占用）"""
+    if compact:
+        with timing.phase('紧凑内存布局', rows=len(df)):
+            memory_before = normalize.memory_usage(df)
+            df = normalize.compact_frame(df)
+            df.attrs['memory_before'] = memory_before
+    return df
+
+
+def delta_files(folder):
+    """增量数据目录中的工作簿，按文件名排序（忽略隐藏文件和 Excel 的临时文件）"""
+    if not folder or not os.path.isdir(folder):
+        return []
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(DELTA_SUFFIXES) and not name.startswith(('.', '~$'))
+    )
+
+
+def parse_code_text(text):
+    """把粘贴的代码列表（按换行、逗号、空格等分隔）拆分为代码字符串列表"""
+    return [item for item in re.split(r'[\s,，;；、]+', text) if item]
+
+
+def read_code_file(file, file_name):
+    """读取上传的 CSV/XLSX 代码文件，返回代码字符串列表
+
+    优先使用名称匹配“股票代码”模式的列，找不到时使用第一列。所有单元格按字符串读取，保留前导零。
+    """
+    if file_name.lower().endswith(('.xlsx', '.xls')):
+        table = pd.read_excel(file, dtype=str)
+    else:
+        table = pd.read_csv(file, dtype=str, encoding='utf-8-sig')
+    if table.empty:
+        return []
+
+    code_column = table.columns[0]
+    for col in table.columns:
+        col_lower = str(col).strip().lower()
+        if any(pattern in col_lower for pattern in COMMON_PATTERNS['股票代码']):
+            code_column = col
+            break
+    return table[code_column].dropna().astype(str).tolist()
+
+
+def make_sample_data():
+    """创建示例数据 - 包含不同开头的股票代码"""
+    sample_years = list(range(1999, 2024))
+    all_data = []
+
+    companies = [
+        {'股票代码': '600611', '企业名称': '大众交通'},  # 6开头 - 沪市主板
+        {'股票代码': '000001', '企业名称': '平安银行'},  # 0开头 - 深市主板
+        {'股票代码': '300750', '企业名称': '宁德时代'},  # 3开头 - 创业板
+        {'股票代码': '688981', '企业名称': '中芯国际'},  # 688开头 - 科创板
+        {'股票代码': '002415', '企业名称': '海康威视'},  # 002开头 - 中小板
+    ]
+
+    for company in companies:
+        for year in sample_years:
+            # 模拟逐年增长的数据
+            base_index = 2.4 if company['股票代码'] == '600611' else 2.0
+            growth = (year - 1999) * 0.1
+            index_value = max(0, base_index + growth)
+
+            all_data.append({
+                '股票代码': company['股票代码'],
+                '企业名称': company['企业名称'],
+                '年份': year,
+                '技术维度': min(10, (year - 1999) // 2),
+                '应用维度': min(10, (year - 1999) // 3),
+                '数字化转型指数': round(index_value, 2)
+            })
+
+    df = indexes.sort_by_code_year(pd.DataFrame(all_data))
+    df.attrs['data_version'] = 'sample'
+    return df
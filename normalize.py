@@ -0,0 +1,186 @@
+"""数据标准化
+
+股票代码、年份、数字化转型指数和维度列的清洗规则。每列先按唯一值分解（factorize），
+只对唯一值做向量化的字符串处理，再按分解编码映射回整列，避免逐行调用 Python 函数。
+结果与逐行的 clean_stock_code / extract_year 完全一致。
+
+compact_frame 提供可选的紧凑内存布局（分类类型和窄数值类型）。
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# 默认年份（无法识别年份时使用）
+DEFAULT_YEAR = 1999
+
+# 含非ASCII字符的值（如全角数字）交给逐值函数处理，保证与 str.isdigit / \d 的语义一致
+_NON_ASCII = r'[^\x00-\x7f]'
+
+
+def clean_stock_code(code):
+    """清理单个股票代码 - 支持所有开头的代码"""
+    if pd.isna(code) or code == 'nan':
+        return ''
+    # 转换为字符串
+    code_str = str(code)
+    # 移除非数字字符
+    digits = ''.join(filter(str.isdigit, code_str))
+
+    # 支持不同长度的股票代码
+    if len(digits) == 6:
+        return digits
+    elif len(digits) > 6:
+        return digits[:6]  # 取前6位
+    elif len(digits) < 6 and len(digits) > 0:
+        # 对于少于6位的代码，前面补0
+        return digits.zfill(6)
+    else:
+        return ''
+
+
+def extract_year(x):
+    """从单个值中提取年份"""
+    if pd.isna(x) or x == 'nan':
+        return DEFAULT_YEAR
+    x_str = str(x)
+    # 查找4位数字
+    match = re.search(r'\d{4}', x_str)
+    if match:
+        year = int(match.group())
+        if 1900 <= year <= 2100:  # 合理的年份范围
+            return year
+
+    # 如果没有找到，尝试2位数字年份（假设是20世纪的年份）
+    match2 = re.search(r'\d{2}', x_str)
+    if match2:
+        return 1900 + int(match2.group())
+
+    return DEFAULT_YEAR  # 默认值
+
+
+def _factorize_str(series):
+    """按唯一值分解，返回 (编码, 唯一值的字符串形式)；缺失值编码为 -1"""
+    codes, uniques = pd.factorize(series)
+    return codes, pd.Series(np.asarray(uniques, dtype=object)).astype(str)
+
+
+def _expand(codes, unique_values, na_value, index, name):
+    """把唯一值上的结果按编码映射回整列（编码 -1 取末尾追加的缺失值结果）"""
+    values = pd.concat(
+        [unique_values, pd.Series([na_value], dtype=unique_values.dtype)],
+        ignore_index=True
+    )
+    result = values.take(codes)
+    result.index = index
+    result.name = name
+    return result
+
+
+def integral_text(series):
+    """浮点列中的整数值转为整数文本（10.0 → '10'），其余值不变，缺失值保持缺失"""
+    values = series.to_numpy(dtype='float64')
+    whole = np.isfinite(values) & (values == np.round(values))
+    text = series.astype(object)
+    text[whole] = values[whole].astype(np.int64).astype(str)
+    return text
+
+
+def clean_stock_codes(series):
+    """向量化清理股票代码列
+
+    Excel 中存为数字的代码列含空单元格时读成 float64，先按整数文本处理（10.0 → '000010'，
+    与按文本读取的结果相同）；其他列与 series.astype(str).str.strip().apply(clean_stock_code) 结果一致。
+    """
+    if pd.api.types.is_float_dtype(series):
+        series = integral_text(series)
+    codes, uniques = _factorize_str(series)
+    uniques = uniques.str.strip()
+
+    digits = uniques.str.replace(r'[^0-9]', '', regex=True)
+    cleaned = digits.str[:6].str.zfill(6)
+    cleaned[(digits.str.len() == 0) | (uniques == 'nan')] = ''
+
+    exotic = uniques.str.contains(_NON_ASCII, regex=True)
+    if exotic.any():
+        cleaned[exotic] = uniques[exotic].map(clean_stock_code)
+
+    return _expand(codes, cleaned, '', series.index, series.name)
+
+
+def extract_years(series):
+    """向量化提取年份列
+
+    规则：优先取第一个4位数字且在1900-2100之间；否则取第一个2位数字按20世纪处理；
+    都没有时使用默认年份1999。与 series.astype(str).apply(extract_year) 结果一致。
+    """
+    codes, uniques = _factorize_str(series)
+
+    year4 = pd.to_numeric(uniques.str.extract(r'([0-9]{4})', expand=False), errors='coerce')
+    year2 = pd.to_numeric(uniques.str.extract(r'([0-9]{2})', expand=False), errors='coerce')
+    years = np.where(
+        year4.between(1900, 2100),
+        year4,
+        np.where(year2.notna(), 1900 + year2, DEFAULT_YEAR)
+    )
+    years = pd.Series(years, dtype='int64')
+    years[uniques == 'nan'] = DEFAULT_YEAR
+
+    exotic = uniques.str.contains(_NON_ASCII, regex=True)
+    if exotic.any():
+        years[exotic] = uniques[exotic].map(extract_year)
+
+    return _expand(codes, years, DEFAULT_YEAR, series.index, series.name)
+
+
+def to_index_values(series):
+    """数字化转型指数转换为浮点数，缺失值填0"""
+    values = pd.to_numeric(series, errors='coerce')
+
+    # 如果转换后都是NaN，尝试从字符串提取数字（包括小数）
+    if values.isna().all() and series.dtype == 'object':
+        extracted = series.astype(str).str.extract(r'([-+]?\d*\.\d+|[-+]?\d+)')[0]
+        values = pd.to_numeric(extracted, errors='coerce')
+
+    return values.fillna(0).astype(float)
+
+
+def to_dimension_values(series):
+    """技术维度/应用维度转换为整数，缺失值填0"""
+    return pd.to_numeric(series, errors='coerce').fillna(0).astype(int)
+
+
+def compact_frame(df):
+    """紧凑内存布局：代码和名称转为分类类型，年份 int16，维度 int8/int16，指数 float32"""
+    df = df.copy()
+    for col in ['股票代码', '企业名称']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if '年份' in df.columns:
+        df['年份'] = df['年份'].astype('int16')
+    for col in ['技术维度', '应用维度']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    if '数字化转型指数' in df.columns:
+        df['数字化转型指数'] = df['数字化转型指数'].astype('float32')
+    return df
+
+
+def memory_usage(df):
+    """数据表占用的内存字节数（包括字符串对象本身）"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(before, after):
+    """逐列对比两种布局的内存占用"""
+    before_bytes = before.memory_usage(deep=True)
+    after_bytes = after.memory_usage(deep=True)
+    report = pd.DataFrame({
+        '原始类型': before.dtypes.astype(str),
+        '紧凑类型': after.dtypes.astype(str),
+        '原始字节': before_bytes,
+        '紧凑字节': after_bytes,
+    }).fillna({'原始类型': '', '紧凑类型': ''})
+    report.loc['合计'] = ['', '', before_bytes.sum(), after_bytes.sum()]
+    report['压缩比'] = (report['原始字节'] / report['紧凑字节']).round(2)
+    return report
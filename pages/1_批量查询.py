@@ -0,0 +1,106 @@
+import streamlit as st
+
+import app_common
+import loader
+import timing
+
+# 设置页面配置
+st.set_page_config(
+    page_title="批量查询 - 上市公司数字化转型指数查询系统",
+    page_icon="📦",
+    layout="wide"
+)
+
+st.title("📦 批量查询")
+st.markdown("### 上传或粘贴一组股票代码，一次查询全部公司的数字化转型指数")
+
+# 加载数据（与主页面共享同一个只读数据集）
+query_engine = app_common.get_engine()
+df = query_engine.frame
+
+# 创建侧边栏
+with st.sidebar:
+    st.header("🔍 批量查询设置")
+
+    uploaded_file = st.file_uploader(
+        "上传代码文件（CSV/XLSX）",
+        type=['csv', 'xlsx', 'xls'],
+        help="优先读取列名包含“股票代码/证券代码/代码”的列，否则读取第一列"
+    )
+
+    pasted_codes = st.text_area(
+        "或粘贴股票代码",
+        placeholder="每行一个，或用逗号、空格分隔\n例如：600611, 000001, 300750",
+        height=150
+    )
+
+    # 年份范围（可选）
+    min_year, max_year = int(df['年份'].min()), int(df['年份'].max())
+    limit_years = st.checkbox("限定年份范围", value=False)
+    year_range = st.slider(
+        "年份范围",
+        min_value=min_year,
+        max_value=max_year,
+        value=(min_year, max_year),
+        disabled=not limit_years
+    )
+
+    execute_batch = st.button(
+        "🚀 批量查询",
+        type="primary",
+        use_container_width=True
+    )
+
+if execute_batch:
+    codes = loader.parse_code_text(pasted_codes)
+    if uploaded_file is not None:
+        try:
+            codes += loader.read_code_file(uploaded_file, uploaded_file.name)
+        except Exception as e:
+            st.error(f"代码文件读取失败: {str(e)}")
+
+    if not codes:
+        st.warning("请上传代码文件或粘贴股票代码")
+    else:
+        start_year, end_year = year_range if limit_years else (None, None)
+        result_df, unmatched_df = query_engine.batch_lookup(codes, start_year, end_year)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("输入代码数", f"{len(set(codes)):,}")
+        with col2:
+            st.metric("匹配公司数", f"{result_df['股票代码'].nunique():,}")
+        with col3:
+            st.metric("结果记录数", f"{len(result_df):,}")
+
+        if result_df.empty:
+            st.warning("未找到匹配的数据，请检查输入的股票代码")
+        else:
+            st.subheader("📋 查询结果")
+            display_df = result_df[['输入代码'] + [
+                col for col in app_common.DISPLAY_COLUMNS if col in result_df.columns
+            ]].copy()
+            display_df['数字化转型指数'] = display_df['数字化转型指数'].round(2)
+            display_df = display_df.reset_index(drop=True)
+            display_df.index = display_df.index + 1
+            with timing.phase('显示数据表', rows=len(display_df)):
+                st.dataframe(display_df, use_container_width=True, height=400)
+
+            with timing.phase('导出 CSV', rows=len(display_df)) as p:
+                csv = display_df.to_csv(index=False, encoding='utf-8-sig')
+            p.set(bytes=len(csv))
+            st.download_button(
+                label="💾 下载批量查询结果 (CSV)",
+                data=csv,
+                file_name="数字化转型指数_批量查询.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+
+        if not unmatched_df.empty:
+            st.subheader(f"⚠️ 未匹配的代码（{len(unmatched_df)} 个）")
+            st.dataframe(unmatched_df, use_container_width=True)
+else:
+    st.info("🔍 请在侧边栏上传代码文件或粘贴股票代码，并点击'批量查询'按钮")
+
+app_common.show_timings(query_engine, '批量查询')
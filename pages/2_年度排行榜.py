@@ -0,0 +1,72 @@
+import streamlit as st
+
+import app_common
+import timing
+
+# 设置页面配置
+st.set_page_config(
+    page_title="年度排行榜 - 上市公司数字化转型指数查询系统",
+    page_icon="🏆",
+    layout="wide"
+)
+
+st.title("🏆 年度排行榜")
+st.markdown("### 查看某一年数字化转型指数最高和最低的公司")
+
+# 加载数据（与主页面共享同一个只读数据集）
+query_engine = app_common.get_engine()
+
+# 排行榜显示的列
+RANK_COLUMNS = ['年度排名', '股票代码', '企业名称', '技术维度', '应用维度', '数字化转型指数', '年度百分位']
+
+
+def show_board(board_df):
+    """显示排行榜表格"""
+    display_df = board_df[[col for col in RANK_COLUMNS if col in board_df.columns]].copy()
+    display_df['数字化转型指数'] = display_df['数字化转型指数'].round(2)
+    display_df['年度百分位'] = display_df['年度百分位'].round(1)
+    display_df = display_df.reset_index(drop=True)
+    display_df.index = display_df.index + 1
+    with timing.phase('显示数据表', rows=len(display_df)):
+        st.dataframe(display_df, use_container_width=True)
+
+
+# 创建侧边栏
+with st.sidebar:
+    st.header("🔍 排行榜设置")
+
+    years = list(query_engine.years)
+    selected_year = st.selectbox(
+        "选择年份",
+        options=years[::-1],
+        index=0,
+        help="排名基于当年所有公司的数字化转型指数（加载数据时预先计算）"
+    )
+
+    top_n = st.slider("显示公司数量", min_value=5, max_value=100, value=20, step=5)
+
+st.metric(f"{selected_year}年参与排名的记录数", f"{query_engine.year_count(selected_year):,}")
+
+tab_top, tab_bottom, tab_growth = st.tabs([f"📈 前 {top_n} 名", f"📉 后 {top_n} 名", "🚀 增长排行"])
+
+with tab_top:
+    show_board(query_engine.leaderboard(selected_year, n=top_n))
+
+with tab_bottom:
+    show_board(query_engine.leaderboard(selected_year, n=top_n, bottom=True))
+
+with tab_growth:
+    # 增长排行来自加载时预先计算的公司汇总表
+    col1, col2 = st.columns(2)
+    with col1:
+        growth_column = st.selectbox("排序指标", ["总增长", "年均复合增长率", "平均指数", "最高指数"])
+    with col2:
+        min_years = st.slider("最少年份数", min_value=1, max_value=max(1, len(years)), value=min(5, len(years)))
+
+    growth_df = query_engine.companies_by(growth_column, limit=top_n, min_years=min_years).reset_index()
+    growth_df['年均复合增长率'] = (growth_df['年均复合增长率'] * 100).round(2)
+    growth_df = growth_df.rename(columns={'年均复合增长率': '年均复合增长率(%)'}).round(2)
+    growth_df.index = growth_df.index + 1
+    st.dataframe(growth_df, use_container_width=True)
+
+app_common.show_timings(query_engine, '年度排行榜')
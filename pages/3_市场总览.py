@@ -0,0 +1,82 @@
+import streamlit as st
+
+import analytics
+import app_common
+import charts
+import timing
+
+# 设置页面配置
+st.set_page_config(
+    page_title="市场总览 - 上市公司数字化转型指数查询系统",
+    page_icon="🗺️",
+    layout="wide"
+)
+
+st.title("🗺️ 市场总览")
+st.markdown("### 各板块数字化转型指数的历年走势")
+
+# 加载数据（与主页面共享同一个只读数据集）
+# 本页只读取加载时预先聚合的 年份 × 板块 立方体，不扫描明细数据
+query_engine = app_common.get_engine()
+cube = query_engine.market_cube.reset_index()
+
+STATISTICS = {'均值': '均值', '中位数': '中位数', 'P90（前10%分界）': 'P90'}
+measures = [col for col in analytics.CUBE_MEASURES if f'{col}均值' in cube.columns]
+all_boards = list(cube['板块'].unique())
+
+# 创建侧边栏
+with st.sidebar:
+    st.header("🔍 总览设置")
+
+    measure = st.selectbox("指标", options=measures, index=0)
+    statistic = st.radio("统计量", options=list(STATISTICS), index=0)
+    selected_boards = st.multiselect("板块", options=all_boards, default=all_boards)
+
+value_column = f'{measure}{STATISTICS[statistic]}'
+view = cube[cube['板块'].isin(selected_boards)]
+
+if view.empty:
+    st.info("🔍 请在侧边栏选择至少一个板块")
+else:
+    # 最新年份的全市场概况
+    latest_year = int(cube['年份'].max())
+    latest = cube[(cube['年份'] == latest_year) & (cube['板块'] == analytics.ALL_MARKET)]
+    if not latest.empty:
+        latest = latest.iloc[0]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric(f"{latest_year}年记录数", f"{int(latest['记录数']):,}")
+        with col2:
+            st.metric(f"{latest_year}年指数均值", f"{latest['数字化转型指数均值']:.2f}")
+        with col3:
+            st.metric(f"{latest_year}年指数中位数", f"{latest['数字化转型指数中位数']:.2f}")
+        with col4:
+            st.metric(f"{latest_year}年指数P90", f"{latest['数字化转型指数P90']:.2f}")
+
+    st.subheader(f"📈 {measure}{statistic}走势")
+    fig = charts.market_figure(view, value_column, f'{measure}（{statistic}）')
+    with timing.phase('显示图表'):
+        st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("📊 各板块记录数")
+    counts = view[view['板块'] != analytics.ALL_MARKET]
+    count_fig = charts.board_count_figure(counts)
+    with timing.phase('显示图表'):
+        st.plotly_chart(count_fig, use_container_width=True)
+
+    st.subheader("📋 聚合数据")
+    table = view.pivot(index='年份', columns='板块', values=value_column).round(2)
+    st.dataframe(table.sort_index(ascending=False), use_container_width=True)
+
+    with timing.phase('导出 CSV', rows=len(view)) as p:
+        csv = view.round(4).to_csv(index=False, encoding='utf-8-sig')
+    p.set(bytes=len(csv))
+    st.download_button(
+        label="💾 下载板块聚合数据 (CSV)",
+        data=csv,
+        file_name="数字化转型指数_板块聚合.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
+
+app_common.show_timings(query_engine, '市场总览')
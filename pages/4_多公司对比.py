@@ -0,0 +1,80 @@
+import pandas as pd
+import streamlit as st
+
+import analytics
+import app_common
+import charts
+import loader
+import normalize
+import timing
+
+# 设置页面配置
+st.set_page_config(
+    page_title="多公司对比 - 上市公司数字化转型指数查询系统",
+    page_icon="📉",
+    layout="wide"
+)
+
+st.title("📉 多公司对比")
+st.markdown("### 在同一张图上比较多家公司（或整个板块）的数字化转型指数走势")
+
+# 加载数据（与主页面共享同一个只读数据集）
+query_engine = app_common.get_engine()
+company_panel = query_engine.panel
+summary = query_engine.summary
+
+# 创建侧边栏
+with st.sidebar:
+    st.header("🔍 对比设置")
+
+    select_mode = st.radio("选择公司", ["输入股票代码", "整个板块"], index=0)
+    if select_mode == "输入股票代码":
+        pasted_codes = st.text_area(
+            "股票代码",
+            placeholder="每行一个，或用逗号、空格分隔\n例如：600611, 000001, 300750",
+            height=150
+        )
+        cleaned = normalize.clean_stock_codes(pd.Series(loader.parse_code_text(pasted_codes), dtype=object))
+        codes = [code for code in dict.fromkeys(cleaned) if code]
+    else:
+        boards = [name for _, name in analytics.BOARDS] + [analytics.OTHER_BOARD]
+        board = st.selectbox("板块", options=boards, index=0)
+        codes = list(summary.index[summary['板块'] == board])
+
+    column = st.selectbox("指标", options=list(company_panel.matrices), index=0)
+    max_companies = st.slider(
+        "最多显示公司数",
+        min_value=10,
+        max_value=2000,
+        value=charts.MAX_COMPANIES,
+        step=10,
+        help="超过时按平均指数均匀抽样，保留高、中、低各段的公司"
+    )
+
+if not codes:
+    st.info("🔍 请在侧边栏输入股票代码或选择板块")
+else:
+    names = summary['企业名称'].to_dict()
+    fig, info = charts.comparison_figure(company_panel, codes, names, column, max_companies)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("有数据的公司数", f"{info['requested']:,}")
+    with col2:
+        st.metric("图中公司数", f"{info['companies']:,}")
+    with col3:
+        st.metric("数据点数", f"{info['points']:,}")
+
+    if info['requested'] == 0:
+        st.warning("未找到匹配的数据，请检查输入的股票代码")
+    else:
+        if info['companies'] < info['requested']:
+            st.caption(f"公司较多，已按平均指数均匀抽取 {info['companies']:,} 家公司显示")
+        with timing.phase('显示图表'):
+            st.plotly_chart(fig, use_container_width=True)
+
+    missing = [code for code in codes if code not in company_panel]
+    if missing:
+        st.caption(f"未找到的代码（{len(missing)} 个）: {', '.join(missing[:20])}" + (" ..." if len(missing) > 20 else ""))
+
+app_common.show_timings(query_engine, '多公司对比')
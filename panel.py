@@ -0,0 +1,183 @@
+"""公司 × 年份稠密矩阵
+
+长表（每行一条 公司-年份 记录）做时间序列运算时，每次都要筛选、排序、去重。
+Panel 在加载时把数字化转型指数、技术维度、应用维度各展开成一个
+(公司数, 年份数) 的 NumPy 矩阵（列为数据中出现的年份，升序），缺失年份为 NaN，
+并提供 代码 → 行号 的索引。
+同比变化、滚动平均和年均复合增长率都直接在整个矩阵上一次算出所有公司的结果。
+
+与趋势图一致，每家公司每个年份只取第一条记录（数据已按代码、年份稳定排序）。
+追加新数据时（Panel.extended）只重新填充涉及的公司的行。
+"""
+import time
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+import indexes
+
+# 展开为矩阵的列
+PANEL_COLUMNS = ['数字化转型指数', '技术维度', '应用维度']
+
+
+def yoy(matrix, years, pct=False):
+    """同比变化：本年减上一年（pct=True 时为相对上一年的变化率，上一年不为正时为空）
+
+    第一列、上一年不在年份列中、以及任一年缺失的位置为 NaN。
+    """
+    change = np.full(matrix.shape, np.nan)
+    previous = matrix[:, :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = matrix[:, 1:] - previous
+        if pct:
+            delta = np.where(previous > 0, delta / previous, np.nan)
+    consecutive = np.diff(years) == 1
+    change[:, 1:] = np.where(consecutive, delta, np.nan)
+    return change
+
+
+def rolling_mean(matrix, window, min_periods=1):
+    """最近 window 个年份列的滚动平均（窗口内忽略缺失值，有效值少于 min_periods 时为 NaN）"""
+    valid = ~np.isnan(matrix)
+    zeros = np.zeros((matrix.shape[0], 1))
+    sums = np.hstack([zeros, np.cumsum(np.where(valid, matrix, 0.0), axis=1)])
+    counts = np.hstack([zeros, np.cumsum(valid, axis=1)])
+    stop = np.arange(matrix.shape[1]) + 1
+    start = np.maximum(stop - window, 0)
+    window_sums = sums[:, stop] - sums[:, start]
+    window_counts = counts[:, stop] - counts[:, start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(window_counts >= max(min_periods, 1), window_sums / window_counts, np.nan)
+
+
+def first_last(matrix):
+    """每行第一个和最后一个有效值的列号，以及该行是否有有效值"""
+    valid = ~np.isnan(matrix)
+    has_value = valid.any(axis=1)
+    first = valid.argmax(axis=1)
+    last = matrix.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    return first, last, has_value
+
+
+def cagr(matrix, years):
+    """每行从第一个到最后一个有效年份的年均复合增长率
+
+    (末年值 / 首年值) ^ (1 / 年数跨度) - 1，首年值不为正或只有一年时为 NaN。
+    """
+    first, last, has_value = first_last(matrix)
+    rows = np.arange(matrix.shape[0])
+    first_value = matrix[rows, first]
+    last_value = matrix[rows, last]
+    span = (years[last] - years[first]).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (last_value / first_value) ** (1.0 / span) - 1
+    return np.where(has_value & (first_value > 0) & (span > 0), rate, np.nan)
+
+
+class Panel:
+    """公司 × 年份稠密矩阵（只读）"""
+
+    def __init__(self, df, columns=PANEL_COLUMNS):
+        started = time.perf_counter()
+        rows = df.drop_duplicates(['股票代码', '年份'])
+        row_numbers, codes = pd.factorize(rows['股票代码'].astype(str), sort=True)
+        year_numbers, years = pd.factorize(rows['年份'].to_numpy(dtype=np.int64), sort=True)
+        years = np.asarray(years, dtype=np.int64)
+
+        matrices = {}
+        for column in columns:
+            if column not in rows.columns:
+                continue
+            matrix = np.full((len(codes), len(years)), np.nan)
+            matrix[row_numbers, year_numbers] = rows[column].to_numpy(dtype=float)
+            matrices[column] = matrix
+        self._assign(tuple(codes), years, matrices, started)
+
+    def _assign(self, codes, years, matrices, started):
+        for matrix in matrices.values():
+            matrix.flags.writeable = False
+        years.flags.writeable = False
+        self.codes = codes
+        self.years = years
+        self.row_of = MappingProxyType({code: row for row, code in enumerate(self.codes)})
+        self.matrices = MappingProxyType(matrices)
+        self.build_seconds = time.perf_counter() - started
+
+    def extended(self, rows):
+        """追加数据后的矩阵：rows 为新增数据涉及的公司的全部记录，只重新填充这些公司的行
+
+        新代码和新年份按顺序插入，其余公司的数值直接复制。
+        """
+        started = time.perf_counter()
+        touched = Panel(rows, list(self.matrices))
+        codes = indexes.merge_codes(self.codes, touched.codes)
+        years = np.union1d(self.years, touched.years)
+
+        if codes is self.codes:
+            old_rows = np.arange(len(codes))
+            row_of = self.row_of
+        else:
+            row_of = {code: row for row, code in enumerate(codes)}
+            old_rows = np.fromiter(map(row_of.__getitem__, self.codes), dtype=np.int64, count=len(self.codes))
+        touched_rows = np.fromiter(map(row_of.__getitem__, touched.codes), dtype=np.int64, count=len(touched.codes))
+        old_cols = np.searchsorted(years, self.years)
+        touched_cols = np.searchsorted(years, touched.years)
+        matrices = {}
+        for column, old_matrix in self.matrices.items():
+            matrix = np.full((len(codes), len(years)), np.nan)
+            matrix[np.ix_(old_rows, old_cols)] = old_matrix
+            matrix[touched_rows] = np.nan
+            matrix[np.ix_(touched_rows, touched_cols)] = touched.matrices[column]
+            matrices[column] = matrix
+
+        extended = Panel.__new__(Panel)
+        extended._assign(codes, years, matrices, started)
+        return extended
+
+    @property
+    def nbytes(self):
+        """矩阵和年份数组占用的字节数"""
+        return sum(matrix.nbytes for matrix in self.matrices.values()) + self.years.nbytes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self.row_of
+
+    def matrix(self, column='数字化转型指数'):
+        return self.matrices[column]
+
+    def row(self, code):
+        """代码对应的行号，不存在时返回 None"""
+        return self.row_of.get(code)
+
+    def series(self, code, column='数字化转型指数', values=None):
+        """单个公司的年度序列（以年份为索引，去掉缺失年份）
+
+        values 可以传入由 yoy/rolling_mean 等得到的同形状矩阵，默认取 column 对应的原始矩阵。
+        """
+        row = self.row(code)
+        if row is None:
+            return pd.Series(dtype=float, name=column)
+        values = self.matrices[column] if values is None else values
+        result = pd.Series(values[row], index=pd.Index(self.years, name='年份'), name=column)
+        return result.dropna()
+
+    def to_frame(self, values):
+        """把同形状的矩阵包装成 公司 × 年份 的 DataFrame"""
+        return pd.DataFrame(
+            values,
+            index=pd.Index(self.codes, name='股票代码'),
+            columns=pd.Index(self.years, name='年份')
+        )
+
+    def yoy(self, column='数字化转型指数', pct=False):
+        return yoy(self.matrices[column], self.years, pct)
+
+    def rolling_mean(self, column='数字化转型指数', window=3, min_periods=1):
+        return rolling_mean(self.matrices[column], window, min_periods)
+
+    def cagr(self, column='数字化转型指数'):
+        return cagr(self.matrices[column], self.years)
@@ -0,0 +1,102 @@
+"""源文件热更新：后台轮询工作簿和增量数据目录，变化后在后台线程更新查询引擎并原子替换
+
+SourceWatcher.engine 始终指向一个完整构建好的引擎。新版本在后台线程中完整加载、
+清洗并建立全部索引和汇总表之后，才用一次属性赋值替换 engine；正在运行的会话继续
+使用它开始时取到的旧引擎，之后的重跑取到新引擎。查询请求从不等待重新加载。
+
+只新增了增量文件时，把新文件逐个追加到当前引擎（只清洗新文件，见 Engine.appended）；
+主工作簿或已有的增量文件变化、删除时完整重建。
+
+文件正在写入时大小和修改时间还会变化，因此要求连续两次轮询看到相同的文件状态才重新加载。
+重新加载失败（如工作簿仍被 Excel 锁定）时不记录新的文件状态，之后的轮询会再次尝试。
+"""
+import threading
+import time
+
+import columnar_cache
+import loader
+
+# 默认轮询间隔（秒）
+POLL_SECONDS = 30
+
+
+def file_state(path):
+    """源文件的状态（缓存键）；文件不存在或无法访问时返回 None"""
+    try:
+        return columnar_cache.source_key(path)
+    except OSError:
+        return None
+
+
+class SourceWatcher:
+    """监视源文件并在后台重建引擎
+
+    build(path) 负责加载主工作簿和全部增量文件并返回新引擎；append(engine, delta_path) 返回追加了
+    一个增量文件的新引擎。两者失败时抛出异常（旧引擎继续使用，文件状态不更新，之后重试）；
+    无法加载的增量文件在两种方式下应以相同的方式处理（见 engine.watch）。
+    """
+
+    def __init__(self, path, build, engine, interval=POLL_SECONDS, delta_dir=None, append=None):
+        self.path = path
+        self.build = build
+        self.engine = engine
+        self.interval = interval
+        self.delta_dir = delta_dir
+        self.append = append
+        self.reloads = 0
+        self.loaded_at = time.time()
+        self.last_error = None
+        self._state = self._snapshot()
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """启动后台轮询线程（守护线程，interval 不大于 0 时不启动）"""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='source-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def _snapshot(self):
+        """主工作簿和各增量文件的状态"""
+        deltas = {path: file_state(path) for path in loader.delta_files(self.delta_dir)}
+        return file_state(self.path), deltas
+
+    def check(self):
+        """检查一次文件状态，需要时重新加载；返回是否替换了引擎"""
+        state = self._snapshot()
+        if state[0] is None or state == self._state:
+            self._pending = None
+            return False
+        if state != self._pending:
+            # 第一次看到新状态，等下一次轮询确认文件已写完
+            self._pending = state
+            return False
+
+        (old_base, old_deltas), (base, deltas) = self._state, state
+        self._pending = None
+        try:
+            if self.append is not None and base == old_base and old_deltas.items() <= deltas.items():
+                # 只新增了增量文件：追加到当前引擎
+                new_engine = self.engine
+                for delta_path in sorted(set(deltas) - set(old_deltas)):
+                    new_engine = self.append(new_engine, delta_path)
+            else:
+                new_engine = self.build(self.path)
+        except Exception as e:
+            self.last_error = str(e)
+            return False
+        self._state = state
+        self.engine = new_engine
+        self.reloads += 1
+        self.loaded_at = time.time()
+        self.last_error = None
+        return True
@@ -0,0 +1,156 @@
+"""工作簿结构识别：只读表头和少量样本行确定列名映射与列类型
+
+完整读取工作簿之前，先用 openpyxl 的只读（流式）模式读取第一个工作表的表头和前
+SAMPLE_ROWS 行，在样本上识别标准列，并为要读取的列确定类型。随后完整读取时只加载
+这些列（usecols），并显式指定类型，不再对每一列做类型推断。
+
+识别结果保存在列式缓存目录的 schema.json 中，以表头为键；之后加载表头相同的工作簿
+（例如数据更新后）直接复用映射和类型，不再识别。
+"""
+import json
+import os
+
+import pandas as pd
+
+import columnar_cache
+
+SCHEMA_FILE = 'schema.json'
+
+# 用于识别列名映射和列类型的样本行数
+SAMPLE_ROWS = 200
+
+# 按字符串读取的标准列（保留代码前导零，名称不做类型推断）
+TEXT_COLUMNS = ['股票代码', '企业名称']
+
+# openpyxl 能以只读模式打开的格式
+STREAMING_SUFFIXES = ('.xlsx', '.xlsm')
+
+
+def standardize_name(col):
+    """标准化列名 - 去掉空格和换行"""
+    return str(col).strip().replace('\n', '').replace('\r', '')
+
+
+def sniff(excel_path, sample_rows=SAMPLE_ROWS):
+    """读取第一个工作表的表头（标准化后的列名）和前 sample_rows 行样本
+
+    表头的处理与 pd.read_excel 一致：空单元格命名为 "Unnamed: 序号"，重复列名加 ".序号"。
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        sample = [row for _, row in zip(range(sample_rows), rows)]
+    finally:
+        workbook.close()
+
+    names, seen = [], {}
+    for position, cell in enumerate(header):
+        name = f'Unnamed: {position}' if cell is None else cell
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    columns = [standardize_name(name) for name in names]
+    width = len(columns)
+    sample_df = pd.DataFrame(
+        [tuple(row[:width]) + (None,) * (width - len(row)) for row in sample], columns=columns
+    )
+    return columns, sample_df
+
+
+def infer_dtypes(sample_df, column_mapping):
+    """为映射到的原始列确定读取类型
+
+    代码和名称列按字符串读取；样本中全是数值的列按 float64 读取；
+    其余列（如“2020年”这样的年份文本）不指定类型，由读取器按单元格原样读取。
+    """
+    dtypes = {}
+    for raw_name, standard_name in column_mapping.items():
+        if standard_name in TEXT_COLUMNS:
+            dtypes[raw_name] = 'str'
+            continue
+        values = sample_df[raw_name].dropna()
+        if len(values) and values.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)).all():
+            dtypes[raw_name] = 'float64'
+    return dtypes
+
+
+def detect_schema(excel_path, detect_columns):
+    """确定工作簿的读取方式，返回 schema 字典；不适用（如 .xls）或读取失败时返回 None
+
+    schema 包含 columns（全部标准化列名）、column_mapping（{原始列名: 标准列名}）、
+    usecols（要读取的列序号）、dtypes（{原始列名: 类型}）和 from_saved（是否复用已保存的识别结果）。
+    detect_columns 为识别列名映射的函数（见 loader.detect_columns），只在样本上调用。
+    """
+    if not excel_path.lower().endswith(STREAMING_SUFFIXES):
+        return None
+    try:
+        columns, sample_df = sniff(excel_path)
+    except Exception:
+        return None
+
+    saved = read_schema(excel_path)
+    if saved is not None and saved.get('columns') == columns:
+        return dict(saved, from_saved=True)
+
+    column_mapping = detect_columns(sample_df)
+    if not column_mapping:
+        return None
+    schema = {
+        'columns': columns,
+        'column_mapping': column_mapping,
+        'usecols': [columns.index(name) for name in column_mapping],
+        'dtypes': infer_dtypes(sample_df, column_mapping),
+    }
+    write_schema(excel_path, schema)
+    return dict(schema, from_saved=False)
+
+
+def read_with_schema(excel_path, schema):
+    """按 schema 只读取映射到的列，返回以标准化原始列名为列名的 DataFrame
+
+    样本之后出现非数值单元格导致 float64 读取失败时，这些列改为不指定类型重新读取。
+    """
+    usecols = sorted(schema['usecols'])
+    names = [schema['columns'][position] for position in usecols]
+    dtypes = {
+        position: schema['dtypes'][name]
+        for position, name in zip(usecols, names) if name in schema['dtypes']
+    }
+    # 跳过表头按列序号读取，类型也按列序号指定
+    read = dict(header=None, skiprows=1, usecols=usecols)
+    try:
+        df = pd.read_excel(excel_path, dtype=dtypes, **read)
+    except (ValueError, TypeError):
+        text_only = {position: dtype for position, dtype in dtypes.items() if dtype == 'str'}
+        df = pd.read_excel(excel_path, dtype=text_only, **read)
+    df.columns = names
+    return df
+
+
+def read_schema(excel_path):
+    """读取已保存的识别结果，不存在或无法解析时返回 None"""
+    try:
+        with open(os.path.join(columnar_cache.cache_dir(excel_path), SCHEMA_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def write_schema(excel_path, schema):
+    """保存识别结果（写入失败不影响加载）"""
+    folder = columnar_cache.cache_dir(excel_path)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        tmp_path = os.path.join(folder, SCHEMA_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(folder, SCHEMA_FILE))
+        return True
+    except Exception:
+        return False
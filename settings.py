@@ -0,0 +1,34 @@
+"""运行配置：数据文件路径和各项开关（Streamlit 页面和 HTTP 查询接口共用），均可通过环境变量设置"""
+import os
+
+import reloader
+
+# 数据文件路径 - 请修改为您的实际文件路径，也可以通过环境变量 DIGITAL_INDEX_PATH 指定
+EXCEL_PATH = os.environ.get(
+    'DIGITAL_INDEX_PATH',
+    r'C:\Users\HUMENGQI\Desktop\1999-2023年数字化转型指数汇总.xlsx'
+)
+
+# 紧凑内存模式（可选）：设置环境变量 DIGITAL_INDEX_COMPACT=1 开启
+COMPACT_MODE = os.environ.get('DIGITAL_INDEX_COMPACT', '') == '1'
+
+# 增量数据目录：其中的每个工作簿（如新一年的数据）按文件名顺序追加到主数据之后，
+# 默认为数据文件同目录下的“增量数据”文件夹（数据文件路径先转为绝对路径，不随启动目录变化），
+# 也可以通过环境变量 DIGITAL_INDEX_DELTA_DIR 指定
+DELTA_DIR = os.environ.get(
+    'DIGITAL_INDEX_DELTA_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(EXCEL_PATH)), '增量数据')
+)
+
+# 源文件热更新的轮询间隔（秒）：设置环境变量 DIGITAL_INDEX_POLL_SECONDS=0 关闭
+POLL_SECONDS = float(os.environ.get('DIGITAL_INDEX_POLL_SECONDS', reloader.POLL_SECONDS))
+
+# HTTP/JSON 查询接口（见 api.py）：设置环境变量 DIGITAL_INDEX_API_PORT 后，Streamlit 进程在该端口
+# 同时提供查询接口，与页面共用同一个内存数据集；不设置时不启动
+API_PORT = int(os.environ.get('DIGITAL_INDEX_API_PORT', '0') or 0)
+
+# 分阶段计时（见 timing.py）：设置环境变量 DIGITAL_INDEX_TIMING=1 后在侧边栏显示各阶段耗时；
+# 设置 DIGITAL_INDEX_TIMING_LOG 为文件路径时同时开启计时，并把每次页面运行的记录和会话内的
+# p50/p95 汇总追加到该 JSON Lines 文件
+TIMING_LOG = os.environ.get('DIGITAL_INDEX_TIMING_LOG', '')
+TIMING = os.environ.get('DIGITAL_INDEX_TIMING', '') == '1' or bool(TIMING_LOG)
@@ -0,0 +1,68 @@
+"""走势相似的公司：公司 × 年份矩阵上的 k 近邻
+
+两家公司只在双方都有数据的年份上比较：
+- 'level'：重叠年份上指数差的均方根，指数水平和走势都接近才算相似；
+- 'shape'：先各自减去重叠年份上的均值再比较，只看走势形状，不看指数高低。
+重叠年份少于 min_overlap 的公司不参与排序。
+
+候选公司按 chunk_rows 行分块计算，临时数组大小与公司总数无关。
+"""
+import numpy as np
+
+# 每块计算的公司数
+CHUNK_ROWS = 4096
+
+MODES = ('level', 'shape')
+
+
+def trajectory_distances(matrix, target, min_overlap=3, mode='level', chunk_rows=CHUNK_ROWS):
+    """target 与 matrix 每一行在重叠年份上的距离
+
+    返回 (距离, 重叠年份数) 两个数组，重叠年份不足时距离为 inf。
+    """
+    if mode not in MODES:
+        raise ValueError(f"未知的相似度模式: {mode}")
+    target_valid = ~np.isnan(target)
+    target_values = np.where(target_valid, target, 0.0)
+
+    n_rows = matrix.shape[0]
+    distances = np.full(n_rows, np.inf)
+    overlaps = np.zeros(n_rows, dtype=np.int64)
+    for start in range(0, n_rows, chunk_rows):
+        block = matrix[start:start + chunk_rows]
+        valid = ~np.isnan(block) & target_valid
+        diff = np.where(valid, block - target_values, 0.0)
+        count = valid.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_square = (diff * diff).sum(axis=1) / count
+            if mode == 'shape':
+                mean_square -= (diff.sum(axis=1) / count) ** 2
+        block_distances = np.sqrt(np.maximum(mean_square, 0.0))
+        distances[start:start + chunk_rows] = np.where(count >= min_overlap, block_distances, np.inf)
+        overlaps[start:start + chunk_rows] = count
+    return distances, overlaps
+
+
+def nearest(matrix, row, k=5, min_overlap=3, mode='level', chunk_rows=CHUNK_ROWS):
+    """与第 row 行走势最相似的 k 行
+
+    返回 [(行号, 距离, 重叠年份数)]，按距离升序（距离相同时按行号）。目标公司的数据年份少于
+    min_overlap 时改为要求覆盖其全部年份（'shape' 模式至少 2 年）。
+    """
+    target = matrix[row]
+    n_years = int((~np.isnan(target)).sum())
+    min_overlap = max(min(min_overlap, n_years), 2 if mode == 'shape' else 1)
+    if n_years < min_overlap or k <= 0:
+        return []
+
+    distances, overlaps = trajectory_distances(matrix, target, min_overlap, mode, chunk_rows)
+    distances[row] = np.inf
+    finite = np.count_nonzero(np.isfinite(distances))
+    k = min(k, finite)
+    if k == 0:
+        return []
+    # 取距离不超过第 k 小距离的全部行（与第 k 名并列的行都在内），再按 (距离, 行号) 排序取前 k 个
+    kth = np.partition(distances, k - 1)[k - 1]
+    candidates = np.flatnonzero(distances <= kth)
+    candidates = candidates[np.lexsort((candidates, distances[candidates]))][:k]
+    return [(int(i), float(distances[i]), int(overlaps[i])) for i in candidates]
@@ -0,0 +1,350 @@
+"""SQLite 存储后端：把清洗后的数据物化为本地数据库文件，查询下推为 SQL
+
+内存后端（Engine + Dataset）在每个进程中保存完整的数据表和派生结构，数据量远超当前规模后
+难以扩展。SqlEngine 提供与 Engine 相同的查询接口（代码、名称、年份、批量查询、趋势、
+统计、排行榜），数据只在磁盘上保存一份，每次查询只读取命中的行：
+
+    sql_engine = SqlEngine.from_path('1999-2023年数字化转型指数汇总.xlsx')
+    rows = sql_engine.lookup_code('600611')
+    top10 = sql_engine.leaderboard(2023, n=10)
+
+数据库文件保存在源文件的列式缓存目录中（见 columnar_cache.py），用同样的缓存键判断是否失效。
+表结构：
+- records：清洗后的数据（含年度排名列），行号为内存后端数据表中的行位置；
+  (股票代码, 年份)、(年份, 数字化转型指数降序) 和企业名称上有索引；
+- companies：唯一股票代码及最近一年的企业名称（代码包含查询和前缀联想）；
+- summary：公司汇总表（见 analytics.company_summary），单个公司的统计只需按主键取一行；
+- names：唯一企业名称的 FTS5 三元组全文索引（名称子串查询）；
+- meta：缓存键、数据版本、年份列表和两张表各列的 pandas 类型。
+
+查询结果的行、顺序、索引（行号）和列类型与内存后端一致。
+面板矩阵、市场立方体和走势相似度等整表分析仍只由内存后端提供。
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import columnar_cache
+import engine
+import loader
+import normalize
+
+DATABASE_FILE = 'data.sqlite'
+
+# 批量插入时每批的行数
+INSERT_BATCH = 100_000
+
+# 三元组索引只能匹配至少 3 个字符的查询串，更短的查询在唯一名称上扫描
+TRIGRAM = 3
+
+
+def database_path(source_path):
+    """源文件对应的数据库文件（在列式缓存目录中）"""
+    return os.path.join(columnar_cache.cache_dir(source_path), DATABASE_FILE)
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _storage_dtype(dtype):
+    """结果表恢复使用的列类型（紧凑模式的分类列按其类别的类型保存）"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return str(dtype.categories.dtype)
+    return str(dtype)
+
+
+def _column_builder(dtype):
+    """把查询返回的一列 Python 值转换为指定类型的数组（数值列直接构造 NumPy 数组，NULL 转为 NaN）"""
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iufb':
+        return lambda values: np.array(values, dtype=dtype)
+    return lambda values: pd.array(values, dtype=dtype)
+
+
+def _create_table(conn, name, df, key_column, key_type):
+    """按 df 的列建表并批量写入，key_column 为整数主键或文本主键"""
+    column_defs = ', '.join(f'{_quote(col)} {_sql_type(df[col].dtype)}' for col in df.columns)
+    conn.execute(f'CREATE TABLE {name} ({_quote(key_column)} {key_type} PRIMARY KEY, {column_defs})')
+    placeholders = ', '.join('?' * (len(df.columns) + 1))
+    insert = f'INSERT INTO {name} VALUES ({placeholders})'
+    for start in range(0, len(df), INSERT_BATCH):
+        chunk = df.iloc[start:start + INSERT_BATCH]
+        values = [chunk.index.tolist()]
+        for col in df.columns:
+            series = chunk[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype(_storage_dtype(series.dtype))
+            values.append(series.astype(object).where(series.notna(), None).tolist())
+        conn.executemany(insert, zip(*values))
+
+
+def build_database(df, db_path, key=None, version=None):
+    """把已清洗的数据表写入数据库文件（先写临时文件再替换，读者不会看到写了一半的数据库）
+
+    df 按 (股票代码, 年份) 排序；年度排名列在写入前按内存后端相同的规则计算。
+    """
+    df = analytics.add_year_ranks(df).reset_index(drop=True)
+    summary = analytics.company_summary(df)
+
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    tmp_path = f'{db_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        _create_table(conn, 'records', df, '行号', 'INTEGER')
+        conn.execute('CREATE INDEX records_code_year ON records (股票代码, 年份)')
+        conn.execute('CREATE INDEX records_year_index ON records (年份, 数字化转型指数 DESC)')
+        conn.execute('CREATE INDEX records_name ON records (企业名称)')
+
+        # 每个代码最近一年的企业名称（代码区间内按年份升序，取最后一行）
+        conn.execute(
+            'CREATE TABLE companies (股票代码 TEXT PRIMARY KEY, 企业名称 TEXT) WITHOUT ROWID'
+        )
+        latest = df.drop_duplicates('股票代码', keep='last')
+        conn.executemany('INSERT INTO companies VALUES (?, ?)', zip(
+            latest['股票代码'].astype(str).tolist(), latest['企业名称'].astype(str).tolist()
+        ))
+
+        _create_table(conn, 'summary', summary, '股票代码', 'TEXT')
+
+        names = pd.unique(df['企业名称'].astype(object))
+        names = [name for name in names if isinstance(name, str)]
+        conn.execute("CREATE VIRTUAL TABLE names USING fts5(name, name_lower UNINDEXED, tokenize='trigram')")
+        conn.executemany('INSERT INTO names VALUES (?, ?)', ((name, name.lower()) for name in names))
+
+        years = sorted(int(year) for year in df['年份'].unique())
+        conn.execute('CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)')
+        conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+            ('key', json.dumps(key)),
+            ('version', json.dumps(version)),
+            ('dtypes', json.dumps({col: _storage_dtype(df[col].dtype) for col in df.columns}, ensure_ascii=False)),
+            ('summary_dtypes', json.dumps({col: str(summary[col].dtype) for col in summary.columns}, ensure_ascii=False)),
+            ('years', json.dumps(years)),
+            ('rows', json.dumps(len(df))),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+def read_meta(db_path):
+    """读取数据库的 meta 表；文件不存在或不完整时返回 None"""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = sqlite3.connect(f'file:{quote(os.path.abspath(db_path))}?mode=ro', uri=True)
+        try:
+            return {name: json.loads(value) for name, value in conn.execute('SELECT name, value FROM meta')}
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+class SqlEngine:
+    """SQLite 后端的查询引擎（查询接口与 engine.Engine 相同）
+
+    每个线程使用自己的只读连接，可以在多个线程/会话间共用。
+    """
+
+    def __init__(self, db_path, load_info=None):
+        self.db_path = db_path
+        self.load_info = load_info or {}
+        meta = read_meta(db_path)
+        if meta is None:
+            raise ValueError(f"数据库文件不存在或已损坏: {db_path}")
+        self.meta = meta
+        self.columns = list(meta['dtypes'])
+        self._builders = {col: _column_builder(dtype) for col, dtype in meta['dtypes'].items()}
+        self._summary_builders = {col: _column_builder(dtype) for col, dtype in meta['summary_dtypes'].items()}
+        self._local = threading.local()
+
+    @classmethod
+    def from_frame(cls, df, db_path, version=None, load_info=None):
+        """由已清洗的数据表创建数据库文件和引擎"""
+        version = version or df.attrs.get('data_version')
+        return cls(build_database(df, db_path, version=version), load_info)
+
+    @classmethod
+    def from_path(cls, excel_path, compact=False):
+        """打开源文件对应的数据库；数据库不存在或源文件已变化时先加载数据（优先使用列式缓存）
+        再重新生成。加载失败时抛出 ValueError
+
+        compact 只为与 Engine.from_path 的参数一致，数据库中的列类型与非紧凑模式相同。
+        “增量数据”目录中的文件不会写入数据库。
+        """
+        if not os.path.exists(excel_path):
+            raise ValueError(f"数据加载失败: 文件不存在: {excel_path}")
+        db_path = database_path(excel_path)
+        key = columnar_cache.source_key(excel_path)
+        meta = read_meta(db_path)
+        if meta is not None and meta.get('key') == key:
+            return cls(db_path, {'from_cache': True, 'messages': []})
+
+        df, info = loader.load_frame(excel_path)
+        if df is None or df.empty:
+            details = '; '.join(text for _, text in info['messages'])
+            raise ValueError(f"数据加载失败: {excel_path} {details}")
+        build_database(df, db_path, key, columnar_cache.version_of(key))
+        return cls(db_path, info)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            uri = f'file:{quote(os.path.abspath(self.db_path))}?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def _query(self, where='', params=(), order='行号', limit=None):
+        """查询 records 表，返回与内存后端相同列类型、以行号为索引的数据表"""
+        columns = ', '.join(_quote(col) for col in self.columns)
+        sql = f'SELECT 行号, {columns} FROM records'
+        if where:
+            sql += f' WHERE {where}'
+        sql += f' ORDER BY {order}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        rows = self._connection().execute(sql, params).fetchall()
+        values = list(zip(*rows)) or [()] * (len(self.columns) + 1)
+        return pd.DataFrame(
+            {col: self._builders[col](column) for col, column in zip(self.columns, values[1:])},
+            index=pd.Index(np.array(values[0], dtype=np.int64)),
+            copy=False
+        )
+
+    def _scalar(self, sql, params=()):
+        row = self._connection().execute(sql, params).fetchone()
+        return None if row is None else row[0]
+
+    @property
+    def version(self):
+        return self.meta.get('version')
+
+    def lookup_code(self, text):
+        """按股票代码查询：先精确匹配，找不到时匹配包含该代码的所有公司"""
+        search_code = normalize.clean_stock_code(text)
+        result_df = self._query('股票代码 = ?', (search_code,))
+        if result_df.empty:
+            result_df = self._query(
+                '股票代码 IN (SELECT 股票代码 FROM companies WHERE instr(股票代码, ?) > 0)', (search_code,)
+            )
+        return result_df
+
+    def matching_names(self, text):
+        """名称匹配 text 的所有唯一企业名称（语义同 str.contains(text, case=False)）"""
+        pattern = re.compile(text, flags=re.IGNORECASE)
+        conn = self._connection()
+        if not text or re.escape(text) != text:
+            # 空串或含正则元字符时无法用索引，在唯一名称上做正则匹配
+            candidates = conn.execute('SELECT name FROM names')
+        elif len(text) >= TRIGRAM:
+            phrase = '"' + text.replace('"', '""') + '"'
+            candidates = conn.execute('SELECT name FROM names WHERE names MATCH ?', (phrase,))
+        else:
+            candidates = conn.execute('SELECT name FROM names WHERE instr(name_lower, ?) > 0', (text.lower(),))
+        return [name for (name,) in candidates if pattern.search(name)]
+
+    def search_name(self, text):
+        """按企业名称模糊查询（不区分大小写）"""
+        names = self.matching_names(text)
+        return self._query(
+            '企业名称 IN (SELECT value FROM json_each(?))', (json.dumps(names, ensure_ascii=False),)
+        )
+
+    def similar_names(self, text, limit=5):
+        """名称前两个字相同的公司（查询无结果时给用户参考）"""
+        similar = self.search_name(text[:2])
+        return similar[['股票代码', '企业名称']].drop_duplicates().head(limit)
+
+    def suggest_codes(self, prefix, k=10):
+        """以 prefix 开头的前 k 个 (股票代码, 企业名称)"""
+        rows = self._connection().execute(
+            "SELECT 股票代码, 企业名称 FROM companies WHERE 股票代码 >= ? AND 股票代码 < ? "
+            "AND 股票代码 != '' ORDER BY 股票代码 LIMIT ?",
+            (prefix, prefix + chr(0x10FFFF), int(k))
+        )
+        return [tuple(row) for row in rows]
+
+    def has_code(self, code):
+        return self._scalar('SELECT 1 FROM companies WHERE 股票代码 = ?', (code,)) is not None
+
+    filter_year = staticmethod(engine.Engine.filter_year)
+
+    def batch_lookup(self, codes, start_year=None, end_year=None):
+        """批量查询多个股票代码（可选年份范围），代码和年份条件都下推到 SQL；返回值见 engine.batch_result"""
+        requested = engine.requested_codes(codes)
+        candidates = json.dumps(sorted(set(requested['股票代码']) - {''}))
+        known_codes = {code for (code,) in self._connection().execute(
+            'SELECT 股票代码 FROM companies WHERE 股票代码 IN (SELECT value FROM json_each(?))', (candidates,)
+        )}
+        known = requested['股票代码'].map(known_codes.__contains__).astype(bool)
+
+        where = ['股票代码 IN (SELECT value FROM json_each(?))']
+        params = [json.dumps(sorted(known_codes))]
+        if start_year is not None:
+            where.append('年份 >= ?')
+            params.append(int(start_year))
+        if end_year is not None:
+            where.append('年份 <= ?')
+            params.append(int(end_year))
+        rows = self._query(' AND '.join(where), params)
+        return engine.batch_result(requested, known, rows)
+
+    @property
+    def company_count(self):
+        """有股票代码的公司数"""
+        return self._scalar("SELECT count(*) FROM companies WHERE 股票代码 != ''")
+
+    @property
+    def years(self):
+        """数据中出现的所有年份（升序）"""
+        return tuple(self.meta['years'])
+
+    def year_count(self, year):
+        """某一年的记录数（排名的分母）"""
+        return self._scalar('SELECT count(*) FROM records WHERE 年份 = ?', (int(year),))
+
+    def leaderboard(self, year, n=10, bottom=False):
+        """某一年指数最高（bottom=True 时最低）的 n 条记录；同分时的顺序与内存后端的稳定排序相同"""
+        order = '数字化转型指数 ASC, 行号 DESC' if bottom else '数字化转型指数 DESC, 行号'
+        return self._query('年份 = ?', (int(year),), order=order, limit=n)
+
+    def trend(self, code):
+        """单个公司的历年趋势数据"""
+        return engine.trend_frame(self._query('股票代码 = ?', (code,)))
+
+    def stats(self, code):
+        """单个公司的趋势统计（汇总表的一行），无数据时返回 None"""
+        columns = list(self._summary_builders)
+        row = self._connection().execute(
+            f'SELECT {", ".join(_quote(col) for col in columns)} FROM summary WHERE 股票代码 = ?', (code,)
+        ).fetchone()
+        if row is None:
+            return None
+        values = {col: self._summary_builders[col]([value])[0] for col, value in zip(columns, row)}
+        return analytics.summary_stats(pd.Series(values))
+
+    def __len__(self):
+        return self.meta['rows']
@@ -0,0 +1,181 @@
+"""分阶段计时：记录加载的各个步骤、每次查询和页面渲染的耗时、涉及行数和输出字节数
+
+本模块不依赖 Streamlit。默认关闭，关闭时 phase() 返回共享的空对象、timed() 包装的函数只多一次
+标志判断，开销可以忽略；由界面层根据配置调用 enable() 开启（见 settings.TIMING）。
+
+记录只进入当前线程正在收集的列表（见 collect），没有收集者时直接丢弃：
+    with timing.collect() as records:
+        with timing.phase('读取工作簿') as p:
+            df = read(...)
+            p.set(rows=len(df))
+    summarize(records)   # 按阶段汇总次数、p50/p95 耗时
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+_enabled = False
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+def enable(on=True):
+    """开启（或关闭）计时，对整个进程生效"""
+    global _enabled
+    _enabled = on
+
+
+def enabled():
+    return _enabled
+
+
+class Phase:
+    """一个计时阶段：名称、耗时（毫秒）、涉及行数和输出字节数"""
+
+    __slots__ = ('name', 'ms', 'rows', 'bytes', '_start')
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.ms = None
+        self.rows = rows
+        self.bytes = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self._start) * 1000
+        records = getattr(_local, 'records', None)
+        if records is not None:
+            records.append(self)
+        return False
+
+    def set(self, rows=None, bytes=None):
+        """补充涉及的行数和输出的字节数（阶段结束后也可以设置）"""
+        if rows is not None:
+            self.rows = rows
+        if bytes is not None:
+            self.bytes = bytes
+
+    def as_dict(self):
+        return {'phase': self.name, 'ms': self.ms, 'rows': self.rows, 'bytes': self.bytes}
+
+
+class _Disabled:
+    """计时关闭时使用的空阶段"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, rows=None, bytes=None):
+        pass
+
+
+DISABLED = _Disabled()
+
+
+def phase(name, rows=None):
+    """计时一个代码块：with phase('清洗', rows=len(df)) as p: ..."""
+    if not _enabled:
+        return DISABLED
+    return Phase(name, rows)
+
+
+def timed(name, rows=len, size=None):
+    """计时整个函数的装饰器
+
+    rows、size 为从返回值计算行数和字节数的函数（None 表示不记录），只在计时开启时调用。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Phase(name) as p:
+                result = func(*args, **kwargs)
+            try:
+                p.set(
+                    rows=rows(result) if rows is not None else None,
+                    bytes=size(result) if size is not None else None,
+                )
+            except Exception:
+                pass
+            return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect():
+    """收集本线程在 with 块内完成的阶段（嵌套时只进入最内层），产出 Phase 列表"""
+    outer = getattr(_local, 'records', None)
+    records = []
+    _local.records = records
+    try:
+        yield records
+    finally:
+        _local.records = outer
+
+
+def begin(name='页面运行'):
+    """开始收集本线程之后完成的阶段（如一次页面运行，整体耗时记为 name 阶段）；替换之前未结束的收集"""
+    _local.records = []
+    _local.run = Phase(name).__enter__() if _enabled else None
+
+
+def end():
+    """结束 begin() 开始的收集，返回收集到的阶段（最后一项为整体耗时）"""
+    run = getattr(_local, 'run', None)
+    if run is not None:
+        run.__exit__(None, None, None)
+    records = getattr(_local, 'records', None) or []
+    _local.records = _local.run = None
+    return records
+
+
+def summarize(records):
+    """按阶段汇总：[{phase, count, p50_ms, p95_ms, total_ms, rows, bytes}]，按总耗时降序
+
+    rows、bytes 为各次记录的中位数（没有记录时为 None）。records 可以是 Phase 或其 as_dict() 结果。
+    """
+    groups = {}
+    for record in records:
+        if isinstance(record, Phase):
+            record = record.as_dict()
+        groups.setdefault(record['phase'], []).append(record)
+
+    def median(values):
+        values = [value for value in values if value is not None]
+        return int(np.median(values)) if values else None
+
+    summary = []
+    for name, items in groups.items():
+        ms = np.array([item['ms'] for item in items])
+        summary.append({
+            'phase': name,
+            'count': len(items),
+            'p50_ms': round(float(np.percentile(ms, 50)), 3),
+            'p95_ms': round(float(np.percentile(ms, 95)), 3),
+            'total_ms': round(float(ms.sum()), 3),
+            'rows': median(item['rows'] for item in items),
+            'bytes': median(item['bytes'] for item in items),
+        })
+    return sorted(summary, key=lambda item: item['total_ms'], reverse=True)
+
+
+def write_log(path, entry):
+    """在 JSON Lines 日志末尾追加一条记录（多个会话线程安全）"""
+    line = json.dumps(entry, ensure_ascii=False, default=str)
+    with _log_lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
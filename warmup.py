@@ -0,0 +1,74 @@
+"""启动预热：在服务器接受第一个会话之前加载数据、构建全部派生结构并导入画图模块
+
+直接用 `streamlit run daima.py` 启动时，数据加载（读缓存或解析工作簿、清洗、构建索引/汇总表/矩阵）
+和 plotly 的导入都发生在第一个打开页面的会话里，第一个用户要等到这些都完成才能操作。
+用本脚本启动时先在进程内完成这些工作，再在同一进程中启动 Streamlit：
+
+    python warmup.py                       # 预热后启动 daima.py，数据路径等配置见 settings.py
+    python warmup.py --server.port 8501    # 其余参数原样传给 streamlit run
+
+预热结果放在 app_common 的 st.cache_resource 中（进程内共享），页面的第一次运行直接取用。
+"""
+import os
+import sys
+import time
+
+import app_common
+import charts
+import settings
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'daima.py')
+
+
+def preload_emojis():
+    """Streamlit 第一次列出 pages 目录时才导入表情符号表（模块导入时编译一个很大的正则，约 0.3 秒）"""
+    try:
+        from streamlit import emojis  # noqa: F401
+    except ImportError:
+        pass
+
+
+def warm_up():
+    """加载数据、构建派生结构并预热第一次查询和画图，返回 [(步骤, 耗时毫秒)]"""
+    steps = []
+
+    def step(name, func):
+        start = time.perf_counter()
+        result = func()
+        steps.append((name, (time.perf_counter() - start) * 1000))
+        return result
+
+    watcher = step('加载数据并构建派生结构', app_common.default_watcher)
+    if settings.API_PORT:
+        step('启动查询接口', app_common.get_api_server)
+    step('导入画图模块', charts.preload)
+    step('导入 Streamlit 的表情符号表', preload_emojis)
+
+    # 走一遍代表性的查询和画图：首次调用时才加载的 plotly 图形类、JSON 序列化等在这里完成
+    query_engine = watcher.engine
+    code = next((code for code in query_engine.panel.codes if code), None)
+    if code is not None:
+        def first_query():
+            trend_df = query_engine.trend(code)
+            query_engine.stats(code)
+            charts.trend_figure(trend_df, f"{code} 数字化转型指数趋势").to_json()
+        step('预热查询和画图', first_query)
+    return steps
+
+
+def main():
+    start = time.perf_counter()
+    steps = warm_up()
+    for name, ms in steps:
+        print(f"{name}: {ms:.0f} ms")
+    watcher = app_common.default_watcher()
+    print(f"预热完成（共 {(time.perf_counter() - start) * 1000:.0f} ms），数据版本: {watcher.engine.version}")
+
+    from streamlit.web import cli
+
+    sys.argv = ['streamlit', 'run', APP_PATH, *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    main()